@@ -1,8 +1,8 @@
 import json
 
-import chevron
 import lxml.html
 import prairielearn as pl
+from theorielearn.render_utils import render_template
 from typing_extensions import Optional
 
 BTREE_BUILDER_MUSTACHE_TEMPLATE_NAME = "tl-btree-builder.mustache"
@@ -51,8 +51,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
             ),
         }
 
-        with open(BTREE_BUILDER_MUSTACHE_TEMPLATE_NAME, "r") as f:
-            return chevron.render(f, html_params).strip()
+        return render_template(BTREE_BUILDER_MUSTACHE_TEMPLATE_NAME, html_params)
 
 
 def parse(element_html: str, data: pl.QuestionData) -> None:
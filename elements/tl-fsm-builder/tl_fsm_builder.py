@@ -1,25 +1,37 @@
-import html
 import json
-from collections.abc import Callable
-from typing import TYPE_CHECKING, Any
+from functools import lru_cache
+from typing import Any, cast
 
-import chevron
-import json_utils as ju
 import lxml.html
 import prairielearn as pl
-from automata.fa.dfa import DFA
-from grading_utils import compute_partial_credit, generate_dfa_feedback_html
+import theorielearn.automata_utils.json_utils as ju
+from theorielearn.automata_utils.compact_dfa import DFALikeT
+from theorielearn.automata_utils.fa_utils import (
+    compute_partial_credit,
+    generate_dfa_feedback_html,
+    get_equiv_dfa,
+    partial_credit_word_limit,
+)
+from theorielearn.automata_utils.grading_budget import grading_budget
+from theorielearn.automata_utils.product_utils import DFAProduct
+from theorielearn.automata_utils.reference_cache import (
+    REFERENCE_CACHE_MAX_SIZE,
+    fingerprint,
+    reference_from_json,
+)
+from theorielearn.render_utils import fsm_diagram, render_template
+from theorielearn.shared_utils import grade_question_parameterized
 from typing_extensions import assert_never
 
-if TYPE_CHECKING:
-    from automata.fa.fa import FA
-
-
 ALPHABET_DEFAULT = "01"
 EPSILON_SYMBOL_DEFAULT = "e"
 MAX_LENGTH_TO_CHECK_DEFAULT = 10
 WEIGHT_DEFAULT = 1
 MAX_STATE_SCORE_SCALING_DEFAULT = 0.5
+PRECOMPUTE_ANSWER_DIAGRAM_DEFAULT = True
+
+# Larger answer diagrams are laid out when rendered instead of stored in params
+ANSWER_DIAGRAM_MAX_LENGTH = 20_000
 
 FSM_BUILDER_MUSTACHE_TEMPLATE_NAME = "tl-fsm-builder.mustache"
 
@@ -27,6 +39,9 @@ FSM_BUILDER_MUSTACHE_TEMPLATE_NAME = "tl-fsm-builder.mustache"
 # TODO change these to a attributes on the element if needed
 MAX_NUM_TO_CHECK = 10
 
+# Number of distinct FSMs whose grading results are kept per variant
+GRADING_CACHE_MAX_SIZE = 8
+
 
 def prepare(element_html: str, data: pl.QuestionData) -> None:
     element = lxml.html.fragment_fromstring(element_html)
@@ -37,6 +52,7 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
         "epsilon-symbol",
         "max-check-length",
         "max-state-score-scaling",
+        "precompute-answer-diagram",
     ]
     pl.check_attribs(element, required_attribs, optional_attribs)
 
@@ -70,6 +86,10 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
             f"max-state-score-scaling must be between 0.0 and 1.0, not {max_state_score_scaling}."
         )
 
+    precompute_answer_diagram = pl.get_boolean_attrib(
+        element, "precompute-answer-diagram", PRECOMPUTE_ANSWER_DIAGRAM_DEFAULT
+    )
+
     fsm_type_name = pl.get_string_attrib(element, "fsm-type").upper()
     fsm_type = ju.FSMType[fsm_type_name]
 
@@ -116,6 +136,12 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
                 assert_never(fsm_type)
 
             data["correct_answers"][name] = json.dumps(reference_fsm_dict)
+
+            # The answer is the same for every view, so lay it out only once
+            if precompute_answer_diagram:
+                diagram = fsm_diagram(reference_fsm_dict, fsm_type)
+                if len(diagram) <= ANSWER_DIAGRAM_MAX_LENGTH:
+                    data["params"][name]["answer_diagram"] = diagram
         else:
             raise ValueError(f"Unsupported child tag name '{child.tag!s}'")
 
@@ -162,8 +188,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
             "max_states": data["params"][name].get("max_states", 0),
         }
 
-        with open(FSM_BUILDER_MUSTACHE_TEMPLATE_NAME) as f:
-            return chevron.render(f, html_params).strip()
+        return render_template(FSM_BUILDER_MUSTACHE_TEMPLATE_NAME, html_params)
     elif data["panel"] == "submission":
         html_params = {"submission": True}
 
@@ -174,35 +199,22 @@ def render(element_html: str, data: pl.QuestionData) -> str:
         elif name in data["partial_scores"]:
             html_params["feedback"] = data["partial_scores"][name].get("feedback", None)
 
-            fsm_json_dict = json.loads(data["submitted_answers"][name])
-
-            if fsm_type is ju.FSMType.DFA:
-                student_fsm: FA = ju.dfa_from_json(fsm_json_dict)
-            elif fsm_type is ju.FSMType.NFA:
-                student_fsm = ju.nfa_from_json(fsm_json_dict)
-            else:
-                assert_never(fsm_type)
-
-            html_params["fsm_diagram"] = str(student_fsm.show_diagram())
+            html_params["fsm_diagram"] = fsm_diagram(
+                data["submitted_answers"][name], fsm_type
+            )
 
-        with open(FSM_BUILDER_MUSTACHE_TEMPLATE_NAME) as f:
-            return chevron.render(f, html_params).strip()
+        return render_template(FSM_BUILDER_MUSTACHE_TEMPLATE_NAME, html_params)
 
     # Nothing interesting to display in correct answer panel, should just hide
     elif data["panel"] == "answer":
         if name not in data["correct_answers"]:
             return ""
 
-        fsm_json_dict = json.loads(data["correct_answers"][name])
-
-        if fsm_type is ju.FSMType.DFA:
-            correct_fsm: FA = ju.dfa_from_json(fsm_json_dict)
-        elif fsm_type is ju.FSMType.NFA:
-            correct_fsm = ju.nfa_from_json(fsm_json_dict)
-        else:
-            assert_never(fsm_type)
+        diagram = data["params"][name].get("answer_diagram")
+        if diagram is None:
+            diagram = fsm_diagram(data["correct_answers"][name], fsm_type)
 
-        return f"<pl-graph>{correct_fsm.show_diagram()}</pl-graph>"
+        return f"<pl-graph>{diagram}</pl-graph>"
 
     assert_never(data["panel"])
 
@@ -287,17 +299,17 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
     dump_state: bool = data["submitted_answers"].get(get_checkbox_name(name), False)
     data["format_errors"].pop(name, None)
 
-    # Serialize inputted FSM into the submitted answers dict
-    try:
-        if fsm_type is ju.FSMType.DFA:
-            data["submitted_answers"][name] = json.dumps(
-                ju.dfa_convert_json(fsm_json, dump_state=dump_state)
-            )
-        elif fsm_type is ju.FSMType.NFA:
-            data["submitted_answers"][name] = json.dumps(ju.nfa_convert_json(fsm_json))
-        else:
-            assert_never(fsm_type)
-    except ju.JsonValidationError as err:
+    # Check and convert the inputted FSM in one pass, then serialize it into
+    # the submitted answers dict
+    converted_json, errors = ju.find_fsm_json_errors(
+        fsm_json, fsm_type, dump_state=dump_state
+    )
+
+    if not errors:
+        data["submitted_answers"][name] = json.dumps(converted_json)
+    else:
+        err = errors[0]
+
         # String for highlighting
         json_transitions = (
             [
@@ -332,23 +344,45 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
         rerference_json_string = data["correct_answers"][name]
         max_states = data["params"][name].get("max_states")
 
-        def get_grading_info(fsm_json_string: str) -> tuple[DFA, int]:
-            fsm_json_dict = json.loads(fsm_json_string)
-
-            if fsm_type is ju.FSMType.DFA:
-                dfa = ju.dfa_from_json(fsm_json_dict)
-                return dfa, len(dfa.states)
-            elif fsm_type is ju.FSMType.NFA:
-                nfa = ju.nfa_from_json(fsm_json_dict)
-                return DFA.from_nfa(nfa), len(nfa.states)
-            else:
-                assert_never(fsm_type)
+        # Results for FSMs already graded in this variant, so resubmitting the
+        # same FSM (even with its states or links drawn in another order)
+        # skips determinizing and comparing it again
+        grading_cache: dict[str, dict[str, Any]] = data["params"][name].setdefault(
+            "grading_cache", {}
+        )
 
         def grade_fsm(fsm_json_string: str) -> tuple[float, str]:
-            student_equiv_dfa, num_states = get_grading_info(fsm_json_string)
-            correct_equiv_dfa, _ = get_grading_info(rerference_json_string)
+            # Bound the time and size of grading, raising a ValueError if exceeded
+            with grading_budget():
+                return grade_fsm_within_budget(json.loads(fsm_json_string))
+
+        def grade_fsm_within_budget(
+            fsm_json_dict: ju.DFAJsonDict | ju.NFAJsonDict,
+        ) -> tuple[float, str]:
+            grading_key = fingerprint(
+                fsm_type.name,
+                ju.canonical_fsm_json(fsm_json_dict),
+                rerference_json_string,
+                max_length_to_check,
+            )
+            result = grading_cache.pop(grading_key, None)
+
+            if result is None:
+                result = get_grading_result(
+                    fsm_type,
+                    fsm_json_dict,
+                    rerference_json_string,
+                    max_length_to_check,
+                )
+
+            # Keep the most recently graded FSMs, last
+            grading_cache[grading_key] = result
+            while len(grading_cache) > GRADING_CACHE_MAX_SIZE:
+                del grading_cache[next(iter(grading_cache))]
+
+            num_states = result["num_states"]
 
-            if student_equiv_dfa == correct_equiv_dfa:
+            if result["equivalent"]:
                 if max_states is not None and num_states > max_states:
                     feedback_str = (
                         f"Your {fsm_type.name} matches the desired language, but "
@@ -360,16 +394,8 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
 
                 return (1.0, f"Your {fsm_type.name} matches the desired language!")
 
-            feedback_html = generate_dfa_feedback_html(
-                student_equiv_dfa,
-                correct_equiv_dfa,
-                max_length_to_check,
-                MAX_NUM_TO_CHECK,
-                fsm_type.name,
-            )
-            partial_credit = compute_partial_credit(
-                student_equiv_dfa, correct_equiv_dfa
-            )
+            feedback_html = result["feedback_html"]
+            partial_credit = result["partial_credit"]
 
             if max_states is not None and num_states > max_states:
                 feedback_str = (
@@ -392,86 +418,90 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
         grade_question_parameterized(data, name, grade_fsm, weight=weight)
 
 
-def get_checkbox_name(name: str) -> str:
-    return f"{name}-include-dump-state"
+def get_grading_result(
+    fsm_type: ju.FSMType,
+    fsm_json_dict: ju.DFAJsonDict | ju.NFAJsonDict,
+    reference_json_string: str,
+    max_length_to_check: int,
+) -> dict[str, Any]:
+    """
+    Compare the converted FSM against the reference, returning whether they
+    accept the same language, the number of states in the FSM, and otherwise
+    the feedback listing counterexamples and the partial credit earned. The
+    result is JSON serializable, so it can be cached in the question data.
+    """
+    student_equiv_dfa, num_states = get_grading_info(fsm_type, fsm_json_dict)
+    reference = reference_from_json(reference_json_string, fsm_type)
+    correct_equiv_dfa = reference.dfa
+
+    if DFAProduct(student_equiv_dfa, correct_equiv_dfa).is_equivalent():
+        return {"equivalent": True, "num_states": num_states}
+
+    feedback_html = generate_dfa_feedback_html(
+        student_equiv_dfa,
+        correct_equiv_dfa,
+        max_length_to_check,
+        fsm_type.name,
+        max_num_to_check=MAX_NUM_TO_CHECK,
+    )
+    partial_credit = compute_partial_credit(
+        student_equiv_dfa,
+        correct_equiv_dfa,
+        word_limit_to_check=get_reference_word_limit(fsm_type, reference_json_string),
+        reference_word_counts=reference.word_counts,
+    )
 
+    return {
+        "equivalent": False,
+        "num_states": num_states,
+        "feedback_html": feedback_html,
+        "partial_credit": partial_credit,
+    }
 
-def get_states_plural(num_states: int) -> str:
-    return "state" if num_states == 1 else "states"
 
+@lru_cache(maxsize=REFERENCE_CACHE_MAX_SIZE)
+def get_reference_word_limit(fsm_type: ju.FSMType, reference_json_string: str) -> int:
+    """
+    Return the number of word lengths to compute partial credit over, which
+    depends on the reference as it is stored rather than its minimal DFA.
+    """
+    reference_json_dict = json.loads(reference_json_string)
 
-def print_dump_state(fsm_type: ju.FSMType, num_states: int, *, dump_state: bool) -> str:
-    if fsm_type is ju.FSMType.NFA and dump_state:
-        return f" ({num_states - 1} {get_states_plural(num_states - 1)}, plus one dump state)"
-    return ""
+    if fsm_type is ju.FSMType.DFA:
+        return partial_credit_word_limit(ju.dfa_from_json(reference_json_dict))
+    elif fsm_type is ju.FSMType.NFA:
+        return partial_credit_word_limit(ju.nfa_from_json(reference_json_dict))
+    else:
+        assert_never(fsm_type)
 
 
-def grade_question_parameterized(
-    data: pl.QuestionData,
-    question_name: str,
-    grade_function: Callable[[Any], tuple[bool | float, str | None]],
-    weight: int = 1,
-    feedback_field_name: str | None = None,
-) -> None:
+def get_grading_info(
+    fsm_type: ju.FSMType, fsm_json_dict: ju.DFAJsonDict | ju.NFAJsonDict
+) -> tuple[DFALikeT, int]:
     """
-    Grade question question_name, marked correct if grade_function(student_answer) returns True in
-    its first argument. grade_function should take in a single parameter (which will be the submitted
-    answer) and return a 2-tuple.
-        - The first element of the 2-tuple should either be:
-            - a boolean indicating whether the question should be marked correct
-            - a partial score between 0 and 1, inclusive
-        - The second element of the 2-tuple should either be:
-            - a string containing feedback
-            - None, if there is no feedback (usually this should only occur if the answer is correct)
-
-    Note: if the feedback_field_name is the same as the question name,
-    then the feedback_field_name does not need to be specified.
+    Return a DFA equivalent to the converted FSM, along with the number of
+    states in the original FSM. DFAs are built directly in compact form.
     """
+    num_states = len(fsm_json_dict["states"])
 
-    # Create the data dictionary at first
-    data["partial_scores"][question_name] = {"score": 0.0, "weight": weight}
-
-    try:
-        submitted_answer = data["submitted_answers"][question_name]
-    except KeyError:
-        # Catch error if no answer submitted
-        data["format_errors"][question_name] = "No answer was submitted"
-        return
+    if fsm_type is ju.FSMType.DFA:
+        return ju.compact_dfa_from_json(cast(ju.DFAJsonDict, fsm_json_dict)), num_states
+    elif fsm_type is ju.FSMType.NFA:
+        nfa = ju.nfa_from_json(cast(ju.NFAJsonDict, fsm_json_dict))
+        return get_equiv_dfa(nfa), num_states
+    else:
+        assert_never(fsm_type)
 
-    # Try to grade, exiting if there's an exception
-    try:
-        result, feedback_content = grade_function(submitted_answer)
-
-        # Check _must_ be done in this order. Int check is to deal with subclass issues
-        if isinstance(result, bool):
-            partial_score = 1.0 if result else 0.0
-        elif isinstance(result, float | int):
-            assert 0.0 <= result <= 1.0
-            partial_score = result
-        else:
-            assert_never(result)
 
-    except ValueError as err:
-        # Exit if there's a format error
-        data["format_errors"][question_name] = html.escape(str(err))
-        return
+def get_checkbox_name(name: str) -> str:
+    return f"{name}-include-dump-state"
 
-    # Set question score if grading succeeded
-    data["partial_scores"][question_name]["score"] = partial_score
-
-    # Put all feedback here
-    if feedback_content:
-        # Check for unescaped bad stuff in feedback string
-        if isinstance(submitted_answer, str):
-            contains_bad_chars = all(x in submitted_answer for x in ("<", ">"))
-            if contains_bad_chars and submitted_answer in feedback_content:
-                raise ValueError(
-                    f"Unescaped student input should not be present in the feedback for {question_name}."
-                )
 
-        data["partial_scores"][question_name]["feedback"] = feedback_content
+def get_states_plural(num_states: int) -> str:
+    return "state" if num_states == 1 else "states"
 
-        if not feedback_field_name:
-            feedback_field_name = question_name
 
-        data["feedback"][feedback_field_name] = feedback_content
+def print_dump_state(fsm_type: ju.FSMType, num_states: int, *, dump_state: bool) -> str:
+    if fsm_type is ju.FSMType.NFA and dump_state:
+        return f" ({num_states - 1} {get_states_plural(num_states - 1)}, plus one dump state)"
+    return ""
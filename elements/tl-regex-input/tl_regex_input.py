@@ -1,16 +1,22 @@
 """Python controller for regex input element."""
 
-import json
 from typing import Optional, Tuple
 
-import chevron
 import lxml.html
 import prairielearn as pl
-from automata.fa.dfa import DFA
-from fa_utils import generate_dfa_feedback_html
-from json_utils import dfa_dump_json, dfa_from_json
-from regular_expressions.exceptions import RegexException
-from regular_expressions.parser import compute_nfa_from_regex_lines
+from theorielearn.automata_utils.compact_dfa import CompactDFA, compact_dfa
+from theorielearn.automata_utils.fa_utils import generate_dfa_feedback_html
+from theorielearn.automata_utils.grading_budget import grading_budget
+from theorielearn.automata_utils.json_utils import FSMType
+from theorielearn.automata_utils.product_utils import DFAProduct
+from theorielearn.automata_utils.reference_cache import (
+    reference_from_json,
+    reference_from_regex,
+    reference_from_serialized,
+)
+from theorielearn.regular_expressions.exceptions import RegexException
+from theorielearn.regular_expressions.parser import compute_dfa_from_regex_lines
+from theorielearn.render_utils import render_template
 from typing_extensions import assert_never
 
 ALPHABET_DEFAULT = "01"
@@ -42,20 +48,29 @@ def prepare(element_html: str, data: pl.QuestionData) -> None:
     correct_regex = element.text
 
     if correct_regex is not None:
-        equiv_nfa = compute_nfa_from_regex_lines(correct_regex, alphabet)
-        correct_answer_dfa = dfa_dump_json(
-            (DFA.from_nfa(equiv_nfa, retain_names=False, minify=True)).to_complete()
-        )
-
         if name in data["correct_answers"]:
             raise Exception(f"Duplicate correct_answers variable name: {name}")
 
-        data["correct_answers"][name] = json.dumps(correct_answer_dfa)
+        # Compiled once per process, since every variant uses the same answer,
+        # and stored compactly so grading can load it without re-validating
+        data["correct_answers"][name] = compact_dfa(
+            reference_from_regex(correct_regex, alphabet).dfa
+        ).serialize()
 
     if name not in data["correct_answers"]:
         raise Exception(f"No correct answer provided for {name}")
 
 
+def load_reference_dfa(correct_answer: str) -> CompactDFA:
+    "Load the reference DFA stored in correct_answers by prepare"
+
+    # Variants prepared before the compact format stored the DFA as JSON
+    if correct_answer.lstrip().startswith("{"):
+        return compact_dfa(reference_from_json(correct_answer, FSMType.DFA).dfa)
+
+    return reference_from_serialized(correct_answer)
+
+
 def render(element_html: str, data: pl.QuestionData) -> str:
     element = lxml.html.fragment_fromstring(element_html)
     name = pl.get_string_attrib(element, "answers-name")
@@ -74,15 +89,14 @@ def render(element_html: str, data: pl.QuestionData) -> str:
     alphabet_list[-1]["last"] = True
 
     if data["panel"] == "question":
-        with open(REGEX_INPUT_MUSTACHE_TEMPLATE_NAME, "r", encoding="utf-8") as f:
-            help_text = chevron.render(
-                f,
-                {
-                    "help_text_body": True,
-                    "alphabet_list": alphabet_list,
-                    "alphabet_union": "+".join(alphabet),
-                },
-            ).strip()
+        help_text = render_template(
+            REGEX_INPUT_MUSTACHE_TEMPLATE_NAME,
+            {
+                "help_text_body": True,
+                "alphabet_list": alphabet_list,
+                "alphabet_union": "+".join(alphabet),
+            },
+        )
 
         editable = data["editable"]
         html_params = {
@@ -95,8 +109,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
             "help_text": help_text,
         }
 
-        with open(REGEX_INPUT_MUSTACHE_TEMPLATE_NAME, "r", encoding="utf-8") as f:
-            return chevron.render(f, html_params).strip()
+        return render_template(REGEX_INPUT_MUSTACHE_TEMPLATE_NAME, html_params)
 
     elif data["panel"] == "submission":
         submitted_answer_lines = [
@@ -112,8 +125,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
             "counterexample_strings": counterexample_strings,
         }
 
-        with open(REGEX_INPUT_MUSTACHE_TEMPLATE_NAME, "r", encoding="utf-8") as f:
-            return chevron.render(f, html_params).strip()
+        return render_template(REGEX_INPUT_MUSTACHE_TEMPLATE_NAME, html_params)
 
     # Nothing interesting to display in correct answer panel, should just hide
     elif data["panel"] == "answer":
@@ -129,30 +141,28 @@ def grade(element_html: str, data: pl.QuestionData) -> None:
     question_name = pl.get_string_attrib(element, "answers-name")
     alphabet = set(pl.get_string_attrib(element, "alphabet", ALPHABET_DEFAULT))
 
-    reference_equiv_dfa = dfa_from_json(
-        json.loads(data["correct_answers"][question_name])
-    )
+    reference_equiv_dfa = load_reference_dfa(data["correct_answers"][question_name])
 
     def grade_regex(student_ans: str) -> Tuple[bool, Optional[str]]:
-        try:
-            student_equiv_dfa = DFA.from_nfa(
-                compute_nfa_from_regex_lines(student_ans, alphabet), retain_names=False
-            ).to_complete()
-        except RegexException as e:
-            raise ValueError(str(e))
-
-        if student_equiv_dfa == reference_equiv_dfa:
-            return (True, None)
-
-        return (
-            False,
-            generate_dfa_feedback_html(
-                student_equiv_dfa,
-                reference_equiv_dfa,
-                MAX_LENGTH_TO_CHECK,
-                "regular expression",
-            ),
-        )
+        # Bound the time and size of grading, raising a ValueError if exceeded
+        with grading_budget():
+            try:
+                student_equiv_dfa = compute_dfa_from_regex_lines(student_ans, alphabet)
+            except RegexException as e:
+                raise ValueError(str(e))
+
+            if DFAProduct(student_equiv_dfa, reference_equiv_dfa).is_equivalent():
+                return (True, None)
+
+            return (
+                False,
+                generate_dfa_feedback_html(
+                    student_equiv_dfa,
+                    reference_equiv_dfa,
+                    MAX_LENGTH_TO_CHECK,
+                    "regular expression",
+                ),
+            )
 
     try:
         pl.grade_answer_parameterized(data, question_name, grade_regex, weight=weight)
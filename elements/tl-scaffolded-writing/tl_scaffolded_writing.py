@@ -3,10 +3,10 @@ import json
 from enum import Enum
 from typing import List
 
-import chevron
 import lxml.html
 import prairielearn as pl
 from prairielearn import QuestionData
+from theorielearn.render_utils import render_template
 
 SCAFFOLDED_WRITING_MUSTACHE_TEMPLATE_NAME = "tl-scaffolded-writing.mustache"
 
@@ -72,18 +72,17 @@ def render(element_html: str, data: QuestionData) -> str:
     entered_tokens = [html.escape(token) for token in entered_tokens]
 
     if data["panel"] == "question":
-        with open(SCAFFOLDED_WRITING_MUSTACHE_TEMPLATE_NAME, "r") as f:
-            return chevron.render(
-                f,
-                {
-                    "answers_name": name,
-                    "entered_tokens": json.dumps(entered_tokens),
-                    "cfg": data["params"][f"{name}_cfg"],
-                    "editable": editable,
-                    type.value: True,
-                    "sort_type": sort.value,
-                },
-            ).strip()
+        return render_template(
+            SCAFFOLDED_WRITING_MUSTACHE_TEMPLATE_NAME,
+            {
+                "answers_name": name,
+                "entered_tokens": json.dumps(entered_tokens),
+                "cfg": data["params"][f"{name}_cfg"],
+                "editable": editable,
+                type.value: True,
+                "sort_type": sort.value,
+            },
+        )
 
     elif data["panel"] == "submission":
         feedback_paragraphs = []
@@ -1,9 +1,9 @@
 import json
 from enum import Enum
 
-import chevron
 import lxml.html
 import prairielearn as pl
+from theorielearn.render_utils import render_template
 from typing_extensions import Optional
 
 TREE_BUILDER_MUSTACHE_TEMPLATE_NAME = "tl-tree-builder.mustache"
@@ -175,8 +175,7 @@ def render(element_html: str, data: pl.QuestionData) -> str:
             "label_tree_json": labeltreejson,
         }
 
-        with open(TREE_BUILDER_MUSTACHE_TEMPLATE_NAME, "r") as f:
-            return chevron.render(f, html_params).strip()
+        return render_template(TREE_BUILDER_MUSTACHE_TEMPLATE_NAME, html_params)
 
 
 def parse(element_html: str, data: pl.QuestionData) -> None:
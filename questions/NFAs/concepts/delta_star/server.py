@@ -1,9 +1,8 @@
 import random
 
 import prairielearn as pl
-from automata.base.exceptions import RejectionException
-from automata.fa.nfa import NFA
 from theorielearn.automata_utils.fa_utils import generate_random_nfa
+from theorielearn.automata_utils.simulation import nfa_read_input_from
 from theorielearn.shared_utils import grade_question_tokenized
 
 
@@ -24,20 +23,7 @@ def generate(data: pl.QuestionData) -> None:
     data["params"]["start_state"] = rand_state
     data["params"]["input"] = input_str
 
-    temp_nfa = NFA(
-        states=nfa.states,
-        input_symbols=nfa.input_symbols,
-        transitions=nfa.transitions,
-        initial_state=rand_state,
-        final_states=nfa.final_states,
-    )
-    state_generator = temp_nfa.read_input_stepwise(input_str)
-    set_ans_states: set = set()
-    try:
-        for state_set in state_generator:
-            set_ans_states = set(state_set)
-    except RejectionException:
-        pass
+    set_ans_states = nfa_read_input_from(nfa, {rand_state}, input_str)
 
     data["correct_answers"]["ans"] = f"{{{','.join(set_ans_states)}}}"
 
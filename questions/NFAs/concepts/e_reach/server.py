@@ -4,6 +4,7 @@ import random
 
 import prairielearn as pl
 from theorielearn.automata_utils.fa_utils import generate_random_nfa
+from theorielearn.automata_utils.simulation import epsilon_closure
 from theorielearn.shared_utils import (
     grade_question_tokenized,
 )
@@ -28,9 +29,7 @@ def generate(data: pl.QuestionData) -> None:
     data["params"]["state"] = state
 
     # Generates a string containing the ereach
-    data["correct_answers"]["ereach"] = (
-        f"{{{','.join(nfa._get_lambda_closures()[state])}}}"
-    )
+    data["correct_answers"]["ereach"] = f"{{{','.join(epsilon_closure(nfa, {state}))}}}"
 
 
 def grade(data: pl.QuestionData) -> None:
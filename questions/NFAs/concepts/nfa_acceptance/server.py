@@ -2,8 +2,8 @@
 import random
 
 import prairielearn as pl
-from automata.fa.dfa import DFA
 from theorielearn.automata_utils.fa_utils import NFA, generate_random_nfa
+from theorielearn.automata_utils.subset_table import SubsetTable
 
 MAX_RETRIES = 5
 MAX_INPUT_STRING_LEN = 6
@@ -42,7 +42,7 @@ def generate(data: pl.QuestionData) -> None:
         nfa = generate_random_nfa(
             states=6, alphabet="01", edge_density=0.2, epsilon_density=0.2, accepting=2
         )
-        dfa = DFA.from_nfa(nfa)
+        dfa = SubsetTable.from_nfa(nfa).to_dfa()
         complement_dfa = dfa.complement()
         dfa_min = dfa.minimum_word_length()
         cdfa_min = dfa.minimum_word_length()
@@ -1,10 +1,10 @@
-from queue import Queue
-from typing import Iterable, Literal, TypedDict, cast
+from typing import Literal, TypedDict
 
 import prairielearn as pl
-from theorielearn.automata_utils.fa_utils import generate_random_nfa
+from theorielearn.automata_utils.random_fa import random_nfas
+from theorielearn.automata_utils.subset_table import SubsetTable
 import theorielearn.shared_utils as su
-from automata.fa.nfa import NFA, NFAStateT
+from typing_extensions import NotRequired
 
 StateQuestionNameT = Literal["e0_reach", "e1_reach", "transition_0", "transition_1"]
 IsAcceptingTextT = Literal["yes", "no"]
@@ -13,19 +13,36 @@ IsAcceptingTextT = Literal["yes", "no"]
 class RowDict(TypedDict):
     "A class with type signatures for the question row dict"
 
-    q: NFAStateT
-    e0_reach: str
-    e1_reach: str
-    transition_0: str
-    transition_1: str
-    states_to_add: list[NFAStateT]
-    is_accepting: IsAcceptingTextT
+    q: str
     is_upcoming: bool
     is_current: bool
     is_finished: bool
 
+    # Answers are filled in from the subset table once the row is finished
+    e0_reach: NotRequired[str]
+    e1_reach: NotRequired[str]
+    transition_0: NotRequired[str]
+    transition_1: NotRequired[str]
+    is_accepting: NotRequired[IsAcceptingTextT]
 
-def sort_string(s: str | Iterable[str]) -> str:
+    # Only set in variants generated before the subset table was stored in
+    # params, whose rows hold every answer from the start
+    states_to_add: NotRequired[list[str]]
+
+
+def get_row_answer(
+    table: SubsetTable, row_number: int, question_name: StateQuestionNameT
+) -> int:
+    "Look up the correct set of states for a question in the given row"
+
+    # Question names are either "transition_<symbol>" or "e<symbol>_reach"
+    if question_name.startswith("transition"):
+        return table.move(row_number, question_name[-1])
+
+    return table.reach(row_number, question_name[1])
+
+
+def sort_string(s: str) -> str:
     "Returns a string that is a sorted version of s with spaces removed"
     return ("".join(sorted(s))).replace(" ", "")
 
@@ -34,8 +51,8 @@ def convert_empty_set(s: str) -> str:
     return "∅" if not s else s
 
 
-def grade_current_row(data: su.QuestionData) -> None:
-    "Grade the currently active row"
+def grade_legacy_row(data: su.QuestionData) -> None:
+    "Grade the currently active row of a variant without a stored subset table"
 
     current_row_number: int = data["params"]["current_row_number"]
     current_row: RowDict = data["params"]["table_rows"][current_row_number]
@@ -54,7 +71,9 @@ def grade_current_row(data: su.QuestionData) -> None:
         )
 
     def grade_states_to_add(student_input: str) -> tuple[bool, str | None]:
-        cleaned_student_input = set(map(sort_string, su.tokenize_string(student_input)))
+        # Split by hand, since tokenize_string would unidecode the empty set symbol
+        student_tokens = student_input.replace(" ", "").strip(",").split(",")
+        cleaned_student_input = set(map(sort_string, student_tokens))
         correct_answer = set(map(convert_empty_set, current_row["states_to_add"]))
 
         if cleaned_student_input == {""}:
@@ -80,72 +99,84 @@ def grade_current_row(data: su.QuestionData) -> None:
     pl.set_weighted_score_data(data)
 
 
-def generate_table_list(question_nfa: NFA) -> list[RowDict]:
-    "Generate a list corresponding to rows of the table for the NFA question"
+def grade_current_row(data: su.QuestionData) -> None:
+    "Grade the currently active row by looking up answers in the subset table"
 
-    # Queue keeping states we have not filled in rows for
-    state_queue: Queue[str] = Queue()
-    states_in_table: set[str] = set()
-    all_table_rows: list[RowDict] = []
+    if "subset_table" not in data["params"]:
+        grade_legacy_row(data)
+        return
 
-    initial_state = question_nfa.initial_state
-    closures = question_nfa._get_lambda_closures()  # type: ignore
-    initial_e_reach = sort_string(set().union(*(closures[i] for i in initial_state)))
+    table = SubsetTable.from_json(data["params"]["subset_table"])
+    current_row_number: int = data["params"]["current_row_number"]
 
-    state_queue.put(initial_e_reach)
-    states_in_table.add(initial_e_reach)
+    def get_question_name(question_name: str) -> str:
+        return f"{current_row_number}-{question_name}"
 
-    while not state_queue.empty():
-        state = state_queue.get()
+    def grade_state_set_question(question_name: StateQuestionNameT) -> None:
+        correct_answer = get_row_answer(table, current_row_number, question_name)
 
-        correct_0_transition = sort_string(
-            set().union(*(question_nfa.transitions[i].get("0", set()) for i in state))
-        )
-        correct_1_transition = sort_string(
-            set().union(*(question_nfa.transitions[i].get("1", set()) for i in state))
-        )
-        correct_e0_reach = sort_string(
-            set().union(*(closures[i] for i in correct_0_transition))
-        )
-        correct_e1_reach = sort_string(
-            set().union(*(closures[i] for i in correct_1_transition))
+        su.grade_question_parameterized(
+            data,
+            get_question_name(question_name),
+            lambda x: (table.parse_subset(x) == correct_answer, None),
         )
 
-        is_accepting: IsAcceptingTextT = (
-            "no" if set(question_nfa.final_states).isdisjoint(state) else "yes"
-        )
+    def grade_states_to_add(student_input: str) -> tuple[bool, str | None]:
+        # Split by hand, since tokenize_string would unidecode the empty set symbol
+        student_tokens = set(student_input.replace(" ", "").strip(",").split(","))
+        correct_answer = {table.rows[row] for row in table.new_rows(current_row_number)}
 
-        states_to_add = sorted({correct_e0_reach, correct_e1_reach} - states_in_table)
-
-        # Make sure that everything gets marked once it goes on the queue
-        for next_state in states_to_add:
-            states_in_table.add(next_state)
-            state_queue.put(next_state)
-
-        # Fill dictionary for current row
-        all_table_rows.append(
-            {
-                "q": state,
-                "e0_reach": correct_e0_reach,
-                "e1_reach": correct_e1_reach,
-                "transition_0": correct_0_transition,
-                "transition_1": correct_1_transition,
-                "states_to_add": states_to_add,
-                "is_accepting": is_accepting,
-                "is_upcoming": False,
-                "is_current": False,
-                "is_finished": False,
-            }
-        )
+        if student_tokens == {""}:
+            student_tokens = set()
 
-    return all_table_rows
+        return ({table.parse_subset(x) for x in student_tokens} == correct_answer, None)
 
+    grade_state_set_question("e0_reach")
+    grade_state_set_question("e1_reach")
+    grade_state_set_question("transition_0")
+    grade_state_set_question("transition_1")
+
+    is_accepting_answer = "yes" if table.is_accepting(current_row_number) else "no"
+    su.grade_question_parameterized(
+        data,
+        get_question_name("is_accepting"),
+        lambda x: (x.lower().replace(" ", "") == is_accepting_answer, None),
+    )
+
+    su.grade_question_parameterized(
+        data, get_question_name("states_to_add"), grade_states_to_add
+    )
+
+    pl.set_weighted_score_data(data)
 
-def set_row_list_upcoming(row_list: list[RowDict], state_names: list[str]) -> None:
+
+def generate_table_list(table: SubsetTable) -> list[RowDict]:
+    "Generate a list corresponding to rows of the table for the NFA question"
+
+    return [
+        {
+            "q": table.format_subset(subset),
+            "is_upcoming": False,
+            "is_current": False,
+            "is_finished": False,
+        }
+        for subset in table.rows
+    ]
+
+
+def fill_row_answers(table: SubsetTable, row_dict: RowDict, row_number: int) -> None:
+    "Fill in the answers of a row for display"
+    row_dict["e0_reach"] = table.format_subset(table.reach(row_number, "0"))
+    row_dict["e1_reach"] = table.format_subset(table.reach(row_number, "1"))
+    row_dict["transition_0"] = table.format_subset(table.move(row_number, "0"))
+    row_dict["transition_1"] = table.format_subset(table.move(row_number, "1"))
+    row_dict["is_accepting"] = "yes" if table.is_accepting(row_number) else "no"
+
+
+def set_row_list_upcoming(row_list: list[RowDict], row_numbers: list[int]) -> None:
     "Set upcoming entries in row list"
-    for row_dict in row_list:
-        if row_dict["q"] in state_names:
-            row_dict["is_upcoming"] = True
+    for row_number in row_numbers:
+        row_list[row_number]["is_upcoming"] = True
 
 
 def set_row_list_current(row_list: list[RowDict], idx: int) -> None:
@@ -162,21 +193,26 @@ def set_row_finished(row_dict: RowDict) -> None:
 
 
 def generate(data: su.QuestionData) -> None:
-    # Generate initial NFA and row data
-    question_nfa: NFA = cast(NFA, None)
-    row_table_list = None
-
-    while row_table_list is None or len(row_table_list) > 10 or len(row_table_list) < 8:
-        question_nfa = generate_random_nfa(
-            states=6, alphabet="01", edge_density=0.8, epsilon_density=0.2, accepting=2
-        )
-        row_table_list = generate_table_list(question_nfa)
+    # Generate initial NFA and row data. Each row is a state of the subset construction.
+    (question_nfa,) = random_nfas(
+        1,
+        states=6,
+        alphabet="01",
+        edge_density=0.8,
+        epsilon_density=0.2,
+        accepting=2,
+        min_subset_states=8,
+        max_subset_states=10,
+    )
+    table = SubsetTable.from_nfa(question_nfa)
+    row_table_list = generate_table_list(table)
 
     set_row_list_current(row_table_list, 0)
 
     # Set display for NFA and row data
     data["params"]["nfa_graph"] = question_nfa.show_diagram().string()
     data["params"]["table_rows"] = row_table_list
+    data["params"]["subset_table"] = table.to_json()
 
     # Set current row index
     data["params"]["current_row_number"] = 0
@@ -196,8 +232,19 @@ def grade(data: su.QuestionData) -> None:
             current_row = table_rows[current_row_number]
 
             # Set current row to be finished, and set future states that will be visited
+            if "subset_table" in data["params"]:
+                table = SubsetTable.from_json(data["params"]["subset_table"])
+                fill_row_answers(table, current_row, current_row_number)
+                new_rows = table.new_rows(current_row_number)
+            else:
+                new_rows = [
+                    row_number
+                    for row_number, row_dict in enumerate(table_rows)
+                    if row_dict["q"] in current_row["states_to_add"]
+                ]
+
             set_row_finished(current_row)
-            set_row_list_upcoming(table_rows, current_row["states_to_add"])
+            set_row_list_upcoming(table_rows, new_rows)
 
             current_row_number += 1
             data["params"]["current_row_number"] = current_row_number
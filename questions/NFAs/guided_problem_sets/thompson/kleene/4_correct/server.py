@@ -42,7 +42,7 @@ def generate(data: Dict[str, Any]) -> None:
     )
     data["params"]["regex_string"] = "((011)*000)*"
 
-    server_base.generate(data)
+    server_base.generate(data, get_thompson_kleene_nfa())
 
 
 def grade(data: pl.QuestionData) -> None:
@@ -39,7 +39,7 @@ def generate(data: Dict[str, Any]) -> None:
     )
     data["params"]["regex_string"] = "(010)*+0100*"
 
-    server_base.generate(data)
+    server_base.generate(data, get_thompson_counter2_nfa())
 
 
 def grade(data: pl.QuestionData) -> None:
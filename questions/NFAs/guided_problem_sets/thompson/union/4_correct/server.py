@@ -45,7 +45,7 @@ def generate(data: Dict[str, Any]) -> None:
     )
     data["params"]["regex_string"] = "(010)*+0100*"
 
-    server_base.generate(data)
+    server_base.generate(data, get_thompson_union_nfa())
 
 
 def grade(data: pl.QuestionData) -> None:
@@ -1,7 +1,7 @@
 import random
 
 from theorielearn.automata_utils.fa_utils import sample_input_strings
-from theorielearn.regular_expressions.parser import compute_nfa_from_regex_lines
+from theorielearn.regular_expressions.parser import compute_dfa_from_regex_lines
 from theorielearn.regular_expressions.utils import convert_regex_to_latex
 from theorielearn.shared_utils import QuestionData
 
@@ -24,10 +24,10 @@ def generate(data: QuestionData) -> None:
     num_rand_choices = 10
     choice = random.choice(variants)
 
-    nfa = compute_nfa_from_regex_lines(choice)
+    dfa = compute_dfa_from_regex_lines(choice)
 
     (sampled_accepted, sampled_not_accepted) = sample_input_strings(
-        max_length_to_check, num_rand_choices, nfa
+        max_length_to_check, num_rand_choices, dfa, use_random_walks=True
     )
 
     data["params"]["strings_in_lang"] = sampled_accepted
@@ -0,0 +1,271 @@
+"""
+Exact enumeration of the short strings generated by a CFG, for the CFG
+external grader. The grammar is first cleaned so that no production has an
+empty right hand side or a single nonterminal on its right hand side. Every
+symbol then derives at least one character, so the strings of each length
+derived from each nonterminal follow from those of shorter lengths, and the
+language up to a length is built bottom up without exploring sentential forms.
+"""
+
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, FrozenSet, List, Set, Tuple, Union
+
+from nltk.grammar import CFG, Nonterminal
+
+TerminalT = str
+SymbolT = Union[Nonterminal, TerminalT]
+RhsT = Tuple[SymbolT, ...]
+ProductionsT = Dict[Nonterminal, Set[RhsT]]
+
+
+@dataclass(frozen=True)
+class CleanGrammar:
+    """
+    A grammar without empty productions, unit productions (A -> B) or useless
+    nonterminals, whose terminals are single characters. It generates the
+    same strings as the original grammar, except for the empty string, which
+    is recorded in generates_empty instead.
+    """
+
+    start: Nonterminal
+    productions: Dict[Nonterminal, FrozenSet[RhsT]]
+    generates_empty: bool
+
+
+def split_terminals(cfg: CFG) -> ProductionsT:
+    """
+    Return the productions of cfg with terminals split into characters, so that
+    S -> '00' S '1' becomes S -> '0' '0' S '1' (and S -> '' becomes S -> ).
+    """
+
+    productions: ProductionsT = {}
+
+    for prod in cfg.productions():
+        rhs: List[SymbolT] = []
+        for symbol in prod.rhs():
+            if isinstance(symbol, Nonterminal):
+                rhs.append(symbol)
+            else:
+                rhs.extend(symbol)
+
+        productions.setdefault(prod.lhs(), set()).add(tuple(rhs))
+
+    return productions
+
+
+def nullable_nonterminals(productions: ProductionsT) -> Set[Nonterminal]:
+    "Return the nonterminals which derive the empty string"
+
+    nullable: Set[Nonterminal] = set()
+    changed = True
+
+    while changed:
+        changed = False
+        for lhs, rhss in productions.items():
+            if lhs not in nullable and any(
+                all(symbol in nullable for symbol in rhs) for rhs in rhss
+            ):
+                nullable.add(lhs)
+                changed = True
+
+    return nullable
+
+
+def eliminate_empty_productions(
+    productions: ProductionsT, nullable: Set[Nonterminal]
+) -> ProductionsT:
+    """
+    Replace each production by every way of leaving out nullable nonterminals
+    on its right hand side, dropping those left empty.
+    """
+
+    result: ProductionsT = {}
+
+    for lhs, rhss in productions.items():
+        new_rhss = result.setdefault(lhs, set())
+
+        for rhs in rhss:
+            choices = [
+                (symbol, None) if symbol in nullable else (symbol,) for symbol in rhs
+            ]
+            for choice in product(*choices):
+                new_rhs = tuple(symbol for symbol in choice if symbol is not None)
+                if new_rhs:
+                    new_rhss.add(new_rhs)
+
+    return result
+
+
+def eliminate_unit_productions(productions: ProductionsT) -> ProductionsT:
+    """
+    Replace unit productions A -> B by the other productions of every
+    nonterminal reachable from A through unit productions.
+    """
+
+    def is_unit(rhs: RhsT) -> bool:
+        return len(rhs) == 1 and isinstance(rhs[0], Nonterminal)
+
+    result: ProductionsT = {}
+
+    for lhs in productions:
+        unit_reachable = {lhs}
+        stack = [lhs]
+
+        while stack:
+            for rhs in productions.get(stack.pop(), ()):
+                if is_unit(rhs) and rhs[0] not in unit_reachable:
+                    unit_reachable.add(rhs[0])  # type: ignore
+                    stack.append(rhs[0])  # type: ignore
+
+        result[lhs] = {
+            rhs
+            for nonterminal in unit_reachable
+            for rhs in productions.get(nonterminal, ())
+            if not is_unit(rhs)
+        }
+
+    return result
+
+
+def remove_useless_nonterminals(
+    productions: ProductionsT, start: Nonterminal
+) -> ProductionsT:
+    """
+    Remove nonterminals which derive no string of terminals, then those which
+    do not appear in any derivation from start.
+    """
+
+    generating: Set[Nonterminal] = set()
+    changed = True
+
+    while changed:
+        changed = False
+        for lhs, rhss in productions.items():
+            if lhs not in generating and any(
+                all(
+                    not isinstance(symbol, Nonterminal) or symbol in generating
+                    for symbol in rhs
+                )
+                for rhs in rhss
+            ):
+                generating.add(lhs)
+                changed = True
+
+    generating_productions = {
+        lhs: {
+            rhs
+            for rhs in rhss
+            if all(
+                not isinstance(symbol, Nonterminal) or symbol in generating
+                for symbol in rhs
+            )
+        }
+        for lhs, rhss in productions.items()
+        if lhs in generating
+    }
+
+    if start not in generating_productions:
+        return {}
+
+    reachable = {start}
+    stack = [start]
+
+    while stack:
+        for rhs in generating_productions[stack.pop()]:
+            for symbol in rhs:
+                if isinstance(symbol, Nonterminal) and symbol not in reachable:
+                    reachable.add(symbol)
+                    stack.append(symbol)
+
+    return {
+        lhs: rhss for lhs, rhss in generating_productions.items() if lhs in reachable
+    }
+
+
+def clean_cfg(cfg: CFG) -> CleanGrammar:
+    "Convert cfg to an equivalent CleanGrammar"
+
+    productions = split_terminals(cfg)
+    nullable = nullable_nonterminals(productions)
+
+    productions = eliminate_empty_productions(productions, nullable)
+    productions = eliminate_unit_productions(productions)
+    productions = remove_useless_nonterminals(productions, cfg.start())
+
+    return CleanGrammar(
+        cfg.start(),
+        {lhs: frozenset(rhss) for lhs, rhss in productions.items()},
+        cfg.start() in nullable,
+    )
+
+
+def cfg_language(cfg: CFG, max_length: int) -> Set[str]:
+    "Return exactly the strings of length at most max_length generated by cfg"
+
+    grammar = clean_cfg(cfg)
+
+    # words[A][n] holds the strings of length n derived from A. Right hand
+    # sides are either a single terminal or at least two symbols each deriving
+    # at least one character, so length n only depends on shorter lengths.
+    words: Dict[Nonterminal, List[Set[str]]] = {
+        lhs: [set()] for lhs in grammar.productions
+    }
+
+    for length in range(1, max_length + 1):
+        for lhs, rhss in grammar.productions.items():
+            words_of_length: Set[str] = set()
+            for rhs in rhss:
+                words_of_length.update(_rhs_words(rhs, length, words))
+
+            words[lhs].append(words_of_length)
+
+    language = {""} if grammar.generates_empty else set()
+
+    if grammar.start in words:
+        for words_of_length in words[grammar.start]:
+            language.update(words_of_length)
+
+    return language
+
+
+def _rhs_words(
+    rhs: RhsT, length: int, words: Dict[Nonterminal, List[Set[str]]]
+) -> Set[str]:
+    "Return the strings of the given length derived from the symbols in rhs"
+
+    # Strings derived from the symbols seen so far, by length
+    prefixes: Dict[int, Set[str]] = {0: {""}}
+
+    for i, symbol in enumerate(rhs):
+        # Each later symbol derives at least one character
+        max_prefix_length = length - (len(rhs) - i - 1)
+        is_last = i == len(rhs) - 1
+        next_prefixes: Dict[int, Set[str]] = {}
+
+        for prefix_length, prefix_words in prefixes.items():
+            for symbol_length in range(1, max_prefix_length - prefix_length + 1):
+                if is_last and prefix_length + symbol_length != length:
+                    continue
+
+                if isinstance(symbol, Nonterminal):
+                    symbol_words = words[symbol][symbol_length]
+                elif symbol_length == 1:
+                    symbol_words = {symbol}
+                else:
+                    continue
+
+                if symbol_words:
+                    next_prefixes.setdefault(
+                        prefix_length + symbol_length, set()
+                    ).update(
+                        prefix + word
+                        for prefix in prefix_words
+                        for word in symbol_words
+                    )
+
+        prefixes = next_prefixes
+        if not prefixes:
+            return set()
+
+    return prefixes.get(length, set())
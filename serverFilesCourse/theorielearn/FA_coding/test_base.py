@@ -4,11 +4,16 @@ from theorielearn.automata_utils.fa_utils import (
     generate_dfa_feedback_string,
     get_equiv_dfa,
 )
+from theorielearn.automata_utils.grading_budget import BudgetExceeded, grading_budget
+from theorielearn.automata_utils.lazy_equivalence import find_counterexample
+from theorielearn.automata_utils.reference_cache import reference_from_fa
 from code_feedback import Feedback
 from pl_helpers import name, points
 from pl_unit_test import PLTestCase
 
 MAX_LENGTH_TO_CHECK = 10
+MAX_STATES_TO_EXPLORE = 5000
+TIME_LIMIT_SECONDS = 10.0
 
 # Not allowed to switch between NFA and DFA with builtin algorithms
 DFA.from_nfa = Feedback.not_allowed  # type: ignore
@@ -31,15 +36,22 @@ class Test(PLTestCase):
             Feedback.add_feedback("fa is not a DFA as required")
             return
 
-        student_equiv_dfa = get_equiv_dfa(self.st.fa)
-        reference_equiv_dfa = get_equiv_dfa(self.ref.fa)
+        reference_equiv_dfa = reference_from_fa(self.ref.fa).dfa
+        student_input_name = "NFA" if is_nfa else "DFA"
 
-        if student_equiv_dfa == reference_equiv_dfa:
-            Feedback.set_score(1)
+        # Check equivalence on the fly first, so large student NFAs are only
+        # determinized as far as needed
+        try:
+            with grading_budget(TIME_LIMIT_SECONDS, MAX_STATES_TO_EXPLORE):
+                if find_counterexample(self.st.fa, reference_equiv_dfa) is None:
+                    Feedback.set_score(1)
+                    return
+
+                student_equiv_dfa = get_equiv_dfa(self.st.fa)
+        except BudgetExceeded as err:
+            Feedback.add_feedback(str(err))
             return
 
-        student_input_name = "NFA" if is_nfa else "DFA"
-
         Feedback.add_feedback(
             generate_dfa_feedback_string(
                 student_equiv_dfa,
@@ -0,0 +1,394 @@
+"""
+Array-backed DFAs for grading hot paths. States are renumbered to 0..n-1,
+input symbols are indexed in sorted order, transitions live in a single flat
+integer array and the accepting states are stored as a bitmask.
+"""
+
+import base64
+import struct
+import sys
+import weakref
+from array import array
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import automata.base.exceptions as exceptions
+import numpy as np
+from automata.fa.dfa import DFA, DFAStateT
+
+# Transition tables use signed 32 bit entries
+TRANSITION_TYPECODE = "i"
+
+# Serialized form: a header with the format version, number of states and
+# number of input symbols, then each symbol (length prefixed, UTF-8), the
+# transition table packed as little endian unsigned integers of the narrowest
+# width that fits every state, and the accepting states as a bitmap.
+SERIALIZATION_VERSION = 1
+_HEADER = struct.Struct("<BII")
+_SYMBOL_LENGTH = struct.Struct("<H")
+_STATE_TYPECODES = [(1 << 8, "B"), (1 << 16, "H"), (1 << 32, "I")]
+
+
+class CompactDFA:
+    """
+    A complete DFA over states 0..n-1. State 0 is the initial state, and states
+    reachable from it are numbered in breadth-first order (following symbols in
+    sorted order) before any unreachable states. If the original DFA is partial,
+    a dead state with name None is added as the last state.
+
+    The transition out of state q on the symbol with index a is
+    transitions[q * len(input_symbols) + a].
+    """
+
+    __slots__ = [
+        "input_symbols",
+        "state_names",
+        "transitions",
+        "final_mask",
+        "_symbol_index",
+        "_state_index",
+    ]
+
+    input_symbols: Tuple[str, ...]
+    state_names: Tuple[Optional[DFAStateT], ...]
+    transitions: "array[int]"
+    final_mask: int
+    _symbol_index: Dict[str, int]
+    _state_index: Dict[Optional[DFAStateT], int]
+
+    def __init__(
+        self,
+        input_symbols: Tuple[str, ...],
+        state_names: Tuple[Optional[DFAStateT], ...],
+        transitions: "array[int]",
+        final_mask: int,
+    ) -> None:
+        if len(transitions) != len(state_names) * len(input_symbols):
+            raise ValueError("Transition table does not match number of states")
+
+        self.input_symbols = input_symbols
+        self.state_names = state_names
+        self.transitions = transitions
+        self.final_mask = final_mask
+        self._symbol_index = {symbol: i for i, symbol in enumerate(input_symbols)}
+        self._state_index = {name: i for i, name in enumerate(state_names)}
+
+    @classmethod
+    def from_dfa(cls, dfa: DFA) -> "CompactDFA":
+        "Build the compact form of dfa. Prefer compact_dfa, which caches the result."
+
+        return cls.from_transitions(
+            dfa.input_symbols,
+            dfa.states,
+            dfa.transitions,
+            dfa.initial_state,
+            dfa.final_states,
+        )
+
+    @classmethod
+    def from_transitions(
+        cls,
+        input_symbols: Iterable[str],
+        states: Iterable[DFAStateT],
+        transitions: Mapping[DFAStateT, Mapping[str, DFAStateT]],
+        initial_state: DFAStateT,
+        final_states: Iterable[DFAStateT],
+    ) -> "CompactDFA":
+        """
+        Build the compact form of the DFA with the given (possibly partial)
+        transitions, without constructing or validating an automata-lib DFA.
+        """
+
+        input_symbols = tuple(sorted(input_symbols))
+        state_index: Dict[Optional[DFAStateT], int] = {initial_state: 0}
+        state_names: List[Optional[DFAStateT]] = [initial_state]
+        queue: Deque[DFAStateT] = deque([initial_state])
+
+        def visit(state: Optional[DFAStateT]) -> None:
+            if state not in state_index:
+                state_index[state] = len(state_names)
+                state_names.append(state)
+                if state is not None:
+                    queue.append(state)
+
+        # Reachable states first, in breadth-first order
+        while queue:
+            state = queue.popleft()
+            for symbol in input_symbols:
+                next_state = transitions[state].get(symbol)
+                if next_state is not None:
+                    visit(next_state)
+
+        states = set(states)
+        for state in sorted(states - state_index.keys(), key=str):
+            visit(state)
+
+        is_partial = any(
+            symbol not in transitions[state]
+            for state in states
+            for symbol in input_symbols
+        )
+
+        if is_partial:
+            visit(None)
+
+        dead_state = state_index.get(None, -1)
+        table = array(TRANSITION_TYPECODE)
+
+        for state in state_names:
+            if state is None:
+                table.extend([dead_state] * len(input_symbols))
+                continue
+
+            transition = transitions[state]
+            table.extend(
+                state_index[transition[symbol]] if symbol in transition else dead_state
+                for symbol in input_symbols
+            )
+
+        final_mask = 0
+        for state in final_states:
+            final_mask |= 1 << state_index[state]
+
+        return cls(input_symbols, tuple(state_names), table, final_mask)
+
+    def to_dfa(self) -> DFA:
+        "Convert back to a (complete) automata-lib DFA with states 0..n-1"
+
+        num_symbols = len(self.input_symbols)
+
+        return DFA(
+            states=frozenset(range(len(self))),
+            input_symbols=frozenset(self.input_symbols),
+            transitions={
+                state: {
+                    symbol: self.transitions[state * num_symbols + i]
+                    for i, symbol in enumerate(self.input_symbols)
+                }
+                for state in range(len(self))
+            },
+            initial_state=0,
+            final_states=frozenset(
+                state for state in range(len(self)) if self.is_final(state)
+            ),
+        )
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize to a compact binary form (see SERIALIZATION_VERSION). State
+        names are not kept, so the result loads with states named 0..n-1.
+        """
+
+        num_states = len(self)
+        parts = [
+            _HEADER.pack(SERIALIZATION_VERSION, num_states, len(self.input_symbols))
+        ]
+
+        for symbol in self.input_symbols:
+            encoded = symbol.encode()
+            parts.append(_SYMBOL_LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+
+        transitions = array(_state_typecode(num_states), self.transitions)
+        if sys.byteorder == "big":
+            transitions.byteswap()
+
+        parts.append(transitions.tobytes())
+        parts.append(self.final_mask.to_bytes((num_states + 7) // 8, "little"))
+
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CompactDFA":
+        """
+        Load a DFA serialized with to_bytes, without going through automata-lib
+        or its validation. Raises ValueError if data is not in the current format.
+        """
+
+        try:
+            version, num_states, num_symbols = _HEADER.unpack_from(data)
+            if version != SERIALIZATION_VERSION:
+                raise ValueError(f"Unsupported serialization version {version}.")
+
+            offset = _HEADER.size
+            input_symbols = []
+            for _ in range(num_symbols):
+                (length,) = _SYMBOL_LENGTH.unpack_from(data, offset)
+                offset += _SYMBOL_LENGTH.size
+                input_symbols.append(data[offset : offset + length].decode())
+                offset += length
+
+            packed = array(_state_typecode(num_states))
+            table_end = offset + num_states * num_symbols * packed.itemsize
+            packed.frombytes(data[offset:table_end])
+            if sys.byteorder == "big":
+                packed.byteswap()
+
+            if num_states == 0:
+                raise ValueError("Serialized DFA has no states.")
+            if len(packed) != num_states * num_symbols:
+                raise ValueError("Transition table has the wrong size.")
+            if packed and max(packed) >= num_states:
+                raise ValueError("Transition table refers to a missing state.")
+
+            final_bytes = data[table_end:]
+            if len(final_bytes) != (num_states + 7) // 8:
+                raise ValueError("Accepting state bitmap has the wrong size.")
+
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError("Malformed serialized DFA.") from e
+
+        return cls(
+            tuple(input_symbols),
+            tuple(range(num_states)),
+            array(TRANSITION_TYPECODE, packed),
+            int.from_bytes(final_bytes, "little"),
+        )
+
+    def serialize(self) -> str:
+        "Serialize to base64 text (of to_bytes), which can be stored in question data"
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def deserialize(cls, encoded: str) -> "CompactDFA":
+        "Load a DFA serialized with serialize. Raises ValueError if it is malformed."
+
+        try:
+            data = base64.b64decode(encoded, validate=True)
+        except ValueError as e:
+            raise ValueError("Malformed serialized DFA.") from e
+
+        return cls.from_bytes(data)
+
+    def __len__(self) -> int:
+        return len(self.state_names)
+
+    def state_index(self, state: DFAStateT) -> int:
+        "Return the index of the state with the given name in the original DFA"
+        return self._state_index[state]
+
+    def is_final(self, state: int) -> bool:
+        return bool(self.final_mask >> state & 1)
+
+    def step(self, state: int, symbol: str) -> int:
+        return self.transitions[
+            state * len(self.input_symbols) + self._symbol_index[symbol]
+        ]
+
+    def read_input_from(self, state: int, input_str: str) -> int:
+        "Return the index of the state reached by reading input_str from state"
+
+        num_symbols = len(self.input_symbols)
+        transitions = self.transitions
+        symbol_index = self._symbol_index
+
+        try:
+            for symbol in input_str:
+                state = transitions[state * num_symbols + symbol_index[symbol]]
+        except KeyError as e:
+            raise exceptions.RejectionException(
+                f"{e.args[0]} is not a valid input symbol"
+            ) from e
+
+        return state
+
+    def accepts_input(self, input_str: str) -> bool:
+        return self.is_final(self.read_input_from(0, input_str))
+
+    def transition_table(self) -> np.ndarray:
+        "Return a (read-only) view of the transitions as a states x symbols array"
+        return np.frombuffer(self.transitions, dtype=np.intc).reshape(
+            len(self), len(self.input_symbols)
+        )
+
+    def count_words_by_length(self, max_length: int) -> List[int]:
+        """
+        Return a list whose n-th entry is the number of accepted words of length
+        n, for every n up to max_length.
+        """
+
+        final_states = np.array([self.is_final(state) for state in range(len(self))])
+
+        return count_walks_by_length(self.transition_table(), final_states, max_length)
+
+
+def _state_typecode(num_states: int) -> str:
+    "Return the narrowest unsigned array typecode that can hold every state index"
+
+    for bound, typecode in _STATE_TYPECODES:
+        if num_states <= bound:
+            return typecode
+
+    raise ValueError(f"Too many states to serialize: {num_states}.")
+
+
+def walk_count_table(
+    transition_table: np.ndarray, targets: np.ndarray, max_length: int
+) -> List[np.ndarray]:
+    """
+    Given a transition table (where entry [q, a] is the state reached from q on
+    the symbol with index a) and a boolean mask of target states, return a list
+    whose n-th entry is an array counting, for each state q, the words of length
+    n leading from q to a target state.
+    """
+
+    num_symbols = transition_table.shape[1]
+
+    # Counts are at most num_symbols ** max_length, so switch to Python ints
+    # when they could overflow 64 bits
+    dtype = np.int64 if num_symbols**max_length < 2**63 else object
+
+    # Each step gathers the previous counts along every transition and sums
+    # them per state
+    table = [targets.astype(np.int64).astype(dtype)]
+    for _ in range(max_length):
+        table.append(table[-1][transition_table].sum(axis=1, dtype=dtype))
+
+    return table
+
+
+def count_walks_by_length(
+    transition_table: np.ndarray, targets: np.ndarray, max_length: int
+) -> List[int]:
+    """
+    Like walk_count_table, but only returns the counts for words starting from
+    state 0 (so only one count vector is kept in memory at a time).
+    """
+
+    num_symbols = transition_table.shape[1]
+    dtype = np.int64 if num_symbols**max_length < 2**63 else object
+
+    ways = targets.astype(np.int64).astype(dtype)
+    counts = [int(ways[0])]
+
+    for _ in range(max_length):
+        ways = ways[transition_table].sum(axis=1, dtype=dtype)
+        counts.append(int(ways[0]))
+
+    return counts
+
+
+# DFAs are immutable but unhashable, so compact forms are cached by object id
+# and evicted when the DFA is garbage collected.
+_compact_cache: Dict[int, CompactDFA] = {}
+
+
+# Hot paths accept either kind of DFA, and work on the compact form
+DFALikeT = Union[DFA, CompactDFA]
+
+
+def compact_dfa(dfa: DFALikeT) -> CompactDFA:
+    "Return the (cached) compact form of dfa, or dfa itself if it is already compact"
+
+    if isinstance(dfa, CompactDFA):
+        return dfa
+
+    key = id(dfa)
+    compact = _compact_cache.get(key)
+
+    if compact is None:
+        compact = CompactDFA.from_dfa(dfa)
+        _compact_cache[key] = compact
+        weakref.finalize(dfa, _compact_cache.pop, key, None)
+
+    return compact
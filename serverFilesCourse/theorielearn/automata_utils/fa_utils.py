@@ -1,67 +1,84 @@
-import math
-import string
-from itertools import product
-from random import choice, randint, random, sample, shuffle
-from typing import Any, List, Optional, Set, Tuple, Union
+from functools import partial
+from itertools import islice
+from random import sample
+from typing import Any, List, Optional, Sequence, Set, Tuple, Union
 
 import automata.base.exceptions as exceptions
-import networkx as nx
-from automata.fa.dfa import DFA, DFAStateT, DFATransitionsT
+from automata.fa.dfa import DFA, DFAStateT
 from automata.fa.fa import FA
 from automata.fa.nfa import NFA, NFAStateT
+from theorielearn.automata_utils.compact_dfa import DFALikeT, compact_dfa
+from theorielearn.automata_utils.grading_budget import (
+    DEFAULT_MAX_STATES,
+    check_budget,
+    current_budget,
+)
+from theorielearn.automata_utils.lazy_equivalence import LazyDeterminizer
+from theorielearn.automata_utils.product_utils import DFAProduct
+from theorielearn.automata_utils.random_fa import random_dfas, random_nfas
+from theorielearn.automata_utils.simulation import nfa_read_input_from
+from theorielearn.automata_utils.word_enumeration import dfa_words
+from theorielearn.automata_utils.word_sampling import WordSampler
 from theorielearn.shared_utils import replace_empty, strings_of_length_at_most_n
 from typing_extensions import assert_never
 
 LATEX_EPSILON = r"\varepsilon"
 
+# Characters that need escaping inside LaTeX math
+LATEX_ESCAPES = str.maketrans({"#": r"\#", "$": r"\$", "%": r"\%"})
+
 
 def elem_to_latex(elem: str) -> str:
-    return elem if elem else LATEX_EPSILON
+    return elem.translate(LATEX_ESCAPES) if elem else LATEX_EPSILON
 
 
 def check_dfa(
-    submitted_dfa: DFA, reference_dfa: DFA, max_length_to_check: int
+    submitted_dfa: DFALikeT,
+    reference_dfa: DFALikeT,
+    max_length_to_check: int,
+    *,
+    max_num_to_check: Optional[int] = None,
 ) -> Tuple[List[str], List[str]]:
     """
     Parameters
       - submitted_dfa: DFA submitted by the student
       - reference_dfa: Reference DFA for this problem
       - max_length_to_check: Maximum length to check regex string for feedback
+      - max_num_to_check: Maximum number of examples of each type to return
     Return value
       - Return a pair of lists of strings: false_positives, false_negatives
     Exceptions
       - Throw ValueError if input symbols don't match or if DFAs are equivalent
     """
 
-    if submitted_dfa.input_symbols != reference_dfa.input_symbols:
-        raise ValueError("Input symbols for submitted DFA don't match reference")
-
-    # Brute Force Check
-    false_positives: List[str] = []
-    false_negatives: List[str] = []
+    product = DFAProduct(submitted_dfa, reference_dfa)
 
-    for bitstring in strings_of_length_at_most_n(
-        0, max_length_to_check, alphabet=submitted_dfa.input_symbols
-    ):
-        accepted_by_reference_DFA = reference_dfa.accepts_input(bitstring)
-        accepted_by_submitted_DFA = submitted_dfa.accepts_input(bitstring)
-
-        if not accepted_by_reference_DFA and accepted_by_submitted_DFA:
-            false_positives.append(bitstring)
-        elif accepted_by_reference_DFA and not accepted_by_submitted_DFA:
-            false_negatives.append(bitstring)
+    # Counterexamples up to the length limit, in shortlex order
+    false_positives = list(
+        islice(
+            product.iter_counterexamples(max_length_to_check, false_positive=True),
+            max_num_to_check,
+        )
+    )
+    false_negatives = list(
+        islice(
+            product.iter_counterexamples(max_length_to_check, false_positive=False),
+            max_num_to_check,
+        )
+    )
 
     if false_positives or false_negatives:
         return false_positives, false_negatives
 
-    # Graph Based Check
-    counterexample, ce_false_positive = get_minimum_counterexample(
-        submitted_dfa, reference_dfa
-    )
+    # Otherwise, fall back to the shortest counterexample of any length
+    shortest_counterexample = product.shortest_counterexample()
 
-    if counterexample is None:
+    if shortest_counterexample is None:
         raise ValueError("DFAs are equivalent")
-    elif ce_false_positive:
+
+    counterexample, ce_false_positive = shortest_counterexample
+
+    if ce_false_positive:
         false_positives.append(counterexample)
     else:
         false_negatives.append(counterexample)
@@ -91,45 +108,82 @@ def states_to_string(obj: Any) -> str:
 
 
 def sample_input_strings(
-    max_input_string_len: int, num_rand_choices: int, fa: FA
+    max_input_string_len: int,
+    num_rand_choices: int,
+    fa: FA,
+    *,
+    use_random_walks: bool = False,
 ) -> Tuple[List[str], List[str]]:
     """
     Samples accepted and not accepted input strings for the given fa. Converts
     for display on the frontend.
+
+    By default, every string of length at most max_input_string_len is
+    enumerated before sampling. If use_random_walks is set, strings are instead
+    drawn directly by weighted random walks on the equivalent DFA, which takes
+    time and memory polynomial in max_input_string_len.
     """
 
-    # Get all accepted and non-accepted strings of length at most n
-    accepted = []
-    not_accepted = []
+    if use_random_walks:
+        equiv_dfa = get_equiv_dfa(fa)  # type: ignore
+        accepted_sampler = WordSampler(equiv_dfa, 1, max_input_string_len)
+        not_accepted_sampler = WordSampler(
+            equiv_dfa, 1, max_input_string_len, accepted=False
+        )
 
-    for x in strings_of_length_at_most_n(
-        1, max_input_string_len, alphabet=fa.input_symbols
-    ):
-        if fa.accepts_input(x):
-            accepted.append(x)
+        num_accepted = accepted_sampler.total
+        num_not_accepted = not_accepted_sampler.total
+        sample_accepted = accepted_sampler.sample
+        sample_not_accepted = not_accepted_sampler.sample
+        accepts_empty = compact_dfa(equiv_dfa).accepts_input("")
+
+    else:
+        if isinstance(fa, DFA):
+            # Walk the DFA to enumerate each side directly, instead of
+            # simulating it on every string
+            accepted = list(dfa_words(fa, max_input_string_len, min_length=1))
+            not_accepted = list(
+                dfa_words(fa, max_input_string_len, min_length=1, accepted=False)
+            )
         else:
-            not_accepted.append(x)
+            # Get all accepted and non-accepted strings of length at most n
+            accepted = []
+            not_accepted = []
+
+            for x in strings_of_length_at_most_n(
+                1, max_input_string_len, alphabet=fa.input_symbols
+            ):
+                if fa.accepts_input(x):
+                    accepted.append(x)
+                else:
+                    not_accepted.append(x)
+
+        num_accepted = len(accepted)
+        num_not_accepted = len(not_accepted)
+        sample_accepted = partial(sample, accepted)
+        sample_not_accepted = partial(sample, not_accepted)
+        accepts_empty = fa.accepts_input("")
 
     # Next, do random sampling based on the number of accepted and rejected strings
     sampled_accepted = []
     sampled_not_accepted = []
 
-    if len(accepted) < (num_rand_choices // 2):
-        sampled_accepted = accepted
-        sampled_not_accepted = sample(not_accepted, num_rand_choices - len(accepted))
+    if num_accepted < (num_rand_choices // 2):
+        sampled_accepted = sample_accepted(num_accepted)
+        sampled_not_accepted = sample_not_accepted(num_rand_choices - num_accepted)
 
-    elif len(not_accepted) < (num_rand_choices // 2 + num_rand_choices % 2):
-        sampled_accepted = sample(accepted, num_rand_choices - len(not_accepted))
-        sampled_not_accepted = not_accepted
+    elif num_not_accepted < (num_rand_choices // 2 + num_rand_choices % 2):
+        sampled_accepted = sample_accepted(num_rand_choices - num_not_accepted)
+        sampled_not_accepted = sample_not_accepted(num_not_accepted)
 
     else:
-        sampled_accepted = sample(accepted, num_rand_choices // 2)
-        sampled_not_accepted = sample(
-            not_accepted, num_rand_choices // 2 + num_rand_choices % 2
+        sampled_accepted = sample_accepted(num_rand_choices // 2)
+        sampled_not_accepted = sample_not_accepted(
+            num_rand_choices // 2 + num_rand_choices % 2
         )
 
     # Always include the empty string
-    if fa.accepts_input(""):
+    if accepts_empty:
         sampled_accepted.append(LATEX_EPSILON)
     else:
         sampled_not_accepted.append(LATEX_EPSILON)
@@ -138,8 +192,19 @@ def sample_input_strings(
     return sampled_accepted, sampled_not_accepted
 
 
-def get_equiv_dfa(fsm: Union[DFA, NFA]) -> DFA:
+def get_equiv_dfa(fsm: Union[DFA, NFA], *, max_states: Optional[int] = None) -> DFA:
+    """
+    Return a DFA equivalent to fsm. If max_states is given or a grading budget
+    is active, NFAs are determinized lazily and StateBudgetExceeded is raised if
+    more states are needed, instead of possibly taking exponential time.
+    """
     if isinstance(fsm, NFA):
+        if max_states is not None or current_budget() is not None:
+            if max_states is None:
+                max_states = DEFAULT_MAX_STATES
+
+            return LazyDeterminizer(fsm, max_states).to_dfa()
+
         return DFA.from_nfa(fsm).to_complete()
     elif isinstance(fsm, DFA):
         return fsm
@@ -155,17 +220,14 @@ def get_minimum_counterexample(
     The second element in the tuple is a boolean that is true if the input_fa accepts the counterexample, false otherwise.
     This function returns None for the string if they are equivalent.
     """
-    input_dfa = get_equiv_dfa(input_fa)
-    reference_dfa = get_equiv_dfa(reference_fa)
+    shortest_counterexample = DFAProduct(
+        get_equiv_dfa(input_fa), get_equiv_dfa(reference_fa)
+    ).shortest_counterexample()
 
-    if input_dfa == reference_dfa:
+    if shortest_counterexample is None:
         return (None, False)
-    elif input_dfa < reference_dfa:
-        diff_dfa = reference_dfa - input_dfa
-        return (diff_dfa.random_word(diff_dfa.minimum_word_length()), False)  # type: ignore
-    else:
-        diff_dfa = input_dfa - reference_dfa
-        return (diff_dfa.random_word(diff_dfa.minimum_word_length()), True)  # type: ignore
+
+    return shortest_counterexample
 
 
 def generate_dfa_feedback_string(
@@ -182,7 +244,10 @@ def generate_dfa_feedback_string(
     res = []
 
     false_positives, false_negatives = check_dfa(
-        student_equiv_dfa, reference_equiv_dfa, max_length_to_check
+        student_equiv_dfa,
+        reference_equiv_dfa,
+        max_length_to_check,
+        max_num_to_check=max_length_to_check,
     )
 
     assert false_positives or false_negatives
@@ -213,18 +278,23 @@ def generate_dfa_feedback_string(
 
 
 def generate_dfa_feedback_html(
-    student_equiv_dfa: DFA,
-    reference_equiv_dfa: DFA,
+    student_equiv_dfa: DFALikeT,
+    reference_equiv_dfa: DFALikeT,
     max_length_to_check: int,
     student_input_name: str,
     *,
+    max_num_to_check: Optional[int] = None,
     original_student_fa: Optional[FA] = None,
 ) -> str:
     """
     Generate feedback html for elements. The 'language' here is defined by
-    reference_equiv_dfa.
+    reference_equiv_dfa. At most max_num_to_check (by default
+    max_length_to_check) strings of each kind are listed.
     """
 
+    if max_num_to_check is None:
+        max_num_to_check = max_length_to_check
+
     def latex_prepare_first_n_list(elements: List[str], n: int) -> List[str]:
         "Format a list of strings for display as HTML"
 
@@ -236,7 +306,10 @@ def generate_dfa_feedback_html(
         return string_list
 
     false_positives, false_negatives = check_dfa(
-        student_equiv_dfa, reference_equiv_dfa, max_length_to_check
+        student_equiv_dfa,
+        reference_equiv_dfa,
+        max_length_to_check,
+        max_num_to_check=max_num_to_check,
     )
 
     assert false_positives or false_negatives
@@ -247,7 +320,7 @@ def generate_dfa_feedback_html(
             f"<p>Here are some strings matched by your {student_input_name} which are not in the language:</p>"
         )
         feedback_string_list.extend(
-            latex_prepare_first_n_list(false_positives, max_length_to_check)
+            latex_prepare_first_n_list(false_positives, max_num_to_check)
         )
 
         if original_student_fa is not None:
@@ -287,38 +360,61 @@ def generate_dfa_feedback_html(
             f"<p>Here are some strings in the language which aren't matched by your {student_input_name}:</p>"
         )
         feedback_string_list.extend(
-            latex_prepare_first_n_list(false_negatives, max_length_to_check)
+            latex_prepare_first_n_list(false_negatives, max_num_to_check)
         )
 
     return "".join(feedback_string_list)
 
 
+def partial_credit_word_limit(reference_fa: Union[DFA, NFA]) -> int:
+    """
+    Return the number of word lengths tl-fsm-builder computes partial credit
+    over: twice the number of states of the reference as the author drew it,
+    with NFAs determinized (but not minimized or completed) first.
+    """
+    if isinstance(reference_fa, NFA):
+        reference_fa = DFA.from_nfa(reference_fa)
+
+    return 2 * len(reference_fa.states)
+
+
 def compute_partial_credit(
-    student_equiv_dfa: DFA,
+    student_equiv_dfa: DFALikeT,
     reference_equiv_dfa: DFA,
     *,
     word_limit_to_check: Optional[int] = None,
+    reference_word_counts: Optional[Sequence[int]] = None,
 ) -> float:
     """
     Computes the approximate density difference between student_equiv_dfa and reference_equiv_dfa.
     Assumes input DFAs are minimal. Used for giving partial credit to students for incorrect answers.
     See section 3.3 for details: https://www.cis.upenn.edu/~alur/Ijcai13.pdf
+
+    reference_word_counts may hold precomputed word counts for reference_equiv_dfa
+    (e.g. from the reference cache), indexed by word length.
     """
 
     if word_limit_to_check is None:
         word_limit_to_check = 2 * len(reference_equiv_dfa.states)
 
-    # Raise exception here to prevent really slow grading / weird freakouts
-    if word_limit_to_check > 32:
-        raise ValueError(f"Word limit to check {word_limit_to_check} too high.")
+    check_budget()
+
+    difference_counts = DFAProduct(
+        student_equiv_dfa, reference_equiv_dfa
+    ).count_counterexamples_by_length(word_limit_to_check)
 
-    difference_dfa = student_equiv_dfa ^ reference_equiv_dfa
+    if reference_word_counts is None or len(reference_word_counts) <= (
+        word_limit_to_check
+    ):
+        reference_word_counts = compact_dfa(reference_equiv_dfa).count_words_by_length(
+            word_limit_to_check
+        )
+
+    check_budget()
 
     res = 0.0
     for n in range(word_limit_to_check + 1):
-        difference_frac = difference_dfa.count_words_of_length(n) / max(
-            reference_equiv_dfa.count_words_of_length(n), 1
-        )
+        difference_frac = difference_counts[n] / max(reference_word_counts[n], 1)
         res += difference_frac
 
     similarity_score = min(1.0, res / (word_limit_to_check + 1))
@@ -336,48 +432,7 @@ def generate_random_dfa(lower: int, upper: int) -> DFA:
     @return DFA object
         Randomly generated DFA.
     """
-    # TODO: Use rejection sampling instead of creating a Hamiltonian path from the start state.
-
-    n = randint(lower, upper)
-    input_symbols = {"0", "1"}
-    states = set(range(n))
-    random_state_ordering = list(states)
-    shuffle(random_state_ordering)
-
-    initial_state = random_state_ordering[0]
-    transitions: DFATransitionsT = {i: dict() for i in range(n)}
-
-    # Fill in transitions so that start state can reach all other states.
-    for i in range(n - 1):
-        symbol = str(randint(0, 1))
-        origin_state, destination_state = (
-            random_state_ordering[i],
-            random_state_ordering[i + 1],
-        )
-        transitions[origin_state][symbol] = destination_state
-
-    # Fill in remaining transitions.
-    for transition, symbol in product(transitions.values(), input_symbols):
-        if symbol not in transition:
-            transition[symbol] = randint(0, n - 1)
-
-    # Generate accepting states.
-    final_states = {state for state in states if randint(0, 1)}
-
-    # Enforce at least one accepting state and at least one rejecting state.
-    if len(final_states) == 0:
-        final_states.add(randint(0, n - 1))
-
-    if len(final_states) == n:
-        final_states.remove(randint(0, n - 1))
-
-    return DFA(
-        states=states,
-        input_symbols=input_symbols,
-        transitions=transitions,
-        initial_state=initial_state,
-        final_states=final_states,
-    )
+    return random_dfas(1, lower, upper)[0]
 
 
 def generate_random_nfa(
@@ -387,74 +442,8 @@ def generate_random_nfa(
     epsilon_density: float,
     accepting: int,
 ) -> NFA:
-    def int_to_lower(n: int) -> str:
-        return chr(n + 97)
-
-    # We shouldn't need random NFAs more than 26 states.
-    state_max = 26
-
-    if not (1 <= states < state_max):
-        raise ValueError("Cannot request an NFA with more than 26 states")
-    elif not (1 <= accepting <= states):
-        raise ValueError(
-            f"Cannot have {accepting} accept states in an NFA with {states} states"
-        )
-    elif not (0 <= edge_density <= 1.0):
-        raise ValueError(f"Edge density {edge_density} is not in the range [0.0, 1.0]")
-    elif not (0 <= epsilon_density <= 1.0):
-        raise ValueError(
-            f"Edge density {epsilon_density} is not in the range [0.0, 1.0]"
-        )
-
-    # Pick a number of edges between states and states*sqrt(states) (avoiding dense graphs)
-    edges = int(math.ceil(((states ** (1.5) - states) * edge_density) + states))
-
-    nfa = None
-    while nfa is None:
-        # Generate random graph until we find one with start state reachable to every other state
-        G: Optional[nx.Graph] = None
-        start = None
-        while start is None:
-            G = nx.gnm_random_graph(states, edges, directed=True)
-            assert G is not None
-            start_candidates = list(range(states))
-            shuffle(start_candidates)
-            for candidate in start_candidates:
-                if len(nx.shortest_path(G, source=candidate)) == states:
-                    start = candidate
-                    break
-
-        assert G is not None
-
-        # Assign all the nodes a state in the transitions dict.
-        transitions = {int_to_lower(v): dict() for v in G.nodes}
-
-        # Assign symbols to all the edges in the graph, choosing epsilons occasionally.
-        for u, v in G.edges:
-            symbol = "" if random() < epsilon_density else choice(alphabet)
-            transitions[int_to_lower(u)].setdefault(symbol, set()).add(int_to_lower(v))
-
-        # Create NFA data structures
-        nfa_states = set(string.ascii_lowercase[:states])
-        input_symbols = set(alphabet)
-        initial_state = int_to_lower(start)
-        final_states = set(string.ascii_lowercase[(states - accepting) : states])
-
-        nfa = NFA(
-            states=nfa_states,
-            input_symbols=input_symbols,
-            transitions=transitions,
-            initial_state=initial_state,
-            final_states=final_states,
-        )
-        equiv_dfa = DFA.from_nfa(nfa, retain_names=False)
-        equiv_dfa_comp = equiv_dfa.complement()
-
-        # Check to see if NFA both accepts and rejects strings, if not start over
-        if equiv_dfa_comp.isempty() or equiv_dfa.isempty():  # type: ignore
-            nfa = None
-
-    return nfa
+    "Generates a random NFA. See random_fa.random_nfas for details."
+    return random_nfas(1, states, alphabet, edge_density, epsilon_density, accepting)[0]
 
 
 def generate_dfa_html_description(dfa: DFA) -> str:
@@ -500,15 +489,18 @@ def dfa_read_input_from_state(dfa: DFA, state: DFAStateT, input: str) -> DFAStat
     Return the resulting state after reading the input.
     """
 
-    new_dfa = DFA(
-        states=dfa.states,
-        input_symbols=dfa.input_symbols,
-        transitions=dfa.transitions,
-        initial_state=state,
-        final_states=dfa.states,
-    )
+    compact = compact_dfa(dfa)
+    end_state = compact.state_names[
+        compact.read_input_from(compact.state_index(state), input)
+    ]
 
-    return new_dfa.read_input(input)
+    # Only the dead state added for partial DFAs has no name
+    if end_state is None:
+        raise exceptions.RejectionException(
+            f"{input} leads to a missing transition from state {state}"
+        )
+
+    return end_state
 
 
 def nfa_read_input_from_state(nfa: NFA, state: NFAStateT, input: str) -> Set[NFAStateT]:
@@ -518,15 +510,4 @@ def nfa_read_input_from_state(nfa: NFA, state: NFAStateT, input: str) -> Set[NFA
     Return the resulting state after reading the input.
     """
 
-    new_nfa = NFA(
-        states=nfa.states,
-        input_symbols=nfa.input_symbols,
-        transitions=nfa.transitions,
-        initial_state=state,
-        final_states=nfa.states,
-    )
-
-    try:
-        return new_nfa.read_input(input)
-    except exceptions.RejectionException:
-        return set()
+    return set(nfa_read_input_from(nfa, {state}, input))
@@ -0,0 +1,131 @@
+"""
+Cooperative time and size limits for grading. A grader opens a budget with
+grading_budget(), and the expensive automata conversions it calls check the
+current budget as they go, raising BudgetExceeded once a limit is hit. The
+budget lives in a context variable, so it doesn't need to be threaded through
+every call, and nested or concurrent gradings don't interfere.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Counter as CounterT
+from typing import Iterator, Optional
+
+# Generous for any reasonable submission, but bounded for pathological ones
+DEFAULT_TIME_LIMIT_SECONDS = 5.0
+DEFAULT_MAX_STATES = 5000
+
+logger = logging.getLogger(__name__)
+
+# Number of times each kind of limit ("time" or "states") was exceeded in this
+# process, for tests
+budget_exceeded_counts: CounterT[str] = Counter()
+
+
+class BudgetExceeded(ValueError):
+    """
+    Raised when grading exceeds its time or state budget. Subclasses ValueError
+    so that graders report it as a format error.
+    """
+
+
+def record_budget_exceeded(kind: str, reached: float, limit: float) -> None:
+    "Log that grading hit the given kind of limit, having reached the given value"
+
+    budget_exceeded_counts[kind] += 1
+    logger.warning(
+        "Grading exceeded its %s limit: reached %s, but the limit is %s",
+        kind,
+        reached,
+        limit,
+    )
+
+
+@dataclass(frozen=True)
+class GradingBudget:
+    """
+    A deadline and a limit on automaton sizes. Times are in time.monotonic()
+    seconds, and start is when grading began.
+    """
+
+    deadline: float
+    max_states: int
+    start: float
+
+    def check_time(self) -> None:
+        now = time.monotonic()
+        if now > self.deadline:
+            record_budget_exceeded(
+                "time",
+                round(now - self.start, 3),
+                round(self.deadline - self.start, 3),
+            )
+            raise BudgetExceeded(
+                "Grading this submission took too long. Try submitting a smaller answer."
+            )
+
+    def check_states(self, num_states: int) -> None:
+        if num_states > self.max_states:
+            record_budget_exceeded("states", num_states, self.max_states)
+            raise BudgetExceeded(
+                f"This submission is too large to grade: it needs {num_states} "
+                f"states, but at most {self.max_states} are allowed."
+            )
+
+
+_current_budget: ContextVar[Optional[GradingBudget]] = ContextVar(
+    "grading_budget", default=None
+)
+
+
+def current_budget() -> Optional[GradingBudget]:
+    "Return the innermost active grading budget, or None outside of grading"
+    return _current_budget.get()
+
+
+def check_budget(num_states: Optional[int] = None) -> None:
+    """
+    Raise BudgetExceeded if the active grading budget (if any) is out of time,
+    or if num_states is given and exceeds its state limit.
+    """
+
+    budget = _current_budget.get()
+    if budget is None:
+        return
+
+    budget.check_time()
+    if num_states is not None:
+        budget.check_states(num_states)
+
+
+@contextmanager
+def grading_budget(
+    time_limit: float = DEFAULT_TIME_LIMIT_SECONDS,
+    max_states: int = DEFAULT_MAX_STATES,
+) -> Iterator[GradingBudget]:
+    """
+    Limit the code run inside the with block to time_limit seconds, and the
+    automata it constructs to max_states states. When nested, the tighter of
+    the two limits applies.
+    """
+
+    start = time.monotonic()
+    budget = GradingBudget(start + time_limit, max_states, start)
+
+    outer_budget = _current_budget.get()
+    if outer_budget is not None:
+        budget = GradingBudget(
+            min(budget.deadline, outer_budget.deadline),
+            min(budget.max_states, outer_budget.max_states),
+            start,
+        )
+
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
@@ -1,13 +1,13 @@
 """Functions for error checking in converting JSON to FSMs"""
 
-import copy
+from collections import deque
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, TypedDict, TypeVar
+from typing import Any, TypedDict, TypeVar, cast
 
 from automata.fa.dfa import DFA
 from automata.fa.nfa import NFA
-from pyparsing import deque
+from theorielearn.automata_utils.compact_dfa import CompactDFA
 
 FSMRawJsonStateT = str
 FSMRawTransitionT = dict[FSMRawJsonStateT, dict[str, list[FSMRawJsonStateT]]]
@@ -50,6 +50,7 @@ class DFAJsonDict(TypedDict):
 NFAStateT = Any
 NFAPathT = dict[str, set[NFAStateT]]
 NFATransitionsT = dict[NFAStateT, NFAPathT]
+NFA_INITIAL_STATE_NAME = ""
 
 
 class NFAJsonDict(TypedDict):
@@ -76,207 +77,249 @@ class JsonValidationError(Exception):
     message: str
 
 
-def convert_states_for_json(
-    states_list: list[FSMRawJsonStateT],
-) -> list[FSMRawJsonStateT]:
+def find_fsm_json_errors(
+    fsm_dict: FSMRawJsonDict, fsm_type: FSMType, *, dump_state: bool = False
+) -> tuple[DFAJsonDict | NFAJsonDict, list[JsonValidationError]]:
     """
-    Check for duplicate states.
+    Convert a raw json dict to the json form of the DFA or NFA it defines,
+    checking the states and transitions in a single traversal. Returns the
+    converted dict along with every problem found, ordered so that the first
+    one is the one to show the student. The converted dict is only valid if
+    no problems were found.
     """
-    states = set()
-    duplicated_names = set()
-    for state in states_list:
-        if state == "":
-            raise JsonValidationError({state}, None, "Some states are missing a name.")
-        if state in states:
+    is_nfa = fsm_type is FSMType.NFA
+    input_symbols_set = list_as_set(fsm_dict["input_symbols"])
+    epsilon_symbol = fsm_dict["epsilon_symbol"] if is_nfa else None
+    errors: list[JsonValidationError] = []
+
+    # Check state names, keeping the first occurrence of each
+    states: list[FSMRawJsonStateT] = []
+    state_set: set[FSMRawJsonStateT] = set()
+    duplicated_names: set[FSMRawJsonStateT] = set()
+    for state in fsm_dict["states"]:
+        if state in state_set:
             duplicated_names.add(state)
         else:
-            states.add(state)
+            state_set.add(state)
+            states.append(state)
 
-    if duplicated_names:
-        raise JsonValidationError(duplicated_names, None, "Duplicate state names:")
-
-    return list(states)
-
-
-def convert_initial_state_for_json(
-    initial_state: list[FSMRawJsonStateT],
-) -> FSMRawJsonStateT:
-    """
-    Check there is only one initial state.
-    """
-    if len(initial_state) == 0:
-        raise JsonValidationError(None, None, "Your FSM is missing a start state.")
-    if len(initial_state) > 1:
-        transitions = {(None, None, state) for state in initial_state}
-        raise JsonValidationError(
-            set(initial_state), transitions, "Multiple states marked as start states:"
+    if "" in state_set:
+        errors.append(
+            JsonValidationError({""}, None, "Some states are missing a name.")
         )
+        duplicated_names.discard("")
 
-    return initial_state[0]
-
-
-def check_final_states_for_json(final_states: list[FSMRawJsonStateT]) -> None:
-    """
-    Check that final states are nonempty.
-    """
-    if len(final_states) == 0:
-        raise JsonValidationError(
-            None, None, "You must have at least one accepting state."
+    if duplicated_names:
+        errors.append(
+            JsonValidationError(duplicated_names, None, "Duplicate state names:")
         )
 
-
-def check_transitions_invalid_characters_for_json(
-    transitions: FSMRawTransitionT, input_symbols: set[str]
-) -> None:
-    """
-    Check for transitions on invalid characters.
-    """
-    invalid_transitions = set()
-    for start_state, transition in transitions.items():
-        for char, end_states in transition.items():
-            for end_state in end_states:
-                if char not in input_symbols:
-                    invalid_transitions.add((start_state, char, end_state))
-
-    if invalid_transitions:
-        raise JsonValidationError(
-            None, invalid_transitions, "Transitions on invalid characters:"
+    # Check there is only one initial state unless nfa
+    student_initial_states = fsm_dict["initial_state"]
+    if not student_initial_states:
+        errors.append(
+            JsonValidationError(None, None, "Your FSM is missing a start state.")
+        )
+    elif len(student_initial_states) > 1 and not is_nfa:
+        errors.append(
+            JsonValidationError(
+                set(student_initial_states),
+                {(None, None, state) for state in student_initial_states},
+                "Multiple states marked as start states:",
+            )
+        )
+    elif len(set(student_initial_states)) != len(student_initial_states):
+        errors.append(
+            JsonValidationError(
+                {
+                    state
+                    for state in student_initial_states
+                    if student_initial_states.count(state) > 1
+                },
+                None,
+                "State names with multiple start links:",
+            )
         )
 
+    # Check every transition once, building the converted transitions as we go
+    invalid_transitions: set[TransitionTupleT] = set()
+    duplicate_transitions: set[TransitionTupleT] = set()
+    missing_transitions: set[tuple[FSMRawJsonStateT, str]] = set()
+    dfa_transitions: DFATransitionsT = {}
+    nfa_transitions: FSMRawTransitionT = {}
 
-def check_transitions_missed_characters_for_json(
-    transitions: FSMRawTransitionT,
-    input_symbols: set[str],
-    dump_state_tuple: tuple[FSMRawJsonStateT, list[FSMRawJsonStateT]] | None,
-    epsilon_symbol: str | None,
-) -> None:
-    """
-    Check that transitioning on characters is never missed. If there is an
-    included dump state, then instead add transitions to the dump state.
-    """
-    missing_transitions: set[tuple[Any, str]] = set()
-    for start_state, transition in transitions.items():
-        output_chars = set(transition.keys())
-        missing_chars = input_symbols.difference(output_chars)
+    for start_state, transition in fsm_dict["transitions"].items():
+        dfa_transition: DFAPathT = {}
+        nfa_transition: dict[str, list[FSMRawJsonStateT]] = {}
 
-        # Epsilon symbol is never needed
-        if epsilon_symbol:
-            missing_chars.discard(epsilon_symbol)
+        for char, end_states in transition.items():
+            if char not in input_symbols_set:
+                invalid_transitions.update(
+                    (start_state, char, end_state) for end_state in end_states
+                )
 
-        if missing_chars:
+            if is_nfa:
+                # Identical transitions are an error, but an NFA may have
+                # several transitions on the same character
+                duplicate_transitions.update(
+                    (start_state, char, end_state)
+                    for end_state in end_states
+                    if end_states.count(end_state) > 1
+                )
+                nfa_transition["" if char == epsilon_symbol else char] = list(
+                    end_states
+                )
+            else:
+                if len(end_states) > 1:
+                    duplicate_transitions.update(
+                        (start_state, char, end_state) for end_state in end_states
+                    )
+                dfa_transition[char] = end_states[0]
+
+        if is_nfa:
+            nfa_transitions[start_state] = nfa_transition
+        else:
             missing_transitions.update(
-                (start_state, missing_char) for missing_char in missing_chars
+                (start_state, char)
+                for char in input_symbols_set.difference(transition.keys())
             )
+            dfa_transitions[start_state] = dfa_transition
 
-    if missing_transitions:
-        if dump_state_tuple is None:
-            # If no dump state, then raise an exception based on the missing transitions
-            missed_states = {state for state, _ in missing_transitions}
-
-            missing_transitions_display = {
-                (state, char, None) for state, char in missing_transitions
-            }
+    if invalid_transitions:
+        errors.append(
+            JsonValidationError(
+                None, invalid_transitions, "Transitions on invalid characters:"
+            )
+        )
 
-            raise JsonValidationError(
-                missed_states,
-                missing_transitions_display,
-                "States missing outgoing transitions:",
+    if duplicate_transitions:
+        errors.append(
+            JsonValidationError(
+                None,
+                duplicate_transitions,
+                "Identical transitions present:"
+                if is_nfa
+                else "Multiple transitions on the same character coming out of some states:",
             )
+        )
 
-        dump_state, states = dump_state_tuple
-        # If dump state allowed, add it to the DFA
-        states.append(dump_state)
+    # If a dump state is allowed, missing transitions go there instead
+    dump_state_name = None
+    if missing_transitions and dump_state:
+        dump_state_name = "dump"
+        while dump_state_name in state_set:
+            dump_state_name += "_"
 
-        # If a dump state is marked, then make missing transitions go there
+        states.append(dump_state_name)
         for start_state, char in missing_transitions:
-            transitions[start_state][char] = [dump_state]
-
-        # Then, make the dump state transition nowhere
-        transitions[dump_state] = {char: [dump_state] for char in input_symbols}
-
-
-def check_transitions_duplicate_characters_for_json(
-    transitions: FSMRawTransitionT,
-) -> None:
-    """
-    Check that there are no character duplicate transitions. Only needed for DFAs.
-    """
-    duplicate_transitions: set[tuple[Any, str, Any]] = set()
-    for start_state, transition in transitions.items():
-        for char, end_states in transition.items():
-            if len(end_states) > 1:
-                duplicate_transitions.update(
-                    (start_state, char, end_state) for end_state in end_states
-                )
+            dfa_transitions[start_state][char] = dump_state_name
+        dfa_transitions[dump_state_name] = {
+            char: dump_state_name for char in input_symbols_set
+        }
 
-    if duplicate_transitions:
-        raise JsonValidationError(
-            None,
-            duplicate_transitions,
-            "Multiple transitions on the same character coming out of some states:",
+    elif missing_transitions:
+        errors.append(
+            JsonValidationError(
+                {state for state, _ in missing_transitions},
+                {(state, char, None) for state, char in missing_transitions},
+                "States missing outgoing transitions:",
+            )
         )
 
+    final_states = fsm_dict["final_states"]
+    if not final_states:
+        errors.append(
+            JsonValidationError(
+                None, None, "You must have at least one accepting state."
+            )
+        )
 
-def check_transitions_redundant_for_json(transitions: FSMRawTransitionT) -> None:
-    """
-    Check that there are no identical transitions. Only needed for NFAs. This
-    is a less stringent check than check_transitions_duplicate_characters_for_json
-    """
-    transition_set = set()
-    redundant_transitions = set()
-    for start_state, transition in transitions.items():
-        for char, end_states in transition.items():
-            for end_state in end_states:
-                transition_tuple = (start_state, char, end_state)
-
-                if transition_tuple in transition_set:
-                    redundant_transitions.add(transition_tuple)
+    input_symbols = [
+        symbol for symbol in fsm_dict["input_symbols"] if symbol != epsilon_symbol
+    ]
+
+    fsm_json: DFAJsonDict | NFAJsonDict
+    if is_nfa:
+        # Replace multiple start states with a new initial state with epsilon
+        # transitions to all student start states
+        initial_states = list(dict.fromkeys(student_initial_states))
+        if len(initial_states) == 1:
+            initial_state = initial_states[0]
+        else:
+            initial_state = NFA_INITIAL_STATE_NAME
+            nfa_transitions[initial_state] = {"": initial_states}
+            states.append(initial_state)
+
+        fsm_json = {
+            "states": states,
+            "input_symbols": input_symbols,
+            "transitions": nfa_transitions,
+            "initial_state": initial_state,
+            "final_states": final_states,
+        }
+        reachable = _reachable_states(
+            initial_state,
+            {
+                state: [end for end_states in path.values() for end in end_states]
+                for state, path in nfa_transitions.items()
+            },
+        )
+    else:
+        initial_state = student_initial_states[0] if student_initial_states else None
+
+        fsm_json = {
+            "states": states,
+            "input_symbols": input_symbols,
+            "transitions": dfa_transitions,
+            "initial_state": initial_state,
+            "final_states": final_states,
+        }
+        reachable = _reachable_states(
+            initial_state,
+            {state: list(path.values()) for state, path in dfa_transitions.items()},
+        )
 
-                else:
-                    transition_set.add(transition_tuple)
+    unreachable_states = set(states) - reachable
+    unreachable_states.discard(dump_state_name)
 
-    if redundant_transitions:
-        raise JsonValidationError(
-            None, redundant_transitions, "Identical transitions present:"
+    if student_initial_states and unreachable_states:
+        errors.append(
+            JsonValidationError(unreachable_states, None, "Unreachable states present:")
         )
 
+    return fsm_json, errors
 
-def get_reachable_nodes(fa: DFA | NFA) -> set[Any]:
-    next_deque: deque[Any] = deque()
-    seen: set[Any] = {fa.initial_state}
 
-    next_deque.append(fa.initial_state)
+def _reachable_states(
+    initial_state: FSMRawJsonStateT, successors: dict[Any, list[Any]]
+) -> set[Any]:
+    next_deque: deque[Any] = deque([initial_state])
+    seen: set[Any] = {initial_state}
 
     while next_deque:
         state = next_deque.popleft()
 
-        for next_state in fa.transitions[state].values():
-            neighbors: list[Any] = []
-            if isinstance(fa, NFA):
-                neighbors.extend(next_state)
-            else:
-                neighbors.append(next_state)
-
-            for next_node in neighbors:
-                if next_node in seen:
-                    continue
-
-                seen.add(next_node)
-                next_deque.append(next_node)
+        for next_state in successors.get(state, ()):
+            if next_state not in seen:
+                seen.add(next_state)
+                next_deque.append(next_state)
 
     return seen
 
 
-def check_for_unreachable_states(fa: DFA | NFA, dump_state_name: str | None) -> None:
-    unreachable_states = set(fa.states) - get_reachable_nodes(fa)
+def convert_fsm_json(
+    fsm_dict: FSMRawJsonDict, fsm_type: FSMType, *, dump_state: bool = False
+) -> DFAJsonDict | NFAJsonDict:
+    """
+    Convert raw json dict for serialization as a DFA or NFA. Raise the first
+    problem found by find_fsm_json_errors if the input JSON is invalid.
+    """
+    fsm_json, errors = find_fsm_json_errors(fsm_dict, fsm_type, dump_state=dump_state)
 
-    if dump_state_name is not None:
-        unreachable_states.discard(dump_state_name)
+    if errors:
+        raise errors[0]
 
-    if len(unreachable_states) > 0:
-        raise JsonValidationError(
-            unreachable_states, None, "Unreachable states present:"
-        )
+    return fsm_json
 
 
 def dfa_convert_json(dfa_dict: FSMRawJsonDict, *, dump_state: bool) -> DFAJsonDict:
@@ -284,59 +327,9 @@ def dfa_convert_json(dfa_dict: FSMRawJsonDict, *, dump_state: bool) -> DFAJsonDi
     Convert raw json dict for serialization as a DFA. Raise an exception if
     the input JSON defines an invalid DFA.
     """
-    # Load inital alphabet
-    input_symbols_set = list_as_set(dfa_dict["input_symbols"])
-
-    states = convert_states_for_json(dfa_dict["states"])
-
-    initial_state = convert_initial_state_for_json(dfa_dict["initial_state"])
-
-    # Finally, the transition dictionary is one-to-one with the automata constructor.
-    transitions = copy.deepcopy(dfa_dict["transitions"])
-    check_transitions_invalid_characters_for_json(transitions, input_symbols_set)
-    check_transitions_duplicate_characters_for_json(transitions)
-
-    dump_state_name = None
-
-    if dump_state:
-        # If dump state is marked, add it to the states set and then do the transition check
-        dump_state_name = "dump"
-
-        while dump_state_name in states:
-            dump_state_name += "_"
-
-        # Make sure dump state is a string, otherwise causes weird issues
-        check_transitions_missed_characters_for_json(
-            transitions, input_symbols_set, (dump_state_name, states), None
-        )
-
-    else:
-        # If dump state is not marked, check as normal
-        check_transitions_missed_characters_for_json(
-            transitions, input_symbols_set, None, None
-        )
-
-    transformed_transitions = {
-        start_state: {char: end_states[0] for char, end_states in transition.items()}
-        for start_state, transition in transitions.items()
-    }
-
-    input_symbols = list(input_symbols_set)
-
-    final_states = dfa_dict["final_states"]
-    check_final_states_for_json(final_states)
-
-    dfa_json_dict: DFAJsonDict = {
-        "states": states,
-        "input_symbols": input_symbols,
-        "transitions": transformed_transitions,
-        "initial_state": initial_state,
-        "final_states": final_states,
-    }
-
-    check_for_unreachable_states(dfa_from_json(dfa_json_dict), dump_state_name)
-
-    return dfa_json_dict
+    return cast(
+        DFAJsonDict, convert_fsm_json(dfa_dict, FSMType.DFA, dump_state=dump_state)
+    )
 
 
 def nfa_convert_json(nfa_dict: FSMRawJsonDict) -> NFAJsonDict:
@@ -344,43 +337,29 @@ def nfa_convert_json(nfa_dict: FSMRawJsonDict) -> NFAJsonDict:
     Convert raw json dict for serialization as a NFA. Raise an exception if
     the input JSON defines an invalid NFA.
     """
-    # Load inital alphabet
-    input_symbols_set = list_as_set(nfa_dict["input_symbols"])
-
-    states = convert_states_for_json(nfa_dict["states"])
-
-    initial_state = convert_initial_state_for_json(nfa_dict["initial_state"])
+    return cast(NFAJsonDict, convert_fsm_json(nfa_dict, FSMType.NFA))
 
-    # Finally, the transition dictionary is one-to-one with the automata constructor.
-    transitions = copy.deepcopy(nfa_dict["transitions"])
-    check_transitions_invalid_characters_for_json(transitions, input_symbols_set)
-    check_transitions_redundant_for_json(transitions)
 
-    epsilon_symbol = nfa_dict["epsilon_symbol"]
-
-    # Replace epsilon transitions
-    for transition in transitions.values():
-        if epsilon_symbol in transition:
-            transition[""] = transition.pop(epsilon_symbol)
-
-    input_symbols = list(input_symbols_set)
-    input_symbols.remove(epsilon_symbol)
-
-    final_states = nfa_dict["final_states"]
-    check_final_states_for_json(final_states)
-
-    nfa_json_dict: NFAJsonDict = {
-        "states": states,
-        "input_symbols": input_symbols,
-        "transitions": transitions,
-        "initial_state": initial_state,
-        "final_states": final_states,
+def canonical_fsm_json(fsm_json: DFAJsonDict | NFAJsonDict) -> dict[str, Any]:
+    """
+    Return a copy of the converted json form of an FSM with every list sorted,
+    so that FSMs drawn with their states or links in a different order have
+    equal canonical forms (and equal JSON dumps with sort_keys).
+    """
+    return {
+        "states": sorted(fsm_json["states"]),
+        "input_symbols": sorted(fsm_json["input_symbols"]),
+        "transitions": {
+            start_state: {
+                char: sorted(end_states) if isinstance(end_states, list) else end_states
+                for char, end_states in transition.items()
+            }
+            for start_state, transition in fsm_json["transitions"].items()
+        },
+        "initial_state": fsm_json["initial_state"],
+        "final_states": sorted(fsm_json["final_states"]),
     }
 
-    check_for_unreachable_states(nfa_from_json(nfa_json_dict), None)
-
-    return nfa_json_dict
-
 
 T = TypeVar("T")
 
@@ -421,6 +400,17 @@ def nfa_from_json(json_nfa: NFAJsonDict) -> NFA:
     )
 
 
+def compact_dfa_from_json(json_dfa: DFAJsonDict) -> CompactDFA:
+    "Build the compact form of a DFA directly from its json form"
+    return CompactDFA.from_transitions(
+        json_dfa["input_symbols"],
+        json_dfa["states"],
+        json_dfa["transitions"],
+        json_dfa["initial_state"],
+        json_dfa["final_states"],
+    )
+
+
 def dfa_from_json(json_dfa: DFAJsonDict) -> DFA:
     states = list_as_set(json_dfa["states"])
     input_symbols = list_as_set(json_dfa["input_symbols"])
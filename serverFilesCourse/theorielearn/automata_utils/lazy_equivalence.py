@@ -0,0 +1,237 @@
+"""
+On-the-fly equivalence checking for (student) NFAs. Instead of determinizing
+both automata up front, subsets are only constructed as the Hopcroft-Karp
+search reaches them, so the search stops at the first distinguishing word and
+can give up cleanly once a state budget (or the active grading budget) is
+exhausted.
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple, Union
+
+from automata.fa.dfa import DFA
+from automata.fa.nfa import NFA
+from theorielearn.automata_utils.compact_dfa import CompactDFA, compact_dfa
+from theorielearn.automata_utils.grading_budget import (
+    DEFAULT_MAX_STATES,
+    BudgetExceeded,
+    check_budget,
+    current_budget,
+    record_budget_exceeded,
+)
+from theorielearn.automata_utils.subset_table import (
+    epsilon_closure_masks,
+    indices_to_mask,
+    union_over,
+)
+
+
+class StateBudgetExceeded(BudgetExceeded):
+    "Raised when determinizing an automaton needs more states than allowed"
+
+
+class LazyDeterminizer:
+    """
+    The subset construction of an NFA, expanded on demand. Subsets are closed
+    under epsilon transitions, stored as bitmasks over the NFA states, and
+    numbered in the order they are discovered (so the initial subset is 0).
+
+    If a grading budget is active, its state limit applies when it is tighter
+    than max_states, and its deadline is checked as subsets are constructed.
+    """
+
+    __slots__ = [
+        "input_symbols",
+        "max_states",
+        "_final_mask",
+        "_closures",
+        "_symbol_masks",
+        "_subsets",
+        "_subset_index",
+        "_transitions",
+    ]
+
+    input_symbols: Tuple[str, ...]
+    max_states: int
+    _final_mask: int
+    _closures: List[int]
+    _symbol_masks: Dict[str, List[int]]
+    _subsets: List[int]
+    _subset_index: Dict[int, int]
+    _transitions: List[Dict[str, int]]
+
+    def __init__(self, nfa: NFA, max_states: int = DEFAULT_MAX_STATES) -> None:
+        states = sorted(nfa.states, key=str)
+        state_index = {state: i for i, state in enumerate(states)}
+
+        def successor_indices(state: object, symbol: str) -> List[int]:
+            return [
+                state_index[end_state]
+                for end_state in nfa.transitions.get(state, {}).get(symbol, ())
+            ]
+
+        self.input_symbols = tuple(sorted(nfa.input_symbols))
+        budget = current_budget()
+        self.max_states = (
+            max_states if budget is None else min(max_states, budget.max_states)
+        )
+        self._final_mask = indices_to_mask(
+            state_index[state] for state in nfa.final_states
+        )
+        self._closures = epsilon_closure_masks(
+            [successor_indices(state, "") for state in states]
+        )
+        self._symbol_masks = {
+            symbol: [
+                indices_to_mask(successor_indices(state, symbol)) for state in states
+            ]
+            for symbol in self.input_symbols
+        }
+        self._subsets = []
+        self._subset_index = {}
+        self._transitions = []
+
+        self._add_subset(self._closures[state_index[nfa.initial_state]])
+
+    def __len__(self) -> int:
+        "Number of subsets constructed so far"
+        return len(self._subsets)
+
+    def is_final(self, state: int) -> bool:
+        return bool(self._subsets[state] & self._final_mask)
+
+    def step(self, state: int, symbol: str) -> int:
+        "Return the subset reached from state on symbol, constructing it if needed"
+
+        next_state = self._transitions[state].get(symbol)
+
+        if next_state is None:
+            moved = union_over(self._symbol_masks[symbol], self._subsets[state])
+            next_subset = union_over(self._closures, moved)
+
+            next_state = self._subset_index.get(next_subset)
+            if next_state is None:
+                next_state = self._add_subset(next_subset)
+
+            self._transitions[state][symbol] = next_state
+
+        return next_state
+
+    def to_dfa(self) -> DFA:
+        """
+        Construct every reachable subset (within the state budget) and return
+        the resulting complete DFA, with subsets numbered from 0.
+        """
+
+        queue: Deque[int] = deque([0])
+        seen = {0}
+
+        while queue:
+            state = queue.popleft()
+            for symbol in self.input_symbols:
+                next_state = self.step(state, symbol)
+                if next_state not in seen:
+                    seen.add(next_state)
+                    queue.append(next_state)
+
+        return DFA(
+            states=set(range(len(self))),
+            input_symbols=set(self.input_symbols),
+            transitions={
+                state: dict(transition)
+                for state, transition in enumerate(self._transitions)
+            },
+            initial_state=0,
+            final_states={state for state in range(len(self)) if self.is_final(state)},
+        )
+
+    def _add_subset(self, subset: int) -> int:
+        if len(self._subsets) >= self.max_states:
+            record_budget_exceeded("states", len(self._subsets) + 1, self.max_states)
+            raise StateBudgetExceeded(
+                "This automaton is too large to grade: converting it to a DFA "
+                f"needs more than {self.max_states} states."
+            )
+
+        check_budget()
+
+        self._subset_index[subset] = len(self._subsets)
+        self._subsets.append(subset)
+        self._transitions.append({})
+
+        return self._subset_index[subset]
+
+
+def lazy_automaton(
+    fa: Union[DFA, NFA], max_states: int = DEFAULT_MAX_STATES
+) -> Union[CompactDFA, LazyDeterminizer]:
+    """
+    Return a deterministic view of fa with integer states (0 being initial),
+    supporting is_final and step. DFAs are used as is.
+    """
+
+    if isinstance(fa, DFA):
+        return compact_dfa(fa)
+
+    return LazyDeterminizer(fa, max_states)
+
+
+def find_counterexample(
+    submitted_fa: Union[DFA, NFA],
+    reference_fa: Union[DFA, NFA],
+    *,
+    max_states: int = DEFAULT_MAX_STATES,
+) -> Optional[Tuple[str, bool]]:
+    """
+    Check whether two automata are equivalent with the Hopcroft-Karp algorithm,
+    merging pairs of states that must be equivalent with a union-find structure.
+    Returns a word they disagree on, along with whether the submitted automaton
+    accepts it, or None if they are equivalent. Stops at the first such word,
+    which is not necessarily the shortest.
+
+    Raises StateBudgetExceeded if either automaton needs more than max_states
+    subsets to be explored.
+    """
+
+    if submitted_fa.input_symbols != reference_fa.input_symbols:
+        raise ValueError("Input symbols for submitted FA don't match reference")
+
+    submitted = lazy_automaton(submitted_fa, max_states)
+    reference = lazy_automaton(reference_fa, max_states)
+    input_symbols = sorted(reference_fa.input_symbols)
+
+    # Union-find over the disjoint union of the two state sets. Submitted
+    # states are keyed by their index and reference states by ~index.
+    parents: Dict[int, int] = {}
+
+    def find(key: int) -> int:
+        while parents.get(key, key) != key:
+            parent = parents[key]
+            grandparent = parents.get(parent, parent)
+            parents[key] = grandparent
+            key = grandparent
+        return key
+
+    parents[0] = ~0
+    queue: Deque[Tuple[int, int, str]] = deque([(0, 0, "")])
+
+    while queue:
+        check_budget()
+        submitted_state, reference_state, word = queue.popleft()
+
+        submitted_accepts = submitted.is_final(submitted_state)
+        if submitted_accepts != reference.is_final(reference_state):
+            return word, submitted_accepts
+
+        for symbol in input_symbols:
+            next_submitted = submitted.step(submitted_state, symbol)
+            next_reference = reference.step(reference_state, symbol)
+
+            submitted_root = find(next_submitted)
+            reference_root = find(~next_reference)
+
+            if submitted_root != reference_root:
+                parents[submitted_root] = reference_root
+                queue.append((next_submitted, next_reference, word + symbol))
+
+    return None
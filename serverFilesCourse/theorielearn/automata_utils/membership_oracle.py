@@ -0,0 +1,54 @@
+"""
+Memoized language membership for external graders. Questions define their
+language with a predicate (isInLanguage in language_definition.py), which the
+fooling set grader calls for every pair of fooling set elements, often on the
+same word. An oracle remembers each answer, so every word is only checked
+once per process.
+"""
+
+import weakref
+from types import ModuleType
+from typing import Callable, Dict
+
+
+class MembershipOracle:
+    "A membership predicate which remembers its answer for every word"
+
+    __slots__ = ["_is_member", "_results"]
+
+    _is_member: Callable[[str], bool]
+    _results: Dict[str, bool]
+
+    def __init__(self, is_member: Callable[[str], bool]) -> None:
+        self._is_member = is_member
+        self._results = {}
+
+    def __call__(self, word: str) -> bool:
+        result = self._results.get(word)
+
+        if result is None:
+            result = self._results[word] = bool(self._is_member(word))
+
+        return result
+
+
+# Oracles already built by this process. Every question's module is named
+# language_definition, so they are keyed by the module object itself.
+_oracle_cache: "weakref.WeakKeyDictionary[ModuleType, MembershipOracle]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def language_oracle(language_definition: ModuleType) -> MembershipOracle:
+    """
+    Return the membership oracle for the isInLanguage predicate of a
+    question's language_definition module, building it only once per module.
+    """
+
+    oracle = _oracle_cache.get(language_definition)
+
+    if oracle is None:
+        oracle = MembershipOracle(language_definition.isInLanguage)
+        _oracle_cache[language_definition] = oracle
+
+    return oracle
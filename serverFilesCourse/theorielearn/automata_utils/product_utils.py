@@ -0,0 +1,184 @@
+"""Counterexample search over the product of a submitted DFA and a reference DFA."""
+
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from theorielearn.automata_utils.compact_dfa import (
+    DFALikeT,
+    compact_dfa,
+    count_walks_by_length,
+)
+from theorielearn.automata_utils.grading_budget import check_budget
+from theorielearn.automata_utils.word_enumeration import shortlex_walks
+
+# Pair of (submitted, reference) compact DFA state indices
+ProductStateT = Tuple[int, int]
+
+
+class DFAProduct:
+    """
+    The reachable part of the product of a submitted DFA and a reference DFA.
+    Product states are numbered in breadth-first order from the initial state
+    (which is always 0), and transitions are stored per symbol in sorted
+    alphabet order so that words come out in shortlex order.
+    """
+
+    __slots__ = ["input_symbols", "_transitions", "_false_positive", "_false_negative"]
+
+    input_symbols: Tuple[str, ...]
+    _transitions: List[List[int]]
+    _false_positive: List[bool]
+    _false_negative: List[bool]
+
+    def __init__(self, submitted_dfa: DFALikeT, reference_dfa: DFALikeT) -> None:
+        submitted = compact_dfa(submitted_dfa)
+        reference = compact_dfa(reference_dfa)
+
+        if submitted.input_symbols != reference.input_symbols:
+            raise ValueError("Input symbols for submitted DFA don't match reference")
+
+        num_symbols = len(reference.input_symbols)
+
+        self.input_symbols = reference.input_symbols
+        self._transitions = []
+        self._false_positive = []
+        self._false_negative = []
+
+        # Both compact DFAs start in state 0
+        state_index: Dict[ProductStateT, int] = {(0, 0): 0}
+        queue: Deque[ProductStateT] = deque([(0, 0)])
+
+        while queue:
+            check_budget()
+            submitted_state, reference_state = queue.popleft()
+
+            submitted_accepts = submitted.is_final(submitted_state)
+            reference_accepts = reference.is_final(reference_state)
+            self._false_positive.append(submitted_accepts and not reference_accepts)
+            self._false_negative.append(reference_accepts and not submitted_accepts)
+
+            submitted_offset = submitted_state * num_symbols
+            reference_offset = reference_state * num_symbols
+
+            row = []
+            for i in range(num_symbols):
+                next_state = (
+                    submitted.transitions[submitted_offset + i],
+                    reference.transitions[reference_offset + i],
+                )
+
+                if next_state not in state_index:
+                    state_index[next_state] = len(state_index)
+                    queue.append(next_state)
+
+                row.append(state_index[next_state])
+
+            self._transitions.append(row)
+
+    def __len__(self) -> int:
+        return len(self._transitions)
+
+    def is_equivalent(self) -> bool:
+        """Return True if no reachable product state distinguishes the two DFAs."""
+        return not any(self._false_positive) and not any(self._false_negative)
+
+    def iter_counterexamples(
+        self, max_length: int, *, false_positive: bool
+    ) -> Iterator[str]:
+        """
+        Lazily yield every false positive (or false negative) of length at most
+        max_length in shortlex order. Only prefixes that can still be completed
+        into a counterexample of the current length are explored, so the work
+        done is proportional to the number of words yielded.
+        """
+
+        targets = self._false_positive if false_positive else self._false_negative
+
+        return shortlex_walks(
+            self.input_symbols, self._transitions, targets, 0, max_length
+        )
+
+    def shortest_counterexample(self) -> Optional[Tuple[str, bool]]:
+        """
+        Return the shortlex-least word the two DFAs disagree on, along with
+        whether it is a false positive. Returns None if the DFAs are equivalent.
+        """
+
+        parents: List[Optional[Tuple[int, str]]] = [None] * len(self)
+        seen = [False] * len(self)
+        seen[0] = True
+        queue: Deque[int] = deque([0])
+
+        while queue:
+            state = queue.popleft()
+
+            if self._false_positive[state] or self._false_negative[state]:
+                return self._word_to(state, parents), self._false_positive[state]
+
+            for symbol, next_state in zip(self.input_symbols, self._transitions[state]):
+                if not seen[next_state]:
+                    seen[next_state] = True
+                    parents[next_state] = (state, symbol)
+                    queue.append(next_state)
+
+        return None
+
+    def shortest_witnesses(self) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return the shortlex-least false positive and false negative (or None if
+        there are none), found with a single breadth-first search. So the
+        submitted DFA accepts a subset of the reference's language if the first
+        is None, and a superset if the second is.
+        """
+
+        parents: List[Optional[Tuple[int, str]]] = [None] * len(self)
+        seen = [False] * len(self)
+        seen[0] = True
+        queue: Deque[int] = deque([0])
+        false_positive: Optional[str] = None
+        false_negative: Optional[str] = None
+
+        # Breadth-first search in sorted symbol order reaches each state by its
+        # shortlex-least word first
+        while queue and (false_positive is None or false_negative is None):
+            state = queue.popleft()
+
+            if false_positive is None and self._false_positive[state]:
+                false_positive = self._word_to(state, parents)
+            if false_negative is None and self._false_negative[state]:
+                false_negative = self._word_to(state, parents)
+
+            for symbol, next_state in zip(self.input_symbols, self._transitions[state]):
+                if not seen[next_state]:
+                    seen[next_state] = True
+                    parents[next_state] = (state, symbol)
+                    queue.append(next_state)
+
+        return false_positive, false_negative
+
+    def count_counterexamples_by_length(self, max_length: int) -> List[int]:
+        """
+        Return a list whose n-th entry is the number of words of length n the
+        two DFAs disagree on, for every n up to max_length.
+        """
+
+        disagrees = np.logical_or(self._false_positive, self._false_negative)
+        transition_table = np.array(self._transitions, dtype=np.intp).reshape(
+            len(self), len(self.input_symbols)
+        )
+
+        return count_walks_by_length(transition_table, disagrees, max_length)
+
+    @staticmethod
+    def _word_to(state: int, parents: List[Optional[Tuple[int, str]]]) -> str:
+        "Return the word spelled by following parents back from state"
+
+        symbols = []
+        parent = parents[state]
+        while parent is not None:
+            parent_state, symbol = parent
+            symbols.append(symbol)
+            parent = parents[parent_state]
+
+        return "".join(reversed(symbols))
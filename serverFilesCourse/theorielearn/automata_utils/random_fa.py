@@ -0,0 +1,312 @@
+"""
+Rejection samplers for random DFAs and NFAs used in question generation.
+
+Candidates are drawn directly as integer transition tables and checked against
+the cheapest invariants first (reachability, accepting state counts), so that
+the more expensive checks (minimality, subset construction) only run on
+candidates that could be accepted. Every generator takes an optional seed so
+that pools of variants can be reproduced.
+"""
+
+import math
+import random
+import string
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from automata.fa.dfa import DFA
+from automata.fa.nfa import NFA
+from theorielearn.automata_utils.subset_table import indices_to_mask, union_over
+
+# Generous, but guarantees termination for unsatisfiable constraints
+MAX_ATTEMPTS_PER_AUTOMATON = 10_000
+
+# NFA states are named with single lowercase letters
+MAX_NFA_STATES = 26
+
+SeedT = Union[int, random.Random, None]
+
+
+class GenerationError(ValueError):
+    "Raised when no automaton satisfying the constraints was found"
+
+
+def get_rng(seed: SeedT) -> random.Random:
+    """
+    Return a random number generator for the given seed. Without a seed, the
+    generator is derived from the global random state, so that generation is
+    still reproducible when the caller seeds the random module.
+    """
+
+    if isinstance(seed, random.Random):
+        return seed
+
+    if seed is None:
+        return random.Random(random.getrandbits(64))
+
+    return random.Random(seed)
+
+
+def _reachable(adjacency: Sequence[Sequence[int]], start: int) -> int:
+    "Return the set of vertices reachable from start, as a bitmask"
+
+    seen = 1 << start
+    queue = deque([start])
+
+    while queue:
+        vertex = queue.popleft()
+        for next_vertex in adjacency[vertex]:
+            if not seen >> next_vertex & 1:
+                seen |= 1 << next_vertex
+                queue.append(next_vertex)
+
+    return seen
+
+
+def _is_minimal(table: Sequence[Sequence[int]], final_states: Set[int]) -> bool:
+    """
+    Check whether a complete DFA whose states are all reachable is minimal, by
+    Moore partition refinement over the transition table.
+    """
+
+    num_states = len(table)
+    block = [int(state in final_states) for state in range(num_states)]
+    num_blocks = len(set(block))
+
+    while True:
+        signatures: Dict[Tuple[int, ...], int] = {}
+        new_block = [
+            signatures.setdefault(
+                (block[state], *(block[next_state] for next_state in table[state])),
+                len(signatures),
+            )
+            for state in range(num_states)
+        ]
+
+        if len(signatures) == num_blocks:
+            return num_blocks == num_states
+
+        block = new_block
+        num_blocks = len(signatures)
+
+
+def random_dfas(
+    count: int,
+    lower: int,
+    upper: int,
+    *,
+    input_symbols: str = "01",
+    require_minimal: bool = False,
+    seed: SeedT = None,
+) -> List[DFA]:
+    """
+    Generate count random complete DFAs with n states, where lower <= n <= upper.
+    States are the integers 0..n-1 and every state is reachable from the initial
+    state. Each DFA has at least one accepting and one rejecting state, so its
+    language is neither empty nor everything. If require_minimal is set, the
+    DFAs are also minimal.
+    """
+
+    if not 1 <= lower <= upper:
+        raise ValueError(f"Invalid range of state counts [{lower}, {upper}].")
+
+    rng = get_rng(seed)
+    symbols = sorted(input_symbols)
+    dfas: List[DFA] = []
+
+    for _ in range(count * MAX_ATTEMPTS_PER_AUTOMATON):
+        if len(dfas) == count:
+            break
+
+        n = rng.randint(lower, upper)
+        initial_state = rng.randrange(n)
+        table = [[rng.randrange(n) for _ in symbols] for _ in range(n)]
+
+        # Cheapest checks first: reachability, then accepting states
+        if _reachable(table, initial_state) != (1 << n) - 1:
+            continue
+
+        final_states = {state for state in range(n) if rng.random() < 0.5}
+        if not 0 < len(final_states) < n:
+            continue
+
+        if require_minimal and not _is_minimal(table, final_states):
+            continue
+
+        dfas.append(
+            DFA(
+                states=set(range(n)),
+                input_symbols=set(symbols),
+                transitions={
+                    state: dict(zip(symbols, table[state])) for state in range(n)
+                },
+                initial_state=initial_state,
+                final_states=final_states,
+            )
+        )
+
+    if len(dfas) < count:
+        raise GenerationError(f"Could only generate {len(dfas)} of {count} DFAs.")
+
+    return dfas
+
+
+def _subset_construction_info(
+    num_states: int,
+    epsilon_edges: Sequence[Sequence[int]],
+    symbol_edges: Sequence[Sequence[Sequence[int]]],
+    initial_state: int,
+    final_mask: int,
+) -> Tuple[int, bool]:
+    """
+    Run the subset construction on bitmasks. Return the number of reachable
+    subset states (including the empty set, if reachable), and whether every
+    one of them is accepting (i.e. whether the NFA accepts every word).
+    """
+
+    closures = [_reachable(epsilon_edges, state) for state in range(num_states)]
+
+    symbol_masks = [
+        [indices_to_mask(next_states) for next_states in edges]
+        for edges in symbol_edges
+    ]
+
+    start = closures[initial_state]
+    seen = {start}
+    queue = deque([start])
+    accepts_everything = True
+
+    while queue:
+        subset = queue.popleft()
+        accepts_everything = accepts_everything and bool(subset & final_mask)
+
+        for masks in symbol_masks:
+            next_subset = union_over(closures, union_over(masks, subset))
+            if next_subset not in seen:
+                seen.add(next_subset)
+                queue.append(next_subset)
+
+    return len(seen), accepts_everything
+
+
+def random_nfas(
+    count: int,
+    states: int,
+    alphabet: str,
+    edge_density: float,
+    epsilon_density: float,
+    accepting: int,
+    *,
+    min_subset_states: Optional[int] = None,
+    max_subset_states: Optional[int] = None,
+    seed: SeedT = None,
+) -> List[NFA]:
+    """
+    Generate count random NFAs whose states are the first few lowercase letters,
+    with the last few being accepting. Every state is reachable from the initial
+    state, and each NFA accepts some but not all words. If given, the number of
+    states reachable in the subset construction (including the empty set) is
+    between min_subset_states and max_subset_states.
+    """
+
+    if not (1 <= states < MAX_NFA_STATES):
+        raise ValueError("Cannot request an NFA with more than 26 states")
+    elif not (1 <= accepting <= states):
+        raise ValueError(
+            f"Cannot have {accepting} accept states in an NFA with {states} states"
+        )
+    elif not (0 <= edge_density <= 1.0):
+        raise ValueError(f"Edge density {edge_density} is not in the range [0.0, 1.0]")
+    elif not (0 <= epsilon_density <= 1.0):
+        raise ValueError(
+            f"Edge density {epsilon_density} is not in the range [0.0, 1.0]"
+        )
+
+    rng = get_rng(seed)
+    symbols = sorted(alphabet)
+
+    # Pick a number of edges between states and states*sqrt(states) (avoiding dense graphs)
+    num_edges = min(
+        int(math.ceil(((states ** (1.5) - states) * edge_density) + states)),
+        states * (states - 1),
+    )
+    possible_edges = [(u, v) for u in range(states) for v in range(states) if u != v]
+    final_mask = ((1 << accepting) - 1) << (states - accepting)
+    state_names = string.ascii_lowercase[:states]
+
+    nfas: List[NFA] = []
+
+    for _ in range(count * MAX_ATTEMPTS_PER_AUTOMATON):
+        if len(nfas) == count:
+            break
+
+        edges = rng.sample(possible_edges, num_edges)
+        adjacency: List[List[int]] = [[] for _ in range(states)]
+        for u, v in edges:
+            adjacency[u].append(v)
+
+        # Cheapest check first: some state must be able to reach every other state
+        start_candidates = list(range(states))
+        rng.shuffle(start_candidates)
+        start = next(
+            (
+                candidate
+                for candidate in start_candidates
+                if _reachable(adjacency, candidate) == (1 << states) - 1
+            ),
+            None,
+        )
+
+        if start is None:
+            continue
+
+        # Assign symbols to all the edges, choosing epsilons occasionally
+        epsilon_edges: List[List[int]] = [[] for _ in range(states)]
+        symbol_edges = [[[] for _ in range(states)] for _ in symbols]
+        for u, v in edges:
+            if rng.random() < epsilon_density:
+                epsilon_edges[u].append(v)
+            else:
+                symbol_edges[rng.randrange(len(symbols))][u].append(v)
+
+        # Every state is reachable and some are accepting, so the language is
+        # nonempty. Determinize on bitmasks to check the complement is too.
+        num_subset_states, accepts_everything = _subset_construction_info(
+            states, epsilon_edges, symbol_edges, start, final_mask
+        )
+
+        if (
+            accepts_everything
+            or (min_subset_states is not None and num_subset_states < min_subset_states)
+            or (max_subset_states is not None and num_subset_states > max_subset_states)
+        ):
+            continue
+
+        transitions: Dict[str, Dict[str, Set[str]]] = {
+            name: dict() for name in state_names
+        }
+        for u in range(states):
+            if epsilon_edges[u]:
+                transitions[state_names[u]][""] = {
+                    state_names[v] for v in epsilon_edges[u]
+                }
+            for symbol, edges_for_symbol in zip(symbols, symbol_edges):
+                if edges_for_symbol[u]:
+                    transitions[state_names[u]][symbol] = {
+                        state_names[v] for v in edges_for_symbol[u]
+                    }
+
+        nfas.append(
+            NFA(
+                states=set(state_names),
+                input_symbols=set(symbols),
+                transitions=transitions,
+                initial_state=state_names[start],
+                final_states=set(state_names[states - accepting :]),
+            )
+        )
+
+    if len(nfas) < count:
+        raise GenerationError(f"Could only generate {len(nfas)} of {count} NFAs.")
+
+    return nfas
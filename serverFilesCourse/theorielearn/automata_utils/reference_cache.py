@@ -0,0 +1,210 @@
+"""
+Process-wide cache of compiled reference DFAs. The reference for a question is
+the same for every student, so graders look it up here by fingerprint instead of
+rebuilding, determinizing and minimizing it for each submission.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AbstractSet, Any, Callable, Dict, List, Tuple, Union
+
+from automata.fa.dfa import DFA
+from automata.fa.nfa import NFA
+from theorielearn.automata_utils.compact_dfa import CompactDFA, compact_dfa
+from theorielearn.automata_utils.json_utils import (
+    FSMType,
+    dfa_from_json,
+    nfa_from_json,
+)
+from theorielearn.regular_expressions.parser import compute_dfa_from_regex_lines
+
+REFERENCE_CACHE_MAX_SIZE = 128
+
+
+@dataclass(frozen=True)
+class CompiledReference:
+    """
+    A reference language compiled for grading. dfa is minimal and complete, and
+    word_counts[n] is the number of words of length n it accepts, for every n up
+    to the default partial credit horizon of 2 * |Q|.
+    """
+
+    dfa: DFA
+    word_counts: Tuple[int, ...]
+
+
+class ReferenceDFACache:
+    """An LRU-bounded mapping from reference fingerprints to compiled references."""
+
+    __slots__ = ["_entries", "_max_size", "hits", "misses"]
+
+    _entries: "OrderedDict[str, CompiledReference]"
+    _max_size: int
+    hits: int
+    misses: int
+
+    def __init__(self, max_size: int = REFERENCE_CACHE_MAX_SIZE) -> None:
+        if max_size < 1:
+            raise ValueError(f"Cache size must be positive, not {max_size}.")
+
+        self._entries = OrderedDict()
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compile(
+        self, fingerprint: str, build_fn: Callable[[], Union[DFA, NFA]]
+    ) -> CompiledReference:
+        """
+        Return the compiled reference stored under fingerprint, calling build_fn
+        to construct the reference automaton on a cache miss.
+        """
+
+        entry = self._entries.get(fingerprint)
+
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(fingerprint)
+            return entry
+
+        self.misses += 1
+        entry = compile_reference(build_fn())
+        self._entries[fingerprint] = entry
+
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        return fingerprint in self._entries
+
+
+REFERENCE_CACHE = ReferenceDFACache()
+
+
+def compile_reference(fa: Union[DFA, NFA]) -> CompiledReference:
+    "Compile fa into a minimal complete DFA along with its word count table"
+
+    if isinstance(fa, NFA):
+        dfa = DFA.from_nfa(fa, retain_names=False, minify=True).to_complete()
+    else:
+        dfa = fa.to_complete().minify(retain_names=False)
+
+    word_counts = tuple(compact_dfa(dfa).count_words_by_length(2 * len(dfa.states)))
+
+    return CompiledReference(dfa, word_counts)
+
+
+def fingerprint(*parts: Any) -> str:
+    "Hash a JSON-serializable description of a reference into a cache key"
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def fingerprint_fa(fa: Union[DFA, NFA]) -> str:
+    """
+    Fingerprint an automaton. DFAs are renumbered in breadth-first order from the
+    initial state, so the fingerprint does not depend on state names.
+    """
+
+    input_symbols = sorted(fa.input_symbols)
+
+    if isinstance(fa, NFA):
+        state_names = {state: repr(state) for state in fa.states}
+        transitions = sorted(
+            (
+                state_names[start_state],
+                symbol,
+                sorted(state_names[end_state] for end_state in end_states),
+            )
+            for start_state, transition in fa.transitions.items()
+            for symbol, end_states in transition.items()
+        )
+
+        return fingerprint(
+            "NFA",
+            input_symbols,
+            transitions,
+            state_names[fa.initial_state],
+            sorted(state_names[state] for state in fa.final_states),
+        )
+
+    state_index: Dict[Any, int] = {fa.initial_state: 0}
+    rows: List[Tuple[bool, List[int]]] = []
+    queue = [fa.initial_state]
+
+    for state in queue:
+        row = []
+        for symbol in input_symbols:
+            end_state = fa.transitions[state].get(symbol)
+
+            if end_state is None:
+                row.append(-1)
+                continue
+
+            if end_state not in state_index:
+                state_index[end_state] = len(state_index)
+                queue.append(end_state)
+
+            row.append(state_index[end_state])
+
+        rows.append((state in fa.final_states, row))
+
+    return fingerprint("DFA", input_symbols, rows)
+
+
+def reference_from_fa(fa: Union[DFA, NFA]) -> CompiledReference:
+    "Look up (or compile) the reference defined by an automaton object"
+    return REFERENCE_CACHE.get_or_compile(fingerprint_fa(fa), lambda: fa)
+
+
+def reference_from_json(
+    json_fsm: Union[str, Dict[str, Any]], fsm_type: FSMType
+) -> CompiledReference:
+    "Look up (or compile) the reference defined by a DFA or NFA JSON dict"
+
+    json_dict = json.loads(json_fsm) if isinstance(json_fsm, str) else json_fsm
+
+    def build_fn() -> Union[DFA, NFA]:
+        if fsm_type is FSMType.DFA:
+            return dfa_from_json(json_dict)  # type: ignore
+
+        return nfa_from_json(json_dict)  # type: ignore
+
+    return REFERENCE_CACHE.get_or_compile(
+        fingerprint("JSON", fsm_type.name, json_dict), build_fn
+    )
+
+
+@lru_cache(maxsize=REFERENCE_CACHE_MAX_SIZE)
+def reference_from_serialized(encoded: str) -> CompactDFA:
+    """
+    Load a reference DFA stored with CompactDFA.serialize, which skips
+    automata-lib entirely. Raises ValueError if it is malformed.
+    """
+    return CompactDFA.deserialize(encoded)
+
+
+def reference_from_regex(
+    regex: str, alphabet: AbstractSet[str] = {"0", "1"}
+) -> CompiledReference:
+    "Look up (or compile) the reference defined by a (multi-line) regex"
+
+    regex_lines = [line.strip() for line in regex.splitlines() if line.strip()]
+
+    return REFERENCE_CACHE.get_or_compile(
+        fingerprint("REGEX", sorted(alphabet), regex_lines),
+        lambda: compute_dfa_from_regex_lines(regex, alphabet),
+    )
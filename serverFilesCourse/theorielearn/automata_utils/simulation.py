@@ -0,0 +1,70 @@
+"""
+Stateless simulation of existing automata from arbitrary start states. Unlike
+building a copy of the automaton with a different initial state, nothing is
+re-validated or copied, and the epsilon closures an NFA caches for itself are
+shared across calls.
+"""
+
+from typing import AbstractSet, FrozenSet, Generator, Iterable
+
+from automata.fa.nfa import NFA, NFAStateT
+
+
+def epsilon_closure(nfa: NFA, states: Iterable[NFAStateT]) -> FrozenSet[NFAStateT]:
+    "Return every state reachable from states using only epsilon transitions"
+
+    # Cached on the NFA instance, so only computed once per automaton
+    closures = nfa._get_lambda_closures()  # type: ignore
+
+    return frozenset().union(*(closures[state] for state in states))
+
+
+def nfa_step(
+    nfa: NFA, current_states: AbstractSet[NFAStateT], symbol: str
+) -> FrozenSet[NFAStateT]:
+    """
+    Return the epsilon closure of the states reached by reading symbol from
+    current_states, which should already be closed under epsilon transitions.
+    """
+
+    return epsilon_closure(
+        nfa,
+        (
+            end_state
+            for state in current_states
+            for end_state in nfa.transitions.get(state, {}).get(symbol, ())
+        ),
+    )
+
+
+def nfa_read_input_stepwise_from(
+    nfa: NFA, start_states: Iterable[NFAStateT], input_str: str
+) -> Generator[FrozenSet[NFAStateT], None, None]:
+    """
+    Yield the set of current states of nfa after each step of reading input_str,
+    starting from the epsilon closure of start_states. Unlike
+    NFA.read_input_stepwise, this never raises on rejection.
+    """
+
+    current_states = epsilon_closure(nfa, start_states)
+    yield current_states
+
+    for symbol in input_str:
+        current_states = nfa_step(nfa, current_states, symbol)
+        yield current_states
+
+
+def nfa_read_input_from(
+    nfa: NFA, start_states: Iterable[NFAStateT], input_str: str
+) -> FrozenSet[NFAStateT]:
+    "Return the set of states nfa is in after reading input_str from start_states"
+
+    current_states = epsilon_closure(nfa, start_states)
+
+    for symbol in input_str:
+        if not current_states:
+            break
+
+        current_states = nfa_step(nfa, current_states, symbol)
+
+    return current_states
@@ -0,0 +1,289 @@
+"""
+Precomputed subset construction tables for NFA questions. Sets of NFA states
+are stored as bitmasks over the NFA states in sorted order, so the table can be
+computed once per variant, stored in data["params"] and graded by lookup.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from automata.fa.dfa import DFA
+from automata.fa.nfa import NFA
+
+EMPTY_SET_SYMBOL = "∅"
+
+
+def indices_to_mask(indices: Iterable[int]) -> int:
+    "Return the bitmask with exactly the given bits set"
+
+    mask = 0
+    for i in indices:
+        mask |= 1 << i
+    return mask
+
+
+def union_over(masks: Sequence[int], subset: int) -> int:
+    "Return the union of masks[i] over every i in subset"
+
+    result = 0
+    while subset:
+        low_bit = subset & -subset
+        result |= masks[low_bit.bit_length() - 1]
+        subset ^= low_bit
+    return result
+
+
+def epsilon_closure_masks(
+    epsilon_successors: Sequence[Sequence[int]],
+) -> List[int]:
+    """
+    Compute the epsilon closure of every state as a bitmask, given the epsilon
+    successors of each state. The epsilon graph is condensed into its strongly
+    connected components (which share a closure), and closures are then
+    combined in reverse topological order, so each edge is only visited once.
+    """
+
+    num_states = len(epsilon_successors)
+
+    # Iterative version of Tarjan's algorithm. Components are found in reverse
+    # topological order, i.e. every component is found after its successors.
+    index = [-1] * num_states
+    low_link = [0] * num_states
+    on_stack = [False] * num_states
+    stack: List[int] = []
+    component_of = [-1] * num_states
+    component_masks: List[int] = []
+    next_index = 0
+
+    for root in range(num_states):
+        if index[root] != -1:
+            continue
+
+        work_stack: List[Tuple[int, int]] = [(root, 0)]
+        while work_stack:
+            state, edge_position = work_stack.pop()
+
+            if edge_position == 0:
+                index[state] = low_link[state] = next_index
+                next_index += 1
+                stack.append(state)
+                on_stack[state] = True
+
+            successors = epsilon_successors[state]
+            while edge_position < len(successors):
+                successor = successors[edge_position]
+                edge_position += 1
+
+                if index[successor] == -1:
+                    work_stack.append((state, edge_position))
+                    work_stack.append((successor, 0))
+                    break
+
+                if on_stack[successor]:
+                    low_link[state] = min(low_link[state], index[successor])
+            else:
+                if low_link[state] == index[state]:
+                    component_mask = 0
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component_of[member] = len(component_masks)
+                        component_mask |= 1 << member
+                        if member == state:
+                            break
+
+                    # Other successor components were all found earlier
+                    component = len(component_masks)
+                    closure = component_mask
+                    member_mask = component_mask
+                    while member_mask:
+                        low_bit = member_mask & -member_mask
+                        for successor in epsilon_successors[low_bit.bit_length() - 1]:
+                            if component_of[successor] != component:
+                                closure |= component_masks[component_of[successor]]
+                        member_mask ^= low_bit
+
+                    component_masks.append(closure)
+
+                if work_stack:
+                    parent = work_stack[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[state])
+
+    return [component_masks[component_of[state]] for state in range(num_states)]
+
+
+@dataclass
+class SubsetTable:
+    """
+    The reachable part of the subset construction of an NFA with single
+    character state names. Rows are subsets closed under epsilon transitions,
+    listed in the order they are discovered by a breadth-first search that adds
+    new subsets in order of their names.
+
+    moves[r][a] is the set of states reached from row r on symbol a (before
+    taking epsilon transitions), and next_rows[r][a] is the row it leads to.
+    parents[r] is the row whose expansion first discovered row r (or -1 for the
+    initial row).
+    """
+
+    state_names: str
+    input_symbols: str
+    final_mask: int
+    rows: List[int]
+    moves: List[List[int]]
+    next_rows: List[List[int]]
+    parents: List[int]
+    _row_index: Dict[int, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._row_index = {subset: row for row, subset in enumerate(self.rows)}
+
+    @classmethod
+    def from_nfa(cls, nfa: NFA) -> "SubsetTable":
+        state_names = "".join(sorted(nfa.states))
+        if len(state_names) != len(nfa.states):
+            raise ValueError("Subset tables require single character state names.")
+
+        input_symbols = "".join(sorted(nfa.input_symbols))
+        state_index = {name: i for i, name in enumerate(state_names)}
+
+        def successors(state: str, symbol: str) -> List[int]:
+            return sorted(
+                state_index[end_state]
+                for end_state in nfa.transitions.get(state, {}).get(symbol, ())
+            )
+
+        closures = epsilon_closure_masks(
+            [successors(state, "") for state in state_names]
+        )
+        symbol_masks = [
+            [indices_to_mask(successors(state, symbol)) for state in state_names]
+            for symbol in input_symbols
+        ]
+
+        start = closures[state_index[nfa.initial_state]]
+        rows = [start]
+        row_index = {start: 0}
+        parents = [-1]
+        moves: List[List[int]] = []
+        next_rows: List[List[int]] = []
+        queue = deque([start])
+
+        while queue:
+            subset = queue.popleft()
+            row_moves = [union_over(masks, subset) for masks in symbol_masks]
+            row_reaches = [union_over(closures, move) for move in row_moves]
+
+            # Add new subsets in order of their names, like students are asked to
+            new_subsets = {
+                reach: _format_mask(state_names, reach)
+                for reach in row_reaches
+                if reach not in row_index
+            }
+            for reach in sorted(new_subsets, key=new_subsets.__getitem__):
+                row_index[reach] = len(rows)
+                rows.append(reach)
+                parents.append(len(moves))
+                queue.append(reach)
+
+            moves.append(row_moves)
+            next_rows.append([row_index[reach] for reach in row_reaches])
+
+        final_mask = indices_to_mask(state_index[state] for state in nfa.final_states)
+
+        return cls(
+            state_names, input_symbols, final_mask, rows, moves, next_rows, parents
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        "Serialize into a compact JSON-compatible dict, for storing in data['params']"
+        return {
+            "state_names": self.state_names,
+            "input_symbols": self.input_symbols,
+            "final_mask": self.final_mask,
+            "rows": self.rows,
+            "moves": self.moves,
+            "next_rows": self.next_rows,
+            "parents": self.parents,
+        }
+
+    @classmethod
+    def from_json(cls, json_dict: Dict[str, Any]) -> "SubsetTable":
+        return cls(
+            json_dict["state_names"],
+            json_dict["input_symbols"],
+            json_dict["final_mask"],
+            json_dict["rows"],
+            json_dict["moves"],
+            json_dict["next_rows"],
+            json_dict["parents"],
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def is_accepting(self, row: int) -> bool:
+        return bool(self.rows[row] & self.final_mask)
+
+    def reach(self, row: int, symbol: str) -> int:
+        "Return the epsilon reach of the states reached from row on symbol"
+        return self.rows[self.next_rows[row][self.input_symbols.index(symbol)]]
+
+    def move(self, row: int, symbol: str) -> int:
+        return self.moves[row][self.input_symbols.index(symbol)]
+
+    def new_rows(self, row: int) -> List[int]:
+        "Return the rows first discovered while expanding row, in order"
+        return [
+            next_row
+            for next_row in range(row + 1, len(self))
+            if self.parents[next_row] == row
+        ]
+
+    def row_of(self, subset: int) -> Optional[int]:
+        return self._row_index.get(subset)
+
+    def format_subset(self, subset: int) -> str:
+        "Format subset as its state names in sorted order, with '' for the empty set"
+        return _format_mask(self.state_names, subset)
+
+    def parse_subset(self, text: str) -> Optional[int]:
+        """
+        Parse a set of states written as a string of distinct state names (in
+        any order, ignoring whitespace), or EMPTY_SET_SYMBOL. Returns None if
+        text is blank, repeats a state or contains anything else.
+        """
+
+        text = "".join(text.split())
+        if text == EMPTY_SET_SYMBOL:
+            return 0
+
+        if not text:
+            return None
+
+        subset = 0
+        for name in text:
+            position = self.state_names.find(name)
+            if position == -1 or subset >> position & 1:
+                return None
+            subset |= 1 << position
+
+        return subset
+
+    def to_dfa(self) -> DFA:
+        "Return the DFA given by the subset construction, with rows as states"
+        return DFA(
+            states=set(range(len(self))),
+            input_symbols=set(self.input_symbols),
+            transitions={
+                row: dict(zip(self.input_symbols, self.next_rows[row]))
+                for row in range(len(self))
+            },
+            initial_state=0,
+            final_states={row for row in range(len(self)) if self.is_accepting(row)},
+        )
+
+
+def _format_mask(state_names: str, subset: int) -> str:
+    return "".join(name for i, name in enumerate(state_names) if subset >> i & 1)
@@ -0,0 +1,139 @@
+"""
+Lazy enumeration of words in shortlex order (by length, then alphabetically).
+Words are built one symbol at a time by a depth-first walk that only extends
+prefixes which can still be completed into a wanted word of the current
+length, so the work done is proportional to the number of words yielded
+rather than to the number of strings over the alphabet. Callers that only
+need the first few words can pass a limit (or use islice) and stop early.
+"""
+
+from itertools import islice
+from typing import AbstractSet, Callable, Iterator, List, Optional, Sequence
+
+from automata.fa.dfa import DFA, DFAStateT
+from theorielearn.automata_utils.compact_dfa import compact_dfa
+from theorielearn.shared_utils import shortlex_strings
+
+# Given a prefix and a number of symbols still to read, whether some word in
+# the language extends the prefix by exactly that many symbols
+PrefixViableT = Callable[[str, int], bool]
+
+
+def viable_by_length(
+    transitions: Sequence[Sequence[int]], targets: Sequence[bool], max_length: int
+) -> List[List[bool]]:
+    """
+    Given transitions (where transitions[q][a] is the state reached from q on
+    the symbol with index a) and a mask of target states, compute a table whose
+    entry [k][q] is True if some word of length exactly k leads from q to a
+    target state.
+    """
+
+    viable = [list(targets)]
+    for _ in range(max_length):
+        prev = viable[-1]
+        viable.append(
+            [any(prev[next_state] for next_state in row) for row in transitions]
+        )
+
+    return viable
+
+
+def shortlex_walks(
+    input_symbols: Sequence[str],
+    transitions: Sequence[Sequence[int]],
+    targets: Sequence[bool],
+    min_length: int,
+    max_length: int,
+) -> Iterator[str]:
+    """
+    Lazily yield every word of length between min_length and max_length that
+    leads from state 0 to a target state, in shortlex order. input_symbols
+    must be sorted, with transitions[q][a] the state reached from q on
+    input_symbols[a].
+    """
+
+    viable = viable_by_length(transitions, targets, max_length)
+
+    for length in range(min_length, max_length + 1):
+        if not viable[length][0]:
+            continue
+
+        stack = [(0, "")]
+        while stack:
+            state, word = stack.pop()
+            remaining = length - len(word)
+
+            if remaining == 0:
+                yield word
+                continue
+
+            # Push in reverse so that the smallest symbol is popped first
+            next_viable = viable[remaining - 1]
+            row = transitions[state]
+            for i in range(len(input_symbols) - 1, -1, -1):
+                if next_viable[row[i]]:
+                    stack.append((row[i], word + input_symbols[i]))
+
+
+def dfa_words(
+    dfa: DFA,
+    max_length: int,
+    *,
+    min_length: int = 0,
+    target_states: Optional[AbstractSet[DFAStateT]] = None,
+    accepted: bool = True,
+    limit: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Lazily yield the words of length between min_length and max_length that
+    dfa accepts (or, if accepted is False, rejects) in shortlex order, or if
+    target_states is given, the words leading to one of those states. At most
+    limit words are yielded, if given.
+    """
+
+    compact = compact_dfa(dfa)
+
+    if target_states is None:
+        targets = [compact.is_final(state) == accepted for state in range(len(compact))]
+    else:
+        targets = [False] * len(compact)
+        for state in target_states:
+            targets[compact.state_index(state)] = True
+
+    words = shortlex_walks(
+        compact.input_symbols,
+        compact.transition_table().tolist(),
+        targets,
+        min_length,
+        max_length,
+    )
+
+    return islice(words, limit)
+
+
+def language_words(
+    is_member: Callable[[str], bool],
+    alphabet: AbstractSet[str],
+    max_length: int,
+    *,
+    min_length: int = 0,
+    prefix_viable: Optional[PrefixViableT] = None,
+    limit: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Lazily yield the words over alphabet of length between min_length and
+    max_length for which is_member returns True, in shortlex order. If given,
+    prefix_viable(prefix, remaining) should return False only when no word in
+    the language extends prefix by exactly remaining symbols, and is used to
+    skip such prefixes without testing their extensions. At most limit words
+    are yielded, if given.
+    """
+
+    words = (
+        word
+        for word in shortlex_strings(alphabet, min_length, max_length, prefix_viable)
+        if is_member(word)
+    )
+
+    return islice(words, limit)
@@ -0,0 +1,115 @@
+"""
+Uniform sampling of the words a DFA accepts (or rejects) without enumerating
+them. Words are counted per length and state by dynamic programming, which
+lets us unrank any index into the corresponding word by a weighted walk.
+"""
+
+from random import randrange, sample
+from typing import List, Set, Tuple
+
+import numpy as np
+from automata.fa.dfa import DFA
+from theorielearn.automata_utils.compact_dfa import compact_dfa, walk_count_table
+
+
+class WordSampler:
+    """
+    The words of length between min_length and max_length accepted (or, if
+    accepted is False, rejected) by a DFA, indexed in shortlex order.
+    """
+
+    __slots__ = [
+        "input_symbols",
+        "min_length",
+        "max_length",
+        "total",
+        "_transition_table",
+        "_ways",
+        "_counts",
+    ]
+
+    input_symbols: Tuple[str, ...]
+    min_length: int
+    max_length: int
+    total: int
+    _transition_table: np.ndarray
+    _ways: List[np.ndarray]
+    _counts: List[int]
+
+    def __init__(
+        self, dfa: DFA, min_length: int, max_length: int, *, accepted: bool = True
+    ) -> None:
+        if not 0 <= min_length <= max_length:
+            raise ValueError(f"Invalid length range [{min_length}, {max_length}].")
+
+        compact = compact_dfa(dfa)
+        targets = np.array(
+            [compact.is_final(state) == accepted for state in range(len(compact))]
+        )
+
+        self.input_symbols = compact.input_symbols
+        self.min_length = min_length
+        self.max_length = max_length
+        self._transition_table = compact.transition_table()
+        self._ways = walk_count_table(self._transition_table, targets, max_length)
+
+        # Number of words of each length, starting from the initial state
+        self._counts = [int(ways[0]) for ways in self._ways]
+        self.total = sum(self._counts[min_length:])
+
+    def unrank(self, index: int) -> str:
+        "Return the word with the given index in shortlex order"
+
+        if not 0 <= index < self.total:
+            raise IndexError(f"Word index {index} out of range.")
+
+        length = self.min_length
+        while index >= self._counts[length]:
+            index -= self._counts[length]
+            length += 1
+
+        # Walk from the initial state, skipping over the words that go through
+        # each smaller symbol first
+        state = 0
+        symbols = []
+        for remaining in range(length, 0, -1):
+            next_ways = self._ways[remaining - 1]
+
+            for symbol, next_state in zip(
+                self.input_symbols, self._transition_table[state]
+            ):
+                num_words = int(next_ways[next_state])
+
+                if index < num_words:
+                    symbols.append(symbol)
+                    state = next_state
+                    break
+
+                index -= num_words
+
+        return "".join(symbols)
+
+    def words(self) -> List[str]:
+        "Return every word, in shortlex order"
+        return [self.unrank(index) for index in range(self.total)]
+
+    def sample(self, k: int) -> List[str]:
+        "Return k distinct words chosen uniformly at random"
+
+        if k > self.total:
+            raise ValueError(f"Cannot sample {k} words out of {self.total}.")
+
+        # If most words are needed, sampling indices directly is cheap. Otherwise
+        # the index space may be huge, so draw indices until k are distinct.
+        if self.total <= 2 * k:
+            indices = sample(range(self.total), k)
+        else:
+            seen: Set[int] = set()
+            indices = []
+            while len(indices) < k:
+                index = randrange(self.total)
+                if index not in seen:
+                    seen.add(index)
+                    indices.append(index)
+
+        return [self.unrank(index) for index in indices]
@@ -1,9 +1,14 @@
 from itertools import product
 
+import language_definition
 from code_feedback import Feedback
-from language_definition import NUM_ELEMENTS_TO_CHECK, isInLanguage
+from language_definition import NUM_ELEMENTS_TO_CHECK
 from pl_helpers import name, points
 from pl_unit_test import PLTestCase
+from theorielearn.automata_utils.membership_oracle import language_oracle
+
+# Memoized, so each string's membership is only computed once per process
+isInLanguage = language_oracle(language_definition)
 
 
 class Test(PLTestCase):
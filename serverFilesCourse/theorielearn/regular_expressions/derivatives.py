@@ -0,0 +1,299 @@
+"""
+Regular expression syntax trees and their compilation straight to DFAs with
+Brzozowski derivatives. The derivative of a regex r by a symbol a matches the
+words w such that r matches aw, so the derivatives reachable from r (compared
+up to the similarity rules applied by the smart constructors below) are the
+states of a DFA for r. This skips the epsilon-heavy Thompson NFA and its subset
+construction entirely.
+
+Syntax trees are hash-consed: the smart constructors return the existing node
+for a structurally equal tree if there is one, so equal trees are the same
+object, and their derivatives and compiled DFAs are shared across variable
+definitions and submissions.
+"""
+
+import abc
+from collections import deque
+from functools import lru_cache
+from typing import AbstractSet, Any, Deque, Dict, FrozenSet, List, Tuple, Type
+from weakref import WeakValueDictionary
+
+from automata.fa.dfa import DFA
+from theorielearn.automata_utils.grading_budget import check_budget
+
+# Enough for the reference solutions and common answers of many questions
+COMPILED_REGEX_CACHE_SIZE = 512
+
+
+class Regex(metaclass=abc.ABCMeta):
+    """
+    Base class for regex syntax trees. Trees are immutable and interned, so
+    they are compared by identity, and derivatives are computed at most once
+    per symbol. Build them with the smart constructors (symbol, union, concat,
+    star, literal) rather than the classes, so that similar regexes are the
+    same object.
+    """
+
+    __slots__ = ["nullable", "_derivatives", "__weakref__"]
+
+    nullable: bool
+    _derivatives: Dict[str, "Regex"]
+
+    def __init__(self, nullable: bool) -> None:
+        self.nullable = nullable
+        self._derivatives = {}
+
+    def derivative(self, symbol: str) -> "Regex":
+        "Return the regex matching the words w such that this matches symbol + w"
+
+        result = self._derivatives.get(symbol)
+        if result is None:
+            result = self._derivatives[symbol] = self._derive(symbol)
+
+        return result
+
+    @abc.abstractmethod
+    def _derive(self, symbol: str) -> "Regex":
+        raise NotImplementedError
+
+
+class EmptySet(Regex):
+    "Matches nothing"
+
+    __slots__ = []
+
+    def __init__(self) -> None:
+        super().__init__(False)
+
+    def _derive(self, symbol: str) -> Regex:
+        return self
+
+    def __repr__(self) -> str:
+        return "∅"
+
+
+class Epsilon(Regex):
+    "Matches only the empty string"
+
+    __slots__ = []
+
+    def __init__(self) -> None:
+        super().__init__(True)
+
+    def _derive(self, symbol: str) -> Regex:
+        return EMPTY_SET
+
+    def __repr__(self) -> str:
+        return "e"
+
+
+class Symbol(Regex):
+    "Matches a single symbol"
+
+    __slots__ = ["symbol"]
+
+    symbol: str
+
+    def __init__(self, symbol: str) -> None:
+        super().__init__(False)
+        self.symbol = symbol
+
+    def _derive(self, symbol: str) -> Regex:
+        return EPSILON if symbol == self.symbol else EMPTY_SET
+
+    def __repr__(self) -> str:
+        return self.symbol
+
+
+class Concat(Regex):
+    "Matches left followed by right. Nested concatenations associate to the right."
+
+    __slots__ = ["left", "right"]
+
+    left: Regex
+    right: Regex
+
+    def __init__(self, left: Regex, right: Regex) -> None:
+        super().__init__(left.nullable and right.nullable)
+        self.left = left
+        self.right = right
+
+    def _derive(self, symbol: str) -> Regex:
+        left_derivative = concat(self.left.derivative(symbol), self.right)
+
+        if self.left.nullable:
+            return union(left_derivative, self.right.derivative(symbol))
+
+        return left_derivative
+
+    def __repr__(self) -> str:
+        return f"({self.left!r})({self.right!r})"
+
+
+class Union(Regex):
+    "Matches any of at least two options, which are never unions themselves"
+
+    __slots__ = ["options"]
+
+    options: FrozenSet[Regex]
+
+    def __init__(self, options: FrozenSet[Regex]) -> None:
+        super().__init__(any(option.nullable for option in options))
+        self.options = options
+
+    def _derive(self, symbol: str) -> Regex:
+        return union(*(option.derivative(symbol) for option in self.options))
+
+    def __repr__(self) -> str:
+        return "+".join(sorted(repr(option) for option in self.options))
+
+
+class Star(Regex):
+    "Matches any number of repetitions of inner"
+
+    __slots__ = ["inner"]
+
+    inner: Regex
+
+    def __init__(self, inner: Regex) -> None:
+        super().__init__(True)
+        self.inner = inner
+
+    def _derive(self, symbol: str) -> Regex:
+        return concat(self.inner.derivative(symbol), self)
+
+    def __repr__(self) -> str:
+        return f"({self.inner!r})*"
+
+
+EMPTY_SET = EmptySet()
+EPSILON = Epsilon()
+
+# Every live syntax tree node (besides the two above), keyed by class and fields
+_interned_nodes: "WeakValueDictionary[Tuple[Any, ...], Regex]" = WeakValueDictionary()
+
+
+def _intern(cls: Type[Regex], *fields: Any) -> Regex:
+    "Return the node cls(*fields), reusing a structurally equal one if it exists"
+
+    key = (cls, *fields)
+    node = _interned_nodes.get(key)
+
+    if node is None:
+        node = _interned_nodes[key] = cls(*fields)  # type: ignore
+
+    return node
+
+
+def symbol(char: str) -> Regex:
+    "Return a regex matching exactly the single symbol char"
+    return _intern(Symbol, char)
+
+
+def union(*regexes: Regex) -> Regex:
+    """
+    Return the union of regexes, which is associative, commutative and
+    idempotent, with the empty set as its identity.
+    """
+
+    options = set()
+    for regex in regexes:
+        if isinstance(regex, Union):
+            options.update(regex.options)
+        elif regex is not EMPTY_SET:
+            options.add(regex)
+
+    if not options:
+        return EMPTY_SET
+    elif len(options) == 1:
+        return options.pop()
+
+    return _intern(Union, frozenset(options))
+
+
+def concat(left: Regex, right: Regex) -> Regex:
+    """
+    Return the concatenation of left and right, which is associative, with the
+    empty string as its identity and the empty set as a zero.
+    """
+
+    if left is EMPTY_SET or right is EMPTY_SET:
+        return EMPTY_SET
+    elif left is EPSILON:
+        return right
+    elif right is EPSILON:
+        return left
+    elif isinstance(left, Concat):
+        return _intern(Concat, left.left, concat(left.right, right))
+
+    return _intern(Concat, left, right)
+
+
+def star(inner: Regex) -> Regex:
+    "Return the Kleene star of inner, simplifying (r*)* = r* and e* = ∅* = e"
+
+    if isinstance(inner, Star):
+        return inner
+    elif inner is EPSILON or inner is EMPTY_SET:
+        return EPSILON
+
+    return _intern(Star, inner)
+
+
+def literal(text: str) -> Regex:
+    "Return a regex matching exactly text"
+
+    result: Regex = EPSILON
+    for char in reversed(text):
+        result = concat(symbol(char), result)
+
+    return result
+
+
+def regex_to_dfa(regex: Regex, input_symbols: AbstractSet[str]) -> DFA:
+    """
+    Compile regex to a minimal complete DFA over input_symbols, by exploring the
+    distinct derivatives of regex breadth-first and minimizing the result.
+    Respects the active grading budget, if any.
+
+    Results are cached per process (DFAs are immutable, so they can be shared),
+    so a subexpression that appears in several variable definitions or
+    submissions is only compiled once.
+    """
+
+    return _compile_regex(regex, frozenset(input_symbols))
+
+
+@lru_cache(maxsize=COMPILED_REGEX_CACHE_SIZE)
+def _compile_regex(regex: Regex, input_symbols: FrozenSet[str]) -> DFA:
+    symbols = sorted(input_symbols)
+    state_index: Dict[Regex, int] = {regex: 0}
+    queue: Deque[Regex] = deque([regex])
+    transitions: List[Dict[str, int]] = []
+    final_states = set()
+
+    while queue:
+        current = queue.popleft()
+        if current.nullable:
+            final_states.add(len(transitions))
+
+        row = {}
+        for char in symbols:
+            next_regex = current.derivative(char)
+
+            if next_regex not in state_index:
+                check_budget(len(state_index) + 1)
+                state_index[next_regex] = len(state_index)
+                queue.append(next_regex)
+
+            row[char] = state_index[next_regex]
+
+        transitions.append(row)
+
+    return DFA(
+        states=set(range(len(transitions))),
+        input_symbols=input_symbols,
+        transitions=dict(enumerate(transitions)),
+        initial_state=0,
+        final_states=final_states,
+    ).minify(retain_names=False)
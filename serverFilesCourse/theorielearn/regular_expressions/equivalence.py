@@ -0,0 +1,102 @@
+"""
+Batched language comparisons between regular expressions. Every regex is
+compiled once (to a cached minimal DFA), and each pair is compared with a
+single pass over the product of their DFAs, which gives equivalence, both
+inclusions and the shortest witness of each difference at the same time.
+"""
+
+from dataclasses import dataclass
+from typing import AbstractSet, Iterable, List, Optional, Sequence
+
+from automata.fa.dfa import DFA
+from theorielearn.automata_utils.product_utils import DFAProduct
+from theorielearn.regular_expressions.parser import compute_dfa_from_regex_lines
+
+
+@dataclass(frozen=True)
+class RegexComparison:
+    """
+    How the language of a candidate regex relates to a reference regex.
+    false_positive is the shortlex-least word only the candidate matches, and
+    false_negative the shortlex-least word only the reference matches (or None
+    if there is no such word).
+    """
+
+    false_positive: Optional[str]
+    false_negative: Optional[str]
+
+    @property
+    def equivalent(self) -> bool:
+        return self.false_positive is None and self.false_negative is None
+
+    @property
+    def subset(self) -> bool:
+        "Whether the candidate language is contained in the reference language"
+        return self.false_positive is None
+
+    @property
+    def superset(self) -> bool:
+        "Whether the candidate language contains the reference language"
+        return self.false_negative is None
+
+    @property
+    def counterexample(self) -> Optional[str]:
+        "The shortlex-least word the two regexes disagree on, if any"
+
+        witnesses = [
+            word
+            for word in (self.false_positive, self.false_negative)
+            if word is not None
+        ]
+
+        return min(witnesses, key=lambda word: (len(word), word), default=None)
+
+    def reversed(self) -> "RegexComparison":
+        "Return the comparison with the roles of candidate and reference swapped"
+        return RegexComparison(self.false_negative, self.false_positive)
+
+
+def compare_dfas(candidate_dfa: DFA, reference_dfa: DFA) -> RegexComparison:
+    "Compare the languages of two complete DFAs over the same alphabet"
+    return RegexComparison(
+        *DFAProduct(candidate_dfa, reference_dfa).shortest_witnesses()
+    )
+
+
+def compare_regexes(
+    reference: str,
+    candidates: Iterable[str],
+    alphabet: AbstractSet[str] = {"0", "1"},
+) -> List[RegexComparison]:
+    """
+    Compare each candidate regex against reference, compiling the reference
+    only once. Raises RegexException if any regex is invalid.
+    """
+
+    reference_dfa = compute_dfa_from_regex_lines(reference, alphabet)
+
+    return [
+        compare_dfas(compute_dfa_from_regex_lines(candidate, alphabet), reference_dfa)
+        for candidate in candidates
+    ]
+
+
+def compare_all_pairs(
+    regexes: Sequence[str], alphabet: AbstractSet[str] = {"0", "1"}
+) -> List[List[RegexComparison]]:
+    """
+    Compare every pair of regexes, returning a matrix whose entry [i][j]
+    compares regexes[i] as the candidate against regexes[j] as the reference.
+    Each unordered pair is only compared once.
+    """
+
+    dfas = [compute_dfa_from_regex_lines(regex, alphabet) for regex in regexes]
+    equal = RegexComparison(None, None)
+    comparisons = [[equal] * len(dfas) for _ in dfas]
+
+    for i in range(len(dfas)):
+        for j in range(i + 1, len(dfas)):
+            comparisons[i][j] = compare_dfas(dfas[i], dfas[j])
+            comparisons[j][i] = comparisons[i][j].reversed()
+
+    return comparisons
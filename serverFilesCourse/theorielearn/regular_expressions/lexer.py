@@ -2,6 +2,7 @@
 
 import abc
 import re
+from functools import lru_cache
 from typing import (
     Callable,
     FrozenSet,
@@ -18,6 +19,9 @@ from theorielearn.regular_expressions.exceptions import LexerException
 
 ResultT = TypeVar("ResultT")
 
+# Lexers are rebuilt for every line parsed, but only with a few distinct sets of rules
+COMPILED_PATTERN_CACHE_SIZE = 128
+
 
 class Token(Generic[ResultT], metaclass=abc.ABCMeta):
     """Base class for tokens."""
@@ -39,6 +43,42 @@ class Token(Generic[ResultT], metaclass=abc.ABCMeta):
 TokenFactoryT = Callable[[str], Token[ResultT]]
 
 
+@lru_cache(maxsize=COMPILED_PATTERN_CACHE_SIZE)
+def compile_token_patterns(
+    token_regexes: Tuple[str, ...], blank_chars: FrozenSet[str]
+) -> Tuple[re.Pattern, List[Optional[re.Pattern]]]:
+    """
+    Combine token regexes into one alternation, where the group named _i holds
+    a match of token_regexes[i], followed by a group named blank matching one of
+    blank_chars and a group named invalid matching any other character. So the
+    pattern matches at every position of the text being lexed.
+
+    An alternation picks the first rule that matches rather than the longest
+    match, so for each rule this also returns an alternation of the rules after
+    it (or None for the last rule), to check whether any of them matches too.
+    """
+
+    def alternation(first_index: int) -> str:
+        return "|".join(
+            f"(?P<_{i}>{token_regexes[i]})"
+            for i in range(first_index, len(token_regexes))
+        )
+
+    alternatives = [alternation(0)] if token_regexes else []
+    if blank_chars:
+        alternatives.append(
+            f"(?P<blank>[{''.join(re.escape(char) for char in sorted(blank_chars))}])"
+        )
+    alternatives.append("(?P<invalid>.)")
+
+    later_patterns: List[Optional[re.Pattern]] = [
+        re.compile(alternation(i + 1)) for i in range(len(token_regexes) - 1)
+    ]
+    later_patterns.append(None)
+
+    return re.compile("|".join(alternatives), re.DOTALL), later_patterns
+
+
 class TokenRegistry(Generic[ResultT]):
     """Registry holding token rules."""
 
@@ -86,6 +126,13 @@ class TokenRegistry(Generic[ResultT]):
 
         return best_token_match
 
+    def get_factory(self, index: int) -> TokenFactoryT:
+        return self._tokens[index][0]
+
+    def patterns(self) -> Tuple[str, ...]:
+        "Return the regex of every token rule, in order of registration"
+        return tuple(regexp.pattern for _, regexp in self._tokens)
+
     def __len__(self):
         return len(self._tokens)
 
@@ -116,23 +163,44 @@ class Lexer(Generic[ResultT]):
         self.tokens.register(token_factory_fn, token_regex)
 
     def lex(self, text: str) -> List[Token[ResultT]]:
-        """Split text into a list of tokens in infix notation."""
+        """
+        Split text into a list of tokens in infix notation. Every token rule is
+        combined into one precompiled pattern, so each token is usually found
+        with a single match, giving the same result as taking the longest match
+        from the token registry.
+        """
+
+        pattern, later_patterns = compile_token_patterns(
+            self.tokens.patterns(), self.blank_chars
+        )
 
         pos = 0
         res = []
 
         while pos < len(text):
-            token_match = self.tokens.get_token(text, start=pos)
-            if token_match is not None:
-                token_factory_fn, match = token_match
-                matched_text = match.group(0)
-                res.append(token_factory_fn(matched_text))
-                pos += len(matched_text)
-            elif text[pos] in self.blank_chars:
+            match = pattern.match(text, pos)
+            assert match is not None and match.lastgroup is not None
+
+            if match.lastgroup == "blank":
                 pos += 1
-            else:
+                continue
+            elif match.lastgroup == "invalid":
                 raise LexerException(
                     f"Invalid character '{text[pos]}' in '{text}'", position=pos
                 )
 
+            # No earlier rule matches here, but a later one might match longer
+            token_index = int(match.lastgroup[1:])
+            later_pattern = later_patterns[token_index]
+
+            if later_pattern is not None and later_pattern.match(text, pos):
+                token_match = self.tokens.get_token(text, start=pos)
+                assert token_match is not None
+                token_factory_fn, match = token_match
+            else:
+                token_factory_fn = self.tokens.get_factory(token_index)
+
+            res.append(token_factory_fn(match.group()))
+            pos = match.end()
+
         return res
@@ -1,110 +1,147 @@
 from __future__ import annotations
 
 import re
-from itertools import count, zip_longest
-from typing import AbstractSet, Dict, List, Optional, Set, Type
+from enum import Enum
+from functools import partial
+from itertools import zip_longest
+from typing import (
+    AbstractSet,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
 
 import theorielearn.regular_expressions.exceptions as exceptions
 import theorielearn.regular_expressions.postfix as postfix
-from automata.base.automaton import AutomatonStateT
 from automata.fa.dfa import DFA
 from automata.fa.nfa import NFA
+from theorielearn.automata_utils.compact_dfa import compact_dfa
+from theorielearn.automata_utils.grading_budget import check_budget, current_budget
+from theorielearn.automata_utils.lazy_equivalence import LazyDeterminizer
+from theorielearn.regular_expressions.derivatives import (
+    EPSILON,
+    Regex,
+    concat,
+    literal,
+    regex_to_dfa,
+    star,
+    union,
+)
 from theorielearn.regular_expressions.lexer import Lexer, Token
+from typing_extensions import assert_never
 
-BuilderTransitionsT = Dict[int, Dict[str, Set[int]]]
 
+class NFAArena:
+    """
+    Growable transition table shared by every fragment built while parsing one
+    regex, with states numbered contiguously from 0. Combining fragments only
+    adds states and transitions, and never copies or renames existing ones.
+    """
 
-class NFARegexBuilder:
-    """Builder class designed for speed in parsing regular expressions into NFAs."""
+    __slots__ = ["transitions"]
 
-    __slots__ = ["_transitions", "_initial_state", "_final_states", "_consumed"]
-    _state_name_counter = count(0)
+    transitions: List[Dict[str, Set[int]]]
 
-    _transitions: BuilderTransitionsT
-    _initial_state: AutomatonStateT
-    _final_states: Set[AutomatonStateT]
-    _consumed: bool
+    def __init__(self) -> None:
+        self.transitions = []
 
-    def __init__(
-        self,
-        *,
-        transitions: BuilderTransitionsT,
-        initial_state: AutomatonStateT,
-        final_states: AbstractSet[AutomatonStateT],
-    ) -> None:
-        """
-        Initialize new builder class and remap state names.
-        """
+    def __len__(self) -> int:
+        return len(self.transitions)
 
-        state_map = {
-            original_state: self.__get_next_state_name()
-            for original_state in transitions
-        }
+    def add_states(self, num_states: int) -> int:
+        """Add num_states states without transitions and return the first one."""
 
-        self._initial_state = state_map[initial_state]
-        self._final_states = {state_map[state] for state in final_states}
+        first_state = len(self.transitions)
+        self.transitions.extend({} for _ in range(num_states))
+        return first_state
 
-        self._transitions = {
-            state_map[start_state]: {
-                chr: {state_map[dest_state] for dest_state in dest_set}
-                for chr, dest_set in transition.items()
-            }
-            for start_state, transition in transitions.items()
-        }
+    def add_transition(self, start_state: int, symbol: str, end_state: int) -> None:
+        self.transitions[start_state].setdefault(symbol, set()).add(end_state)
+
+
+class NFARegexBuilder:
+    """
+    Builder class designed for speed in parsing regular expressions into NFAs.
+    Each builder is a fragment of the NFA stored in its arena, given by an
+    initial state and a set of final states.
+    """
+
+    __slots__ = ["_arena", "_initial_state", "_final_states", "_consumed"]
+
+    _arena: NFAArena
+    _initial_state: int
+    _final_states: Set[int]
+    _consumed: bool
 
+    def __init__(
+        self, arena: NFAArena, initial_state: int, final_states: Set[int]
+    ) -> None:
+        self._arena = arena
+        self._initial_state = initial_state
+        self._final_states = final_states
         self._consumed = False
 
     @classmethod
-    def from_dfa(cls: Type[NFARegexBuilder], dfa: DFA) -> NFARegexBuilder:
+    def from_dfa(
+        cls: Type[NFARegexBuilder], arena: NFAArena, dfa: DFA
+    ) -> NFARegexBuilder:
         """
-        Initialize this builder with a DFA.
+        Initialize this builder with a copy of a complete DFA, added to arena as
+        a contiguous block of states.
         """
 
-        new_transitions: BuilderTransitionsT = {
-            int(start_state): {
-                input_symbol: {end_state}
-                for input_symbol, end_state in transition.items()
-            }
-            for start_state, transition in dfa.transitions.items()
+        compact = compact_dfa(dfa)
+        num_symbols = len(compact.input_symbols)
+        offset = arena.add_states(len(compact.state_names))
+
+        for i, end_state in enumerate(compact.transitions):
+            start_state, symbol_index = divmod(i, num_symbols)
+            arena.transitions[offset + start_state][
+                compact.input_symbols[symbol_index]
+            ] = {offset + end_state}
+
+        final_states = {
+            offset + state
+            for state in range(len(compact.state_names))
+            if compact.final_mask >> state & 1
         }
 
-        return cls(
-            transitions=new_transitions,
-            initial_state=dfa.initial_state,
-            final_states=dfa.final_states,
-        )
+        return cls(arena, offset, final_states)
 
     @classmethod
     def from_string_literal(
-        cls: Type[NFARegexBuilder], literal: str
+        cls: Type[NFARegexBuilder], arena: NFAArena, literal: str
     ) -> NFARegexBuilder:
         """
         Initialize this builder accepting only the given string literal.
         """
 
-        transitions: BuilderTransitionsT = {
-            i: {chr: {i + 1}} for i, chr in enumerate(literal)
-        }
+        offset = arena.add_states(len(literal) + 1)
 
-        final_state = len(literal)
-        transitions[final_state] = dict()
+        for i, chr in enumerate(literal):
+            arena.transitions[offset + i][chr] = {offset + i + 1}
 
-        return cls(transitions=transitions, initial_state=0, final_states={final_state})
+        return cls(arena, offset, {offset + len(literal)})
 
     def union(self, other: NFARegexBuilder) -> None:
         """
         Apply the union operation to the NFA represented by this builder and other.
         """
         self.__check_consumed()
+        self.__check_same_arena(other)
         other.__consume()
 
-        self._transitions.update(other._transitions)
-
-        new_initial_state = self.__get_next_state_name()
+        new_initial_state = self._arena.add_states(1)
 
         # Add epsilon transitions from new start state to old ones
-        self._transitions[new_initial_state] = {
-            "": {self._initial_state, other._initial_state}
+        self._arena.transitions[new_initial_state][""] = {
+            self._initial_state,
+            other._initial_state,
         }
 
         self._initial_state = new_initial_state
@@ -116,12 +153,11 @@ class NFARegexBuilder:
         and other.
         """
         self.__check_consumed()
+        self.__check_same_arena(other)
         other.__consume()
 
-        self._transitions.update(other._transitions)
-
         for state in self._final_states:
-            self._transitions[state].setdefault("", set()).add(other._initial_state)
+            self._arena.add_transition(state, "", other._initial_state)
 
         self._final_states = other._final_states
 
@@ -131,34 +167,28 @@ class NFARegexBuilder:
         """
         self.__check_consumed()
 
-        new_initial_state = self.__get_next_state_name()
+        new_initial_state = self._arena.add_states(1)
 
-        self._transitions[new_initial_state] = {"": {self._initial_state}}
+        self._arena.transitions[new_initial_state][""] = {self._initial_state}
 
         for state in self._final_states:
-            self._transitions[state].setdefault("", set()).add(self._initial_state)
+            self._arena.add_transition(state, "", self._initial_state)
 
         self._initial_state = new_initial_state
         self._final_states.add(new_initial_state)
 
-    def copy(self) -> NFARegexBuilder:
-        """Make and return a copy of this builder."""
-        self.__check_consumed()
-
-        return NFARegexBuilder(
-            transitions=self._transitions,
-            initial_state=self._initial_state,
-            final_states=self._final_states,
-        )
-
     def build(self, input_symbols: AbstractSet[str]) -> NFA:
-        """Construct an NFA object equivalent to this one."""
+        """
+        Construct an NFA object equivalent to this one, over every state in the
+        arena. So every other fragment of the arena should have been combined
+        into this one.
+        """
         self.__check_consumed()
 
         return NFA(
-            states=set(self._transitions.keys()),
+            states=set(range(len(self._arena))),
             input_symbols=input_symbols,
-            transitions=self._transitions,
+            transitions=dict(enumerate(self._arena.transitions)),
             initial_state=self._initial_state,
             final_states=self._final_states,
         )
@@ -175,10 +205,12 @@ class NFARegexBuilder:
                 "This NFARegexBuilder class has already been consumed."
             )
 
-    @classmethod
-    def __get_next_state_name(cls: Type[NFARegexBuilder]) -> int:
-        """Get next int for use as a state name (to avoid naming conflicts)."""
-        return next(cls._state_name_counter)
+    def __check_same_arena(self, other: NFARegexBuilder) -> None:
+        """Raise exception if other was built in a different arena."""
+        if other._arena is not self._arena:
+            raise exceptions.ParserException(
+                "Cannot combine NFARegexBuilders from different arenas."
+            )
 
 
 class UnionToken(postfix.InfixOperator[NFARegexBuilder]):
@@ -217,30 +249,38 @@ class ConcatToken(postfix.InfixOperator[NFARegexBuilder]):
 class StringToken(postfix.Literal[NFARegexBuilder]):
     """Subclass of literal token defining a string literal."""
 
+    __slots__ = ["arena"]
+
+    arena: NFAArena
+
+    def __init__(self, text: str, arena: NFAArena) -> None:
+        self.text = text
+        self.arena = arena
+
     def val(self) -> NFARegexBuilder:
-        return NFARegexBuilder.from_string_literal(self.text)
+        return NFARegexBuilder.from_string_literal(self.arena, self.text)
 
 
 class VariableToken(postfix.Literal[NFARegexBuilder]):
     """Subclass of literal token representing a variable."""
 
-    __slots__ = ["_equiv_nfa"]
+    __slots__ = ["arena", "_equiv_dfa"]
 
-    _equiv_nfa: Optional[NFARegexBuilder]
+    arena: NFAArena
+    _equiv_dfa: Optional[DFA]
 
-    def __init__(self, text: str, equiv_nfa: NFARegexBuilder) -> None:
+    def __init__(
+        self, text: str, arena: NFAArena, equiv_dfa: Optional[DFA] = None
+    ) -> None:
         self.text = text
-        self._equiv_nfa = equiv_nfa
+        self.arena = arena
+        self._equiv_dfa = equiv_dfa
 
     def val(self) -> NFARegexBuilder:
-        if self._equiv_nfa is None:
-            raise exceptions.ParserException(
-                f"Token {self.__repr__()} has no data (already returned)."
-            )
+        if self._equiv_dfa is None:
+            raise exceptions.ParserException(f"Token {self.__repr__()} has no data.")
 
-        res = self._equiv_nfa
-        self._equiv_nfa = None
-        return res
+        return NFARegexBuilder.from_dfa(self.arena, self._equiv_dfa)
 
 
 def add_concat_tokens(
@@ -286,20 +326,35 @@ def bind_kleene_star_to_literal(
         ):
             text = curr_token.text[:-1]
             end = curr_token.text[-1]
-            final_token_list.extend([StringToken(text), StringToken(end)])
+            final_token_list.extend(
+                [
+                    StringToken(text, curr_token.arena),
+                    StringToken(end, curr_token.arena),
+                ]
+            )
         else:
             final_token_list.append(curr_token)
 
     return final_token_list
 
 
-SubsDictT = Dict[str, NFARegexBuilder]
+SubsDictT = Dict[str, DFA]
 
 
-def compute_nfa_from_regex_lines(
-    regex: str, alphabet: AbstractSet[str] = {"0", "1"}
-) -> NFA:
-    """Computes an NFA from a multi-line regex statement."""
+class RegexCompileMethod(Enum):
+    "How compute_dfa_from_regex_lines compiles a regex"
+
+    # Build a Thompson NFA and determinize it
+    THOMPSON = "thompson"
+    # Explore Brzozowski derivatives of the regex directly
+    DERIVATIVES = "derivatives"
+
+
+def split_regex_lines(regex: str) -> Tuple[List[Tuple[str, str]], str]:
+    """
+    Split a multi-line regex statement into its variable definitions, as pairs
+    of variable names and regexes, and its final line.
+    """
 
     # Remove blank lines
     regex_lines = [line for line in regex.splitlines() if line.replace(" ", "")]
@@ -309,8 +364,8 @@ def compute_nfa_from_regex_lines(
 
     *all_but_last_line, last_line = regex_lines
 
-    subs_dict: SubsDictT = {"e": NFARegexBuilder.from_string_literal("")}
     line_pattern = re.compile(r"\s*([A-Za-z]+)\s*=(.*)")
+    definitions = []
 
     for regex_line in all_but_last_line:
         line_match = line_pattern.match(regex_line)
@@ -320,38 +375,164 @@ def compute_nfa_from_regex_lines(
                 f"Invalid variable assignment in line '{regex_line}'"
             )
 
-        variable_name = line_match[1]
-        regex_statement = line_match[2]
+        definitions.append((line_match[1], line_match[2]))
+
+    return definitions, last_line
+
+
+def compute_nfa_from_regex_lines(
+    regex: str, alphabet: AbstractSet[str] = {"0", "1"}
+) -> NFA:
+    """
+    Computes an NFA from a multi-line regex statement. Variable definitions are
+    compiled to minimal DFAs (cached across calls) before being substituted. If
+    a grading budget is active, it is checked after every line.
+    """
+
+    definitions, last_line = split_regex_lines(regex)
+
+    subs: Dict[str, Regex] = {"e": EPSILON}
+    subs_dict: SubsDictT = {"e": regex_to_dfa(EPSILON, alphabet)}
+
+    for variable_name, regex_statement in definitions:
+        # For subexpression, use the (cached) minimal DFA for re-use later
+        subs[variable_name] = parse_regex_line_to_ast(regex_statement, subs, alphabet)
+        subs_dict[variable_name] = regex_to_dfa(subs[variable_name], alphabet)
+
+    nfa = parse_regex_line(last_line, subs_dict, alphabet).build(alphabet)
+    check_budget(len(nfa.states))
+
+    return nfa
+
+
+def compute_dfa_from_regex_lines(
+    regex: str,
+    alphabet: AbstractSet[str] = {"0", "1"},
+    *,
+    method: RegexCompileMethod = RegexCompileMethod.DERIVATIVES,
+) -> DFA:
+    """
+    Computes a minimal complete DFA from a multi-line regex statement, using
+    the given method. Both methods respect the active grading budget, if any.
+    """
+
+    if method is RegexCompileMethod.THOMPSON:
+        return determinize(compute_nfa_from_regex_lines(regex, alphabet))
+    elif method is RegexCompileMethod.DERIVATIVES:
+        definitions, last_line = split_regex_lines(regex)
+
+        subs: Dict[str, Regex] = {"e": EPSILON}
+
+        for variable_name, regex_statement in definitions:
+            subs[variable_name] = parse_regex_line_to_ast(
+                regex_statement, subs, alphabet
+            )
 
-        # For subexpression, minimize NFA for re-use later
-        nfa = parse_regex_line(regex_statement, subs_dict, alphabet).build(alphabet)
-        subs_dict[variable_name] = NFARegexBuilder.from_dfa(
-            DFA.from_nfa(nfa, retain_names=False, minify=True).to_complete()
+        return regex_to_dfa(
+            parse_regex_line_to_ast(last_line, subs, alphabet), alphabet
         )
-    return parse_regex_line(last_line, subs_dict, alphabet).build(alphabet)
+
+    assert_never(method)
+
+
+def determinize(nfa: NFA) -> DFA:
+    """
+    Return the minimal complete DFA equivalent to nfa. If a grading budget is
+    active, the NFA is determinized lazily within its limits.
+    """
+
+    check_budget(len(nfa.states))
+
+    budget = current_budget()
+    if budget is None:
+        return DFA.from_nfa(nfa, retain_names=False, minify=True).to_complete()
+
+    return LazyDeterminizer(nfa, budget.max_states).to_dfa().minify()
 
 
 def parse_regex_line(
     regexstr: str, subs_dict: SubsDictT, alphabet: AbstractSet[str]
 ) -> NFARegexBuilder:
-    """Return an NFARegexBuilder corresponding to regexstr using subs_dict for variable substitutions."""
+    """
+    Return an NFARegexBuilder corresponding to regexstr using subs_dict for
+    variable substitutions. Every fragment is built in one new arena.
+    """
 
-    lexer: Lexer[NFARegexBuilder] = Lexer()
-
-    lexer.register_token(postfix.LeftParen, r"\(")
-    lexer.register_token(postfix.RightParen, r"\)")
-    lexer.register_token(StringToken, rf"[{''.join(alphabet)}]+")
-    lexer.register_token(UnionToken, r"\+")
-    lexer.register_token(KleeneToken, r"\*")
-    lexer.register_token(ConcatToken, r"\.")
+    arena = NFAArena()
 
     def variable_factory(text: str) -> VariableToken:
         if text not in subs_dict:
             raise exceptions.InvalidVariableDefinition(
                 f"Invalid variable name '{text}'"
             )
-        return VariableToken(text, subs_dict[text].copy())
+        return VariableToken(text, arena, subs_dict[text])
+
+    return postfix.parse_postfix_tokens(
+        regex_line_to_postfix(regexstr, alphabet, variable_factory, arena)
+    )
+
+
+def parse_regex_line_to_ast(
+    regexstr: str, subs: Mapping[str, Regex], alphabet: AbstractSet[str]
+) -> Regex:
+    """
+    Return the syntax tree of regexstr, substituting the syntax trees in subs
+    for variables.
+    """
+
+    # Literal tokens are only read here, so their NFA fragments are never built
+    arena = NFAArena()
+
+    def variable_factory(text: str) -> VariableToken:
+        if text not in subs:
+            raise exceptions.InvalidVariableDefinition(
+                f"Invalid variable name '{text}'"
+            )
+        return VariableToken(text, arena)
+
+    stack: List[Regex] = []
+
+    for token in regex_line_to_postfix(regexstr, alphabet, variable_factory, arena):
+        if isinstance(token, UnionToken):
+            right = stack.pop()
+            stack.append(union(stack.pop(), right))
+        elif isinstance(token, ConcatToken):
+            right = stack.pop()
+            stack.append(concat(stack.pop(), right))
+        elif isinstance(token, KleeneToken):
+            stack.append(star(stack.pop()))
+        elif isinstance(token, StringToken):
+            stack.append(literal(token.text))
+        elif isinstance(token, VariableToken):
+            stack.append(subs[token.text])
+        else:
+            raise exceptions.InvalidTokenOrdering(f"Invalid token type {type(token)}")
+
+    return stack[0]
 
+
+def regex_line_to_postfix(
+    regexstr: str,
+    alphabet: AbstractSet[str],
+    variable_factory: Callable[[str], VariableToken],
+    arena: NFAArena,
+) -> List[Token[NFARegexBuilder]]:
+    """
+    Lex and validate regexstr, returning its tokens in postfix order. Variable
+    tokens are created by variable_factory, and string literal tokens build
+    their fragments in arena.
+    """
+
+    lexer: Lexer[NFARegexBuilder] = Lexer()
+
+    lexer.register_token(postfix.LeftParen, r"\(")
+    lexer.register_token(postfix.RightParen, r"\)")
+    lexer.register_token(
+        partial(StringToken, arena=arena), rf"[{''.join(sorted(alphabet))}]+"
+    )
+    lexer.register_token(UnionToken, r"\+")
+    lexer.register_token(KleeneToken, r"\*")
+    lexer.register_token(ConcatToken, r"\.")
     lexer.register_token(variable_factory, r"[A-Za-z]+")
 
     lexed_tokens = lexer.lex(regexstr)
@@ -363,8 +544,4 @@ def parse_regex_line(
 
     kleene_bound_tokens = bind_kleene_star_to_literal(lexed_tokens)
     tokens_with_concats = add_concat_tokens(kleene_bound_tokens)
-    postfix_tokens: List[Token[NFARegexBuilder]] = postfix.tokens_to_postfix(
-        tokens_with_concats
-    )
-
-    return postfix.parse_postfix_tokens(postfix_tokens)
+    return postfix.tokens_to_postfix(tokens_with_concats)
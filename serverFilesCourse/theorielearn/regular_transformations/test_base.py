@@ -5,12 +5,17 @@ from theorielearn.automata_utils.fa_utils import (
     get_equiv_dfa,
     states_to_string,
 )
+from theorielearn.automata_utils.grading_budget import BudgetExceeded, grading_budget
+from theorielearn.automata_utils.lazy_equivalence import find_counterexample
+from theorielearn.automata_utils.reference_cache import reference_from_fa
 from code_feedback import Feedback
 from pl_helpers import name, points
 from pl_unit_test import PLTestCase
 from theorielearn.shared_utils import replace_empty
 
 MAX_LENGTH_TO_CHECK = 10
+MAX_STATES_TO_EXPLORE = 5000
+TIME_LIMIT_SECONDS = 10.0
 INPUT_SYMBOLS = {"0", "1"}
 
 
@@ -38,13 +43,21 @@ def fa_to_string(dfa: FA) -> str:
 
 class Test(PLTestCase):
     def check_correctness(self, start_dfa: DFA) -> None:
-        reference_equiv_dfa = get_equiv_dfa(self.ref.transform(start_dfa))
+        reference_equiv_dfa = reference_from_fa(self.ref.transform(start_dfa)).dfa
 
         transformed_dfa = Feedback.call_user(self.st.transform, start_dfa)
-        student_equiv_dfa = get_equiv_dfa(transformed_dfa)
 
-        if student_equiv_dfa == reference_equiv_dfa:
-            Feedback.set_score(1)
+        # Check equivalence on the fly first, so a transform producing a large
+        # NFA is only determinized as far as needed
+        try:
+            with grading_budget(TIME_LIMIT_SECONDS, MAX_STATES_TO_EXPLORE):
+                if find_counterexample(transformed_dfa, reference_equiv_dfa) is None:
+                    Feedback.set_score(1)
+                    return
+
+                student_equiv_dfa = get_equiv_dfa(transformed_dfa)
+        except BudgetExceeded as err:
+            Feedback.add_feedback(str(err))
             return
 
         Feedback.add_feedback(
@@ -0,0 +1,65 @@
+"""
+Render caches for element controllers. Elements render the same mustache
+template for every panel of every question, and the FSM builder lays out the
+same submitted or reference machine each time a panel is viewed, so both the
+tokenized templates and the Graphviz diagrams are kept for the lifetime of the
+process.
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple, Union
+
+import chevron
+import theorielearn.automata_utils.json_utils as ju
+from automata.fa.fa import FA
+from chevron.tokenizer import tokenize
+
+# Enough for every FSM submission viewed while reviewing a few assessments
+DIAGRAM_CACHE_SIZE = 256
+
+TokenT = Tuple[str, str]
+
+
+def load_template(path: str) -> List[TokenT]:
+    """
+    Return the tokenized mustache template at path, which chevron renders
+    without parsing it again. Templates are read once per process.
+    """
+    return _load_template(os.path.abspath(path))
+
+
+@lru_cache(maxsize=None)
+def _load_template(path: str) -> List[TokenT]:
+    with open(path, encoding="utf-8") as f:
+        return list(tokenize(f.read()))
+
+
+def render_template(path: str, params: Dict[str, Any]) -> str:
+    "Render the mustache template at path with params, stripping whitespace"
+    return chevron.render(load_template(path), params).strip()
+
+
+def fsm_diagram(fsm_json: Union[str, Dict[str, Any]], fsm_type: ju.FSMType) -> str:
+    """
+    Return the Graphviz (DOT) diagram of the DFA or NFA with the given JSON
+    form. Diagrams are cached by the canonical form of the JSON, so laying out
+    a machine that was already shown is a dictionary lookup.
+    """
+
+    json_dict = json.loads(fsm_json) if isinstance(fsm_json, str) else fsm_json
+
+    return _fsm_diagram(json.dumps(json_dict, sort_keys=True), fsm_type)
+
+
+@lru_cache(maxsize=DIAGRAM_CACHE_SIZE)
+def _fsm_diagram(canonical_json: str, fsm_type: ju.FSMType) -> str:
+    json_dict = json.loads(canonical_json)
+
+    if fsm_type is ju.FSMType.DFA:
+        fsm: FA = ju.dfa_from_json(json_dict)
+    else:
+        fsm = ju.nfa_from_json(json_dict)
+
+    return str(fsm.show_diagram())
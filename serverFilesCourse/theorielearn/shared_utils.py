@@ -399,12 +399,43 @@ def sized_powerset(
 def strings_of_length_at_most_n(
     lower_bound: int, n: int, *, alphabet: AbstractSet[str] = {"0", "1"}
 ) -> Generator[str, None, None]:
-    return (
-        "".join(char_list)
-        for char_list in chain.from_iterable(
-            product(alphabet, repeat=k) for k in range(lower_bound, n + 1)
-        )
-    )
+    "Lazily yield the strings over alphabet of length lower_bound to n in shortlex order"
+    return shortlex_strings(alphabet, lower_bound, n)
+
+
+def shortlex_strings(
+    alphabet: AbstractSet[str],
+    min_length: int,
+    max_length: int,
+    prefix_viable: Optional[Callable[[str, int], bool]] = None,
+) -> Generator[str, None, None]:
+    """
+    Lazily yield strings over alphabet of length between min_length and
+    max_length in shortlex order, building each from its prefix. If given,
+    prefix_viable(prefix, remaining) is used to prune: prefixes for which it
+    returns False are not extended by the remaining number of symbols.
+    """
+
+    symbols = sorted(alphabet, reverse=True)
+
+    for length in range(min_length, max_length + 1):
+        if prefix_viable is not None and not prefix_viable("", length):
+            continue
+
+        stack = [""]
+        while stack:
+            prefix = stack.pop()
+            remaining = length - len(prefix)
+
+            if remaining == 0:
+                yield prefix
+                continue
+
+            # Push in reverse so that the smallest symbol is popped first
+            for char in symbols:
+                word = prefix + char
+                if prefix_viable is None or prefix_viable(word, remaining - 1):
+                    stack.append(word)
 
 
 def replace_empty(x: str) -> str:
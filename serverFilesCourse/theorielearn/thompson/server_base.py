@@ -1,10 +1,16 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 import chevron
 import prairielearn as pl
-from automata.fa.dfa import DFA
 from automata.fa.nfa import NFA
-from theorielearn.regular_expressions.parser import compute_nfa_from_regex_lines
+from theorielearn.automata_utils.compact_dfa import compact_dfa
+from theorielearn.automata_utils.fa_utils import get_equiv_dfa
+from theorielearn.automata_utils.grading_budget import grading_budget
+from theorielearn.automata_utils.product_utils import DFAProduct
+from theorielearn.automata_utils.reference_cache import (
+    reference_from_regex,
+    reference_from_serialized,
+)
 from theorielearn.regular_expressions.utils import convert_regex_to_latex
 from theorielearn.shared_utils import grade_question_parameterized
 
@@ -29,9 +35,32 @@ def get_feedback(nfa_accepts: bool, regex_accepts: bool) -> str:
         return NEITHER_ACCEPTING_FEEDBACK
 
 
-def generate(data: Dict[str, Any]) -> None:
+def precompute_grading_automata(nfa: NFA, regex: str) -> Dict[str, Any]:
+    """
+    Return the minimal DFAs of nfa and regex (serialized), along with whether
+    each kind of counterexample exists. These only depend on the question, so
+    they are computed once per variant and stored in the question data.
+    """
+
+    regex_dfa = reference_from_regex(regex).dfa
+    nfa_dfa = get_equiv_dfa(nfa).minify(retain_names=False)
+    false_positive, false_negative = DFAProduct(nfa_dfa, regex_dfa).shortest_witnesses()
+
+    return {
+        "nfa_dfa": compact_dfa(nfa_dfa).serialize(),
+        "regex_dfa": compact_dfa(regex_dfa).serialize(),
+        "false_positive_exists": false_positive is not None,
+        "false_negative_exists": false_negative is not None,
+    }
+
+
+def generate(data: Dict[str, Any], nfa: Optional[NFA] = None) -> None:
     regex = data["params"]["regex_string"]
     data["params"]["regex_latex"] = convert_regex_to_latex(regex)
+
+    if nfa is not None:
+        data["params"]["grading_automata"] = precompute_grading_automata(nfa, regex)
+
     with open(
         data["options"]["server_files_course_path"]
         + "/theorielearn/thompson/question_base.html"
@@ -40,18 +69,23 @@ def generate(data: Dict[str, Any]) -> None:
 
 
 def grade(data: pl.QuestionData, nfa: NFA) -> None:
-    nfa_equiv_dfa = DFA.from_nfa(nfa)
+    # Variants generated before the automata were precomputed don't have them
+    grading_automata = data["params"].get("grading_automata")
+    if grading_automata is None:
+        with grading_budget():
+            grading_automata = precompute_grading_automata(
+                nfa, data["params"]["regex_string"]
+            )
+
+    nfa_dfa = reference_from_serialized(grading_automata["nfa_dfa"])
+    regex_dfa = reference_from_serialized(grading_automata["regex_dfa"])
 
     def grade_counterexample(
-        student_ans: str, regex_nfa: NFA, grading_false_neg: bool
+        student_ans: str, grading_false_neg: bool
     ) -> Tuple[bool, str]:
-        regex_equiv_dfa = DFA.from_nfa(regex_nfa)
-
-        answer_exists = (
-            regex_equiv_dfa > nfa_equiv_dfa
-            if grading_false_neg
-            else regex_equiv_dfa < nfa_equiv_dfa
-        )
+        answer_exists = grading_automata[
+            "false_negative_exists" if grading_false_neg else "false_positive_exists"
+        ]
 
         if student_ans.lower() == "none":
             if answer_exists:
@@ -66,8 +100,8 @@ def grade(data: pl.QuestionData, nfa: NFA) -> None:
 
         student_ans = "" if student_ans == "e" else student_ans
 
-        nfa_accepts = nfa.accepts_input(student_ans)
-        regex_accepts = regex_nfa.accepts_input(student_ans)
+        nfa_accepts = nfa_dfa.accepts_input(student_ans)
+        regex_accepts = regex_dfa.accepts_input(student_ans)
 
         feedback = get_feedback(nfa_accepts, regex_accepts)
 
@@ -92,14 +126,11 @@ def grade(data: pl.QuestionData, nfa: NFA) -> None:
 
         return False, feedback
 
-    regex_nfa = compute_nfa_from_regex_lines(data["params"]["regex_string"])
-
     grade_question_parameterized(
-        data, "false_negative", lambda x: grade_counterexample(x, regex_nfa, True)
+        data, "false_negative", lambda x: grade_counterexample(x, True)
     )
-
     grade_question_parameterized(
-        data, "false_positive", lambda x: grade_counterexample(x, regex_nfa, False)
+        data, "false_positive", lambda x: grade_counterexample(x, False)
     )
 
     pl.set_weighted_score_data(data)
@@ -81,19 +81,21 @@ def verify_states_to_string(states: Any, target_string: str) -> None:
         ]
     ),
 )
-def verify_sample_input_strings(fa: FA) -> None:
+@pytest.mark.parametrize("use_random_walks", [False, True])
+def verify_sample_input_strings(fa: FA, use_random_walks: bool) -> None:
     """Check that sampled strings behave as expected."""
 
     max_length_to_check = 10
     num_rand_choices = 13
     (accepted, not_accepted) = au.sample_input_strings(
-        max_length_to_check, num_rand_choices, fa
+        max_length_to_check, num_rand_choices, fa, use_random_walks=use_random_walks
     )
 
     eps = r"\varepsilon"
 
     # Check invariants for sampled inputs
     assert eps in (accepted + not_accepted)
+    assert len(set(accepted + not_accepted)) == len(accepted + not_accepted)
     assert abs(len(accepted) - len(not_accepted)) <= 2
 
     # Check accepted and rejected strings
@@ -149,3 +151,40 @@ def verify_compute_partial_credit() -> None:
 
     partial_credit = au.compute_partial_credit(dfa4, dfa1)
     assert math.isclose(partial_credit, 0.6782, abs_tol=0.001)
+
+
+@pytest.mark.parametrize(
+    "submitted_dfa, reference_dfa",
+    combinations(
+        lazy_fixture(
+            [
+                "no_consecutive_11_dfa",
+                "at_least_three_1_dfa",
+                "words_ending_in_1_dfa",
+                "all_words_dfa",
+            ]
+        ),
+        2,
+    ),
+)
+def verify_compute_partial_credit_long_horizon(
+    submitted_dfa: DFA, reference_dfa: DFA
+) -> None:
+    "Word counts past 64 bits should be exact, so long horizons are allowed"
+    word_limit_to_check = 100
+    difference_dfa = submitted_dfa ^ reference_dfa
+
+    expected = 1.0 - min(
+        1.0,
+        sum(
+            difference_dfa.count_words_of_length(n)
+            / max(reference_dfa.count_words_of_length(n), 1)
+            for n in range(word_limit_to_check + 1)
+        )
+        / (word_limit_to_check + 1),
+    )
+
+    partial_credit = au.compute_partial_credit(
+        submitted_dfa, reference_dfa, word_limit_to_check=word_limit_to_check
+    )
+    assert math.isclose(partial_credit, expected)
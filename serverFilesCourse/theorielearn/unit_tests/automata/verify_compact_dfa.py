@@ -0,0 +1,146 @@
+import struct
+
+import automata.base.exceptions as exceptions
+import pytest
+from automata.fa.dfa import DFA
+from pytest_lazyfixture import lazy_fixture
+from theorielearn.automata_utils.compact_dfa import (
+    SERIALIZATION_VERSION,
+    CompactDFA,
+    compact_dfa,
+)
+from theorielearn.automata_utils.fa_utils import dfa_read_input_from_state
+from theorielearn.shared_utils import strings_of_length_at_most_n
+
+MAX_LENGTH_TO_CHECK = 6
+
+
+@pytest.mark.parametrize(
+    "dfa",
+    lazy_fixture(
+        [
+            "test_dfa",
+            "no_consecutive_11_dfa",
+            "no_consecutive_11_extra_states_dfa",
+            "at_least_three_1_dfa",
+            "length_at_most_5_dfa",
+            "words_ending_in_1_dfa",
+            "large_dfa",
+        ]
+    ),
+)
+def verify_compact_dfa_matches_dfa(dfa: DFA) -> None:
+    compact = CompactDFA.from_dfa(dfa)
+
+    assert len(compact) == len(dfa.states)
+    assert compact.to_dfa() == dfa
+
+    for word in strings_of_length_at_most_n(
+        0, MAX_LENGTH_TO_CHECK, alphabet=dfa.input_symbols
+    ):
+        assert compact.accepts_input(word) == dfa.accepts_input(word)
+
+    word = "".join(sorted(dfa.input_symbols))
+    for state in dfa.states:
+        assert compact.state_names[
+            compact.read_input_from(compact.state_index(state), word)
+        ] == dfa_read_input_from_state(dfa, state, word)
+
+    assert compact.count_words_by_length(MAX_LENGTH_TO_CHECK) == [
+        dfa.count_words_of_length(n) for n in range(MAX_LENGTH_TO_CHECK + 1)
+    ]
+
+
+def verify_compact_partial_dfa() -> None:
+    only_1s_dfa = DFA(
+        states={"a", "b"},
+        input_symbols={"0", "1"},
+        transitions={"a": {"1": "a"}, "b": {"0": "a", "1": "b"}},
+        initial_state="a",
+        final_states={"a"},
+        allow_partial=True,
+    )
+
+    compact = CompactDFA.from_dfa(only_1s_dfa)
+
+    # Initial state first, then the unreachable state, then the dead state
+    assert compact.state_names == ("a", "b", None)
+    assert compact.accepts_input("111")
+    assert not compact.accepts_input("1101")
+    assert compact.to_dfa() == only_1s_dfa.to_complete()
+
+    assert dfa_read_input_from_state(only_1s_dfa, "b", "01") == "a"
+    with pytest.raises(exceptions.RejectionException):
+        dfa_read_input_from_state(only_1s_dfa, "a", "0")
+
+
+def verify_compact_dfa_cache(test_dfa: DFA) -> None:
+    assert compact_dfa(test_dfa) is compact_dfa(test_dfa)
+
+    with pytest.raises(exceptions.RejectionException):
+        compact_dfa(test_dfa).accepts_input("2")
+
+
+@pytest.mark.parametrize(
+    "dfa",
+    lazy_fixture(
+        [
+            "test_dfa",
+            "no_consecutive_11_extra_states_dfa",
+            "length_at_most_5_dfa",
+            "large_dfa",
+        ]
+    ),
+)
+def verify_serialization_round_trip(dfa: DFA) -> None:
+    compact = compact_dfa(dfa)
+    loaded = CompactDFA.deserialize(compact.serialize())
+
+    assert loaded.input_symbols == compact.input_symbols
+    assert loaded.state_names == tuple(range(len(compact)))
+    assert loaded.transitions == compact.transitions
+    assert loaded.final_mask == compact.final_mask
+    assert loaded.to_dfa() == dfa
+
+
+def verify_serialization_wide_states() -> None:
+    "State indices that don't fit in one byte should round trip"
+    num_states = 300
+    dfa = DFA(
+        states=set(range(num_states)),
+        input_symbols={"a", "ε"},
+        transitions={
+            state: {"a": (state + 1) % num_states, "ε": state}
+            for state in range(num_states)
+        },
+        initial_state=0,
+        final_states={num_states - 1},
+    )
+
+    loaded = CompactDFA.deserialize(compact_dfa(dfa).serialize())
+
+    assert loaded.input_symbols == ("a", "ε")
+    assert loaded.accepts_input("a" * (num_states - 1) + "ε")
+    assert not loaded.accepts_input("a" * num_states)
+
+
+@pytest.mark.parametrize("encoded", ["", "not base64!", "AgAAAAAAAAAA"])
+def verify_deserialize_malformed(encoded: str, test_dfa: DFA) -> None:
+    with pytest.raises(ValueError):
+        CompactDFA.deserialize(encoded)
+
+    # Truncated table
+    with pytest.raises(ValueError):
+        CompactDFA.deserialize(compact_dfa(test_dfa).serialize()[:-8])
+
+
+def verify_from_bytes_out_of_range_state() -> None:
+    header = struct.pack("<BII", SERIALIZATION_VERSION, 2, 1) + b"\x01\x00a"
+
+    assert CompactDFA.from_bytes(header + bytes([1, 0]) + b"\x02").accepts_input("a")
+
+    with pytest.raises(ValueError):
+        CompactDFA.from_bytes(header + bytes([0, 2]) + b"\x02")
+
+    with pytest.raises(ValueError):
+        CompactDFA.from_bytes(struct.pack("<BII", SERIALIZATION_VERSION, 0, 1))
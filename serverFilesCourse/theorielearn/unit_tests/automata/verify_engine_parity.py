@@ -0,0 +1,206 @@
+"""
+Parity tests pinning the outputs of the shared grading engine, which the
+tl-fsm-builder and tl-regex-input elements use, against the code their
+vendored copies ran.
+"""
+
+import json
+from itertools import islice
+from typing import List, Optional, Tuple, Union
+
+import pytest
+from automata.fa.dfa import DFA
+from automata.fa.nfa import NFA
+from theorielearn.automata_utils.fa_utils import (
+    check_dfa,
+    compute_partial_credit,
+    get_equiv_dfa,
+    partial_credit_word_limit,
+)
+from theorielearn.automata_utils.grading_budget import grading_budget
+from theorielearn.automata_utils.json_utils import FSMType, dfa_dump_json
+from theorielearn.automata_utils.random_fa import random_dfas, random_nfas
+from theorielearn.automata_utils.reference_cache import (
+    reference_from_fa,
+    reference_from_json,
+    reference_from_regex,
+)
+from theorielearn.regular_expressions.parser import (
+    compute_dfa_from_regex_lines,
+    compute_nfa_from_regex_lines,
+)
+from typing_extensions import assert_never
+
+REGEXES = [
+    "001+010+011+100+101+110+111",
+    "(0+1)*010(0+1)*",
+    "(e+1)(01)*(e+0)",
+    "1*(01*01*)*",
+    "a = 0 1*\nb = a a\n(a+b)* 1",
+    "(0+1)*1(0+1)(0+1)(0+1)",
+]
+
+
+def legacy_regex_dfa(regex: str) -> DFA:
+    return DFA.from_nfa(
+        compute_nfa_from_regex_lines(regex), retain_names=False, minify=True
+    ).to_complete()
+
+
+# The functions below are the removed elements/tl-fsm-builder/grading_utils.py
+# versions, kept as they were (apart from typing) so grades can be compared.
+
+
+def legacy_check_dfa(
+    submitted_dfa: DFA,
+    reference_dfa: DFA,
+    max_length_to_check: int,
+    max_num_to_check: Optional[int],
+) -> Tuple[List[str], List[str]]:
+    if submitted_dfa.input_symbols != reference_dfa.input_symbols:
+        raise ValueError("Input symbols for submitted DFA don't match reference")
+
+    submitted_dfa = submitted_dfa.to_complete()
+    reference_dfa = reference_dfa.to_complete()
+
+    false_positive_dfa = submitted_dfa - reference_dfa
+    false_negative_dfa = reference_dfa - submitted_dfa
+
+    false_positives = list(
+        islice(
+            false_positive_dfa.successors(None, max_length=max_length_to_check),
+            max_num_to_check,
+        )
+    )
+
+    false_negatives = list(
+        islice(
+            false_negative_dfa.successors(None, max_length=max_length_to_check),
+            max_num_to_check,
+        )
+    )
+
+    return false_positives, false_negatives
+
+
+def legacy_get_equiv_dfa(fsm: Union[DFA, NFA]) -> DFA:
+    if isinstance(fsm, NFA):
+        return DFA.from_nfa(fsm)
+    elif isinstance(fsm, DFA):
+        return fsm
+
+    assert_never(fsm)
+
+
+def legacy_compute_partial_credit(
+    student_equiv_dfa: DFA,
+    reference_equiv_dfa: DFA,
+    *,
+    word_limit_to_check: Optional[int] = None,
+) -> float:
+    if word_limit_to_check is None:
+        word_limit_to_check = 2 * len(reference_equiv_dfa.states)
+
+    # Raise exception here to prevent really slow grading / weird freakouts
+    if word_limit_to_check > 32:
+        raise ValueError(f"Word limit to check {word_limit_to_check} too high.")
+
+    difference_dfa = student_equiv_dfa ^ reference_equiv_dfa
+
+    res = 0.0
+    for n in range(word_limit_to_check + 1):
+        difference_frac = difference_dfa.count_words_of_length(n) / max(
+            reference_equiv_dfa.count_words_of_length(n), 1
+        )
+        res += difference_frac
+
+    similarity_score = min(1.0, res / (word_limit_to_check + 1))
+
+    return 1.0 - similarity_score
+
+
+def element_partial_credit(
+    student_fa: Union[DFA, NFA], reference_fa: Union[DFA, NFA]
+) -> float:
+    "Partial credit as tl-fsm-builder now computes it"
+
+    with grading_budget():
+        reference = reference_from_fa(reference_fa)
+
+        return compute_partial_credit(
+            get_equiv_dfa(student_fa),
+            reference.dfa,
+            word_limit_to_check=partial_credit_word_limit(reference_fa),
+            reference_word_counts=reference.word_counts,
+        )
+
+
+@pytest.mark.parametrize("regex", REGEXES)
+def verify_regex_reference_parity(regex: str) -> None:
+    legacy_dfa = legacy_regex_dfa(regex)
+
+    with grading_budget():
+        submitted_dfa = compute_dfa_from_regex_lines(regex)
+
+    reference_dfa = reference_from_regex(regex).dfa
+
+    # Same minimal DFA, both when compiled and after the JSON round trip
+    for dfa in (submitted_dfa, reference_dfa):
+        assert dfa == legacy_dfa
+        assert len(dfa.states) == len(legacy_dfa.states)
+
+    stored = json.dumps(dfa_dump_json(reference_dfa))
+    assert reference_from_json(stored, FSMType.DFA).dfa == legacy_dfa
+
+
+@pytest.mark.parametrize("require_minimal", [True, False])
+def verify_feedback_parity(require_minimal: bool) -> None:
+    dfas = random_dfas(8, 2, 5, require_minimal=require_minimal, seed=374)
+
+    for submitted_dfa in dfas:
+        for reference_dfa in dfas:
+            if submitted_dfa == reference_dfa:
+                continue
+
+            legacy_false_positives, legacy_false_negatives = legacy_check_dfa(
+                submitted_dfa, reference_dfa, 6, None
+            )
+
+            # The same counterexamples, now listed in shortlex order
+            if legacy_false_positives or legacy_false_negatives:
+                false_positives, false_negatives = check_dfa(
+                    submitted_dfa, reference_dfa, 6
+                )
+                assert sorted(false_positives) == sorted(legacy_false_positives)
+                assert sorted(false_negatives) == sorted(legacy_false_negatives)
+
+            assert element_partial_credit(
+                submitted_dfa, reference_dfa
+            ) == pytest.approx(
+                legacy_compute_partial_credit(submitted_dfa, reference_dfa)
+            )
+
+
+def verify_nfa_partial_credit_parity() -> None:
+    nfas = random_nfas(8, 4, "01", 0.3, 0.1, 1, seed=374)
+    dfas = random_dfas(4, 2, 4, seed=374)
+
+    for reference_nfa in nfas:
+        for student_fa in [*nfas, *dfas]:
+            legacy_student_dfa = legacy_get_equiv_dfa(student_fa)
+            legacy_reference_dfa = legacy_get_equiv_dfa(reference_nfa)
+
+            if legacy_student_dfa == legacy_reference_dfa:
+                continue
+
+            assert element_partial_credit(student_fa, reference_nfa) == pytest.approx(
+                legacy_compute_partial_credit(legacy_student_dfa, legacy_reference_dfa)
+            )
+
+
+def verify_nfa_grading_parity() -> None:
+    for nfa in random_nfas(10, 5, "01", 0.3, 0.1, 2, seed=374):
+        with grading_budget():
+            equiv_dfa = get_equiv_dfa(nfa)
+
+        assert equiv_dfa == DFA.from_nfa(nfa)
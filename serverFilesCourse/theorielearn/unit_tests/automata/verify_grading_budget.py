@@ -0,0 +1,76 @@
+import pytest
+from automata.fa.dfa import DFA
+from theorielearn.automata_utils.fa_utils import compute_partial_credit, get_equiv_dfa
+from theorielearn.automata_utils.grading_budget import (
+    BudgetExceeded,
+    budget_exceeded_counts,
+    check_budget,
+    current_budget,
+    grading_budget,
+)
+from theorielearn.automata_utils.lazy_equivalence import StateBudgetExceeded
+from theorielearn.regular_expressions.parser import compute_nfa_from_regex_lines
+
+# Every DFA for this language needs 2^8 states
+NTH_FROM_LAST_REGEX = "(0+1)*1(0+1)(0+1)(0+1)(0+1)(0+1)(0+1)(0+1)"
+
+
+def verify_budget_scoping() -> None:
+    assert current_budget() is None
+    check_budget(10**9)
+
+    with grading_budget(max_states=100) as outer_budget:
+        assert current_budget() == outer_budget
+        check_budget(100)
+
+        # The tighter limit applies when nested
+        with grading_budget(max_states=1000) as inner_budget:
+            assert inner_budget.max_states == 100
+
+        with grading_budget(max_states=10):
+            with pytest.raises(BudgetExceeded):
+                check_budget(11)
+
+        assert current_budget() == outer_budget
+
+    assert current_budget() is None
+
+
+def verify_time_limit(caplog: pytest.LogCaptureFixture) -> None:
+    exceeded_before = budget_exceeded_counts["time"]
+
+    with grading_budget(time_limit=0.0):
+        with pytest.raises(BudgetExceeded):
+            check_budget()
+
+    assert budget_exceeded_counts["time"] == exceeded_before + 1
+    assert "exceeded its time limit" in caplog.text
+
+
+def verify_determinization_within_budget(
+    no_consecutive_11_dfa: DFA, caplog: pytest.LogCaptureFixture
+) -> None:
+    nfa = compute_nfa_from_regex_lines(NTH_FROM_LAST_REGEX)
+
+    with grading_budget():
+        dfa = get_equiv_dfa(nfa)
+    assert dfa == DFA.from_nfa(nfa)
+
+    exceeded_before = budget_exceeded_counts["states"]
+
+    with grading_budget(max_states=100):
+        with pytest.raises(StateBudgetExceeded):
+            get_equiv_dfa(nfa)
+
+        # Determinizing subexpressions is limited as well
+        with pytest.raises(BudgetExceeded):
+            compute_nfa_from_regex_lines(f"x = {NTH_FROM_LAST_REGEX}\nx")
+
+    assert budget_exceeded_counts["states"] == exceeded_before + 2
+    assert "exceeded its states limit: reached 101, but the limit is 100" in (
+        caplog.text
+    )
+
+    with grading_budget(time_limit=0.0):
+        with pytest.raises(BudgetExceeded):
+            compute_partial_credit(dfa, no_consecutive_11_dfa)
@@ -2,6 +2,7 @@ import copy
 
 import theorielearn.automata_utils.json_utils as ju
 import pytest
+from theorielearn.automata_utils.compact_dfa import compact_dfa
 from typing_extensions import assert_never
 
 INPUT_SYMBOLS = ["0", "1"]
@@ -102,11 +103,29 @@ def verify_exception_multiple_start_states() -> None:
         expected_states={"q1", "q2"},
         expected_transitions={(None, None, "q1"), (None, None, "q2")},
     )
+
+    # NFAs may have several start states, which are joined by a new one
+    nfa = ju.nfa_from_json(ju.nfa_convert_json(fsm_dict_to_nfa(fsm_json)))
+    assert nfa.initial_state == ju.NFA_INITIAL_STATE_NAME
+    assert nfa.accepts_input("") and nfa.accepts_input("10")
+    assert not nfa.accepts_input("1")
+
+
+def verify_exception_duplicate_start_links() -> None:
+    fsm_json: ju.FSMRawJsonDict = {
+        "input_symbols": INPUT_SYMBOLS,
+        "epsilon_symbol": EPSILON_SYMBOL,
+        "states": ["q1", "q2"],
+        "transitions": {
+            "q1": {"0": ["q1"], "1": ["q2"]},
+            "q2": {"0": ["q1"], "1": ["q2"]},
+        },
+        "initial_state": ["q1", "q1"],
+        "final_states": ["q1"],
+    }
+
     assert_fsm_json_exception_contains(
-        fsm_dict_to_nfa(fsm_json),
-        ju.FSMType.NFA,
-        expected_states={"q1", "q2"},
-        expected_transitions={(None, None, "q1"), (None, None, "q2")},
+        fsm_dict_to_nfa(fsm_json), ju.FSMType.NFA, expected_states={"q1"}
     )
 
 
@@ -293,3 +312,75 @@ def verify_dfa_no_exception_redundant_dump_state() -> None:
 
     # Shouldn't raise an exception
     ju.dfa_convert_json(dfa_json, dump_state=True)
+
+
+# ------------------------------ Single Pass ----------------------------------
+
+
+def verify_all_errors_collected() -> None:
+    fsm_json: ju.FSMRawJsonDict = {
+        "input_symbols": INPUT_SYMBOLS,
+        "epsilon_symbol": EPSILON_SYMBOL,
+        "states": ["q1", "q2", "q3"],
+        "transitions": {
+            "q1": {"0": ["q2", "q1"], "2": ["q1"]},
+            "q2": {"0": ["q1"], "1": ["q1"]},
+            "q3": {"0": ["q1"], "1": ["q1"]},
+        },
+        "initial_state": ["q1"],
+        "final_states": [],
+    }
+
+    _, errors = ju.find_fsm_json_errors(fsm_json, ju.FSMType.DFA)
+
+    assert [error.message for error in errors] == [
+        "Transitions on invalid characters:",
+        "Multiple transitions on the same character coming out of some states:",
+        "States missing outgoing transitions:",
+        "You must have at least one accepting state.",
+        "Unreachable states present:",
+    ]
+    assert errors[-1].states == {"q3"}
+
+
+def verify_compact_dfa_from_json() -> None:
+    fsm_json: ju.FSMRawJsonDict = {
+        "input_symbols": INPUT_SYMBOLS,
+        "epsilon_symbol": EPSILON_SYMBOL,
+        "states": ["q1", "q2"],
+        "transitions": {"q1": {"0": ["q2"], "1": ["q1"]}, "q2": {"1": ["q1"]}},
+        "initial_state": ["q1"],
+        "final_states": ["q2"],
+    }
+
+    dfa_json = ju.dfa_convert_json(fsm_json, dump_state=True)
+    dfa = ju.dfa_from_json(dfa_json)
+    compact = ju.compact_dfa_from_json(dfa_json)
+
+    assert compact.state_names == compact_dfa(dfa).state_names
+    assert compact.transitions == compact_dfa(dfa).transitions
+    assert compact.final_mask == compact_dfa(dfa).final_mask
+
+
+def verify_canonical_fsm_json_ignores_order() -> None:
+    fsm_json: ju.FSMRawJsonDict = {
+        "input_symbols": [*INPUT_SYMBOLS, EPSILON_SYMBOL],
+        "epsilon_symbol": EPSILON_SYMBOL,
+        "states": ["q1", "q2"],
+        "transitions": {"q1": {"0": ["q1", "q2"], "e": ["q2"]}, "q2": {}},
+        "initial_state": ["q1"],
+        "final_states": ["q1", "q2"],
+    }
+    reordered: ju.FSMRawJsonDict = {
+        "input_symbols": [EPSILON_SYMBOL, *reversed(INPUT_SYMBOLS)],
+        "epsilon_symbol": EPSILON_SYMBOL,
+        "states": ["q2", "q1"],
+        "transitions": {"q2": {}, "q1": {"e": ["q2"], "0": ["q2", "q1"]}},
+        "initial_state": ["q1"],
+        "final_states": ["q2", "q1"],
+    }
+
+    assert ju.canonical_fsm_json(
+        ju.nfa_convert_json(fsm_json)
+    ) == ju.canonical_fsm_json(ju.nfa_convert_json(reordered))
+    assert ju.nfa_convert_json(fsm_json) != ju.nfa_convert_json(reordered)
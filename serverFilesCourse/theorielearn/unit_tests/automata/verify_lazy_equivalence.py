@@ -0,0 +1,81 @@
+from itertools import combinations
+
+import pytest
+from automata.fa.dfa import DFA
+from automata.fa.nfa import NFA
+from theorielearn.automata_utils.lazy_equivalence import (
+    LazyDeterminizer,
+    StateBudgetExceeded,
+    find_counterexample,
+)
+from theorielearn.automata_utils.random_fa import random_nfas
+
+
+def nth_from_last_is_1_nfa(n: int) -> NFA:
+    "An NFA with n + 1 states whose minimal DFA has 2^n states"
+    return NFA(
+        states=set(range(n + 1)),
+        input_symbols={"0", "1"},
+        transitions={
+            0: {"0": {0}, "1": {0, 1}},
+            **{i: {"0": {i + 1}, "1": {i + 1}} for i in range(1, n)},
+        },
+        initial_state=0,
+        final_states={n},
+    )
+
+
+def verify_matches_subset_construction() -> None:
+    nfas = random_nfas(20, 5, "01", 0.5, 0.3, 2, seed=99)
+
+    for nfa in nfas:
+        assert LazyDeterminizer(nfa).to_dfa() == DFA.from_nfa(nfa)
+
+    for first_nfa, second_nfa in combinations(nfas, 2):
+        first_dfa = DFA.from_nfa(first_nfa)
+        second_dfa = DFA.from_nfa(second_nfa)
+
+        counterexample = find_counterexample(first_nfa, second_dfa)
+
+        if first_dfa == second_dfa:
+            assert counterexample is None
+        else:
+            assert counterexample is not None
+            word, submitted_accepts = counterexample
+            assert first_dfa.accepts_input(word) == submitted_accepts
+            assert second_dfa.accepts_input(word) != submitted_accepts
+
+
+def verify_equivalent_nfa_and_dfa(
+    no_consecutive_11_dfa: DFA, no_consecutive_11_extra_states_dfa: DFA
+) -> None:
+    assert (
+        find_counterexample(
+            NFA.from_dfa(no_consecutive_11_extra_states_dfa), no_consecutive_11_dfa
+        )
+        is None
+    )
+    assert (
+        find_counterexample(no_consecutive_11_dfa, no_consecutive_11_extra_states_dfa)
+        is None
+    )
+
+
+def verify_state_budget() -> None:
+    nfa = nth_from_last_is_1_nfa(12)
+    reference_dfa = DFA.from_nfa(nfa)
+
+    # The equivalence check itself needs every subset
+    with pytest.raises(StateBudgetExceeded):
+        find_counterexample(nfa, reference_dfa, max_states=100)
+
+    with pytest.raises(ValueError):
+        LazyDeterminizer(nfa, max_states=100).to_dfa()
+
+    assert find_counterexample(nfa, reference_dfa, max_states=2**12) is None
+
+    # A counterexample can be found without exploring everything
+    assert find_counterexample(nfa, reference_dfa.complement(), max_states=100) == (
+        "",
+        False,
+    )
@@ -0,0 +1,52 @@
+from types import ModuleType
+from typing import Callable
+
+from theorielearn.automata_utils.membership_oracle import (
+    MembershipOracle,
+    language_oracle,
+)
+
+
+def is_palindrome(word: str) -> bool:
+    return word == word[::-1]
+
+
+def make_language_definition(is_member: Callable[[str], bool]) -> ModuleType:
+    "Every question's language definition module has the same name"
+    language_definition = ModuleType("language_definition")
+    language_definition.isInLanguage = is_member  # type: ignore
+    return language_definition
+
+
+def verify_predicate_called_once_per_word() -> None:
+    calls = []
+
+    def is_member(word: str) -> bool:
+        calls.append(word)
+        return is_palindrome(word)
+
+    oracle = MembershipOracle(is_member)
+    words = ["", "0", "0110", "0111", "2", "0" * 200 + "1"]
+
+    for _ in range(3):
+        assert [oracle(word) for word in words] == [
+            is_palindrome(word) for word in words
+        ]
+
+    assert sorted(calls) == sorted(words)
+
+
+def verify_language_oracle_cached() -> None:
+    palindromes = make_language_definition(is_palindrome)
+    not_palindromes = make_language_definition(lambda word: not is_palindrome(word))
+
+    oracle = language_oracle(palindromes)
+
+    assert language_oracle(palindromes) is oracle
+    assert oracle("0110") and not oracle("01")
+
+    # Modules with the same name must not share an oracle
+    other_oracle = language_oracle(not_palindromes)
+
+    assert other_oracle is not oracle
+    assert not other_oracle("0110") and other_oracle("01")
@@ -0,0 +1,138 @@
+from itertools import combinations
+
+import pytest
+from automata.fa.dfa import DFA
+from pytest_lazyfixture import lazy_fixture
+from theorielearn.automata_utils.product_utils import DFAProduct
+from theorielearn.shared_utils import strings_of_length_at_most_n
+
+MAX_LENGTH_TO_CHECK = 7
+
+
+def shortlex_key(word: str) -> tuple[int, str]:
+    return (len(word), word)
+
+
+@pytest.mark.parametrize(
+    "submitted_dfa, reference_dfa",
+    combinations(
+        lazy_fixture(
+            [
+                "test_dfa",
+                "no_consecutive_11_dfa",
+                "zero_or_one_1_dfa",
+                "length_at_most_5_dfa",
+                "words_ending_in_1_dfa",
+                "all_words_dfa",
+            ]
+        ),
+        2,
+    ),
+)
+def verify_iter_counterexamples_matches_brute_force(
+    submitted_dfa: DFA, reference_dfa: DFA
+) -> None:
+    "Counterexamples should be exactly the symmetric difference, in shortlex order"
+    product = DFAProduct(submitted_dfa, reference_dfa)
+
+    expected_false_positives = []
+    expected_false_negatives = []
+    for word in strings_of_length_at_most_n(
+        0, MAX_LENGTH_TO_CHECK, alphabet=reference_dfa.input_symbols
+    ):
+        submitted_accepts = submitted_dfa.accepts_input(word)
+        reference_accepts = reference_dfa.accepts_input(word)
+
+        if submitted_accepts and not reference_accepts:
+            expected_false_positives.append(word)
+        elif reference_accepts and not submitted_accepts:
+            expected_false_negatives.append(word)
+
+    assert list(
+        product.iter_counterexamples(MAX_LENGTH_TO_CHECK, false_positive=True)
+    ) == sorted(expected_false_positives, key=shortlex_key)
+    assert list(
+        product.iter_counterexamples(MAX_LENGTH_TO_CHECK, false_positive=False)
+    ) == sorted(expected_false_negatives, key=shortlex_key)
+
+
+def verify_shortest_counterexample(
+    at_least_three_1_dfa: DFA, at_least_four_1_dfa: DFA
+) -> None:
+    assert DFAProduct(
+        at_least_three_1_dfa, at_least_four_1_dfa
+    ).shortest_counterexample() == ("111", True)
+    assert DFAProduct(
+        at_least_four_1_dfa, at_least_three_1_dfa
+    ).shortest_counterexample() == ("111", False)
+
+
+def verify_equivalent_product(
+    no_consecutive_11_dfa: DFA, no_consecutive_11_extra_states_dfa: DFA
+) -> None:
+    product = DFAProduct(no_consecutive_11_dfa, no_consecutive_11_extra_states_dfa)
+
+    assert product.is_equivalent()
+    assert product.shortest_counterexample() is None
+    assert not list(product.iter_counterexamples(10, false_positive=True))
+    assert not list(product.iter_counterexamples(10, false_positive=False))
+
+
+def verify_partial_dfa_product(words_ending_in_1_dfa: DFA) -> None:
+    "Missing transitions in a partial DFA should behave like a dead state"
+    only_1s_dfa = DFA(
+        states={"a"},
+        input_symbols={"0", "1"},
+        transitions={"a": {"1": "a"}},
+        initial_state="a",
+        final_states={"a"},
+        allow_partial=True,
+    )
+
+    product = DFAProduct(only_1s_dfa, words_ending_in_1_dfa)
+
+    assert product.shortest_counterexample() == ("", True)
+    assert list(product.iter_counterexamples(3, false_positive=False)) == [
+        "01",
+        "001",
+        "011",
+        "101",
+    ]
+
+
+def verify_mismatched_input_symbols(test_dfa: DFA) -> None:
+    other_dfa = DFA(
+        states={"a"},
+        input_symbols={"a"},
+        transitions={"a": {"a": "a"}},
+        initial_state="a",
+        final_states={"a"},
+    )
+
+    with pytest.raises(ValueError):
+        DFAProduct(test_dfa, other_dfa)
+
+
+@pytest.mark.parametrize(
+    "submitted_dfa, reference_dfa",
+    combinations(
+        lazy_fixture(
+            [
+                "test_dfa",
+                "no_consecutive_11_dfa",
+                "at_least_four_1_dfa",
+                "words_ending_in_1_dfa",
+            ]
+        ),
+        2,
+    ),
+)
+def verify_count_counterexamples_by_length(
+    submitted_dfa: DFA, reference_dfa: DFA
+) -> None:
+    difference_dfa = submitted_dfa ^ reference_dfa
+
+    # Long enough for the counts to overflow 64 bit integers
+    assert DFAProduct(submitted_dfa, reference_dfa).count_counterexamples_by_length(
+        80
+    ) == [difference_dfa.count_words_of_length(n) for n in range(81)]
@@ -0,0 +1,79 @@
+import pytest
+from automata.fa.dfa import DFA
+from theorielearn.automata_utils.random_fa import (
+    GenerationError,
+    random_dfas,
+    random_nfas,
+)
+
+NUM_TO_GENERATE = 50
+
+
+@pytest.mark.parametrize("require_minimal", [False, True])
+def verify_random_dfas(require_minimal: bool) -> None:
+    dfas = random_dfas(
+        NUM_TO_GENERATE, 3, 6, require_minimal=require_minimal, seed=1234
+    )
+
+    assert len(dfas) == NUM_TO_GENERATE
+    for dfa in dfas:
+        assert 3 <= len(dfa.states) <= 6
+        assert dfa.states == set(range(len(dfa.states)))
+        assert not dfa.isempty()
+        assert not dfa.complement().isempty()
+
+        reachable_states = {dfa.initial_state}
+        stack = [dfa.initial_state]
+        while stack:
+            for next_state in dfa.transitions[stack.pop()].values():
+                if next_state not in reachable_states:
+                    reachable_states.add(next_state)
+                    stack.append(next_state)
+
+        assert reachable_states == dfa.states
+
+        if require_minimal:
+            assert len(dfa.minify().states) == len(dfa.states)
+
+
+def verify_random_nfas() -> None:
+    nfas = random_nfas(
+        NUM_TO_GENERATE,
+        states=6,
+        alphabet="01",
+        edge_density=0.8,
+        epsilon_density=0.2,
+        accepting=2,
+        min_subset_states=8,
+        max_subset_states=10,
+        seed=1234,
+    )
+
+    assert len(nfas) == NUM_TO_GENERATE
+    for nfa in nfas:
+        # Completing the DFA adds the empty set as a state if it is reachable
+        equiv_dfa = DFA.from_nfa(nfa, minify=False).to_complete()
+
+        assert nfa.states == set("abcdef")
+        assert nfa.final_states == {"e", "f"}
+        assert 8 <= len(equiv_dfa.states) <= 10
+        assert not equiv_dfa.isempty()
+        assert not equiv_dfa.complement().isempty()
+
+
+def verify_seed_reproducible() -> None:
+    assert random_dfas(5, 3, 5, seed=7) == random_dfas(5, 3, 5, seed=7)
+
+    first_nfas = random_nfas(5, 5, "01", 0.5, 0.3, 1, seed=7)
+    second_nfas = random_nfas(5, 5, "01", 0.5, 0.3, 1, seed=7)
+    assert [nfa.transitions for nfa in first_nfas] == [
+        nfa.transitions for nfa in second_nfas
+    ]
+
+
+def verify_unsatisfiable_constraints() -> None:
+    with pytest.raises(GenerationError):
+        random_nfas(1, 2, "01", 0.5, 0.5, 1, min_subset_states=100)
+
+    with pytest.raises(ValueError):
+        random_dfas(1, 4, 3)
@@ -0,0 +1,135 @@
+import pytest
+from automata.fa.dfa import DFA
+from automata.fa.fa import FA
+from automata.fa.nfa import NFA
+from pytest_lazyfixture import lazy_fixture
+from theorielearn.automata_utils.compact_dfa import compact_dfa
+from theorielearn.automata_utils.json_utils import FSMType, dfa_dump_json
+from theorielearn.automata_utils.product_utils import DFAProduct
+from theorielearn.automata_utils.reference_cache import (
+    ReferenceDFACache,
+    compile_reference,
+    fingerprint,
+    fingerprint_fa,
+    reference_from_json,
+    reference_from_regex,
+    reference_from_serialized,
+)
+
+
+@pytest.mark.parametrize(
+    "fa",
+    lazy_fixture(
+        [
+            "test_dfa",
+            "no_consecutive_11_extra_states_dfa",
+            "at_least_three_1_dfa",
+            "length_at_most_5_dfa",
+            "test_nfa",
+        ]
+    ),
+)
+def verify_compile_reference(fa: FA) -> None:
+    compiled = compile_reference(fa)
+    equiv_dfa = DFA.from_nfa(fa) if isinstance(fa, NFA) else fa
+
+    assert compiled.dfa == equiv_dfa
+    assert compiled.dfa.minify() == compiled.dfa
+    assert compiled.word_counts == tuple(
+        compiled.dfa.count_words_of_length(n)
+        for n in range(2 * len(compiled.dfa.states) + 1)
+    )
+
+
+def verify_cache_hits_and_misses(
+    no_consecutive_11_dfa: DFA, at_least_one_1_dfa: DFA
+) -> None:
+    cache = ReferenceDFACache()
+    build_calls = []
+
+    def get(fa: DFA) -> None:
+        def build_fn() -> DFA:
+            build_calls.append(fa)
+            return fa
+
+        cache.get_or_compile(fingerprint_fa(fa), build_fn)
+
+    get(no_consecutive_11_dfa)
+    get(no_consecutive_11_dfa)
+    get(at_least_one_1_dfa)
+    get(no_consecutive_11_dfa)
+
+    assert build_calls == [no_consecutive_11_dfa, at_least_one_1_dfa]
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert len(cache) == 2
+
+
+def verify_cache_lru_eviction(
+    no_consecutive_11_dfa: DFA, at_least_one_1_dfa: DFA, all_words_dfa: DFA
+) -> None:
+    cache = ReferenceDFACache(max_size=2)
+
+    for fa in (no_consecutive_11_dfa, at_least_one_1_dfa, no_consecutive_11_dfa):
+        cache.get_or_compile(fingerprint_fa(fa), lambda: fa)
+
+    cache.get_or_compile(fingerprint_fa(all_words_dfa), lambda: all_words_dfa)
+
+    # at_least_one_1_dfa was the least recently used entry
+    assert fingerprint_fa(no_consecutive_11_dfa) in cache
+    assert fingerprint_fa(at_least_one_1_dfa) not in cache
+    assert fingerprint_fa(all_words_dfa) in cache
+
+    with pytest.raises(ValueError):
+        ReferenceDFACache(max_size=0)
+
+
+def verify_fingerprint_ignores_state_names(no_consecutive_11_dfa: DFA) -> None:
+    renamed_dfa = DFA(
+        states={f"q_{state}" for state in no_consecutive_11_dfa.states},
+        input_symbols=no_consecutive_11_dfa.input_symbols,
+        transitions={
+            f"q_{state}": {
+                symbol: f"q_{end_state}" for symbol, end_state in transition.items()
+            }
+            for state, transition in no_consecutive_11_dfa.transitions.items()
+        },
+        initial_state=f"q_{no_consecutive_11_dfa.initial_state}",
+        final_states={f"q_{state}" for state in no_consecutive_11_dfa.final_states},
+    )
+
+    assert fingerprint_fa(renamed_dfa) == fingerprint_fa(no_consecutive_11_dfa)
+    assert fingerprint_fa(renamed_dfa.complement()) != fingerprint_fa(
+        no_consecutive_11_dfa
+    )
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+
+
+def verify_reference_from_json(at_least_three_1_dfa: DFA) -> None:
+    json_dict = dfa_dump_json(at_least_three_1_dfa)
+
+    compiled = reference_from_json(json_dict, FSMType.DFA)
+
+    assert compiled.dfa == at_least_three_1_dfa
+    assert reference_from_json(json_dict, FSMType.DFA) is compiled
+
+
+def verify_reference_from_regex(no_consecutive_11_dfa: DFA) -> None:
+    compiled = reference_from_regex("(0 + 10)*(1 + e)")
+
+    assert compiled.dfa == no_consecutive_11_dfa
+    # Surrounding whitespace should not create a separate cache entry
+    assert reference_from_regex("  (0 + 10)*(1 + e)\n") is compiled
+
+
+def verify_reference_from_serialized(no_consecutive_11_dfa: DFA) -> None:
+    encoded = compact_dfa(no_consecutive_11_dfa).serialize()
+    reference = reference_from_serialized(encoded)
+
+    assert reference.to_dfa() == no_consecutive_11_dfa
+    assert reference_from_serialized(encoded) is reference
+
+    # Compact DFAs can be compared directly against automata-lib ones
+    assert DFAProduct(no_consecutive_11_dfa, reference).is_equivalent()
+    assert not DFAProduct(
+        reference_from_regex("(0 + 1)*").dfa, reference
+    ).is_equivalent()
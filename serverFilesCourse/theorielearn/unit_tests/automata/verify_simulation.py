@@ -0,0 +1,53 @@
+import automata.base.exceptions as exceptions
+from automata.fa.nfa import NFA
+from theorielearn.automata_utils.fa_utils import nfa_read_input_from_state
+from theorielearn.automata_utils.random_fa import random_nfas
+from theorielearn.automata_utils.simulation import (
+    epsilon_closure,
+    nfa_read_input_from,
+    nfa_read_input_stepwise_from,
+)
+from theorielearn.shared_utils import strings_of_length_at_most_n
+
+
+def verify_matches_reinstantiated_nfa() -> None:
+    "Reading from any state should match an NFA with that initial state"
+    for nfa in random_nfas(10, 5, "01", 0.6, 0.3, 2, seed=42):
+        for state in nfa.states:
+            start_nfa = NFA(
+                states=nfa.states,
+                input_symbols=nfa.input_symbols,
+                transitions=nfa.transitions,
+                initial_state=state,
+                final_states=nfa.final_states,
+            )
+
+            assert (
+                epsilon_closure(nfa, {state}) == start_nfa._get_lambda_closures()[state]
+            )
+
+            for word in strings_of_length_at_most_n(0, 4, alphabet={"0", "1"}):
+                expected = []
+                try:
+                    for current_states in start_nfa.read_input_stepwise(word):
+                        expected.append(current_states)
+                except exceptions.RejectionException:
+                    pass
+
+                assert (
+                    list(nfa_read_input_stepwise_from(nfa, {state}, word)) == expected
+                )
+                assert nfa_read_input_from(nfa, {state}, word) == expected[-1]
+                assert nfa_read_input_from_state(nfa, state, word) == expected[-1]
+
+
+def verify_read_from_set_of_states(test_nfa: NFA) -> None:
+    "Reading from a set of states should be the union of reading from each one"
+    for word in strings_of_length_at_most_n(0, 4, alphabet=test_nfa.input_symbols):
+        assert nfa_read_input_from(
+            test_nfa, test_nfa.states, word
+        ) == frozenset().union(
+            *(nfa_read_input_from(test_nfa, {state}, word) for state in test_nfa.states)
+        )
+
+    assert nfa_read_input_from(test_nfa, set(), "0") == frozenset()
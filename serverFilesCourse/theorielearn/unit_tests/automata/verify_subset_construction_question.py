@@ -0,0 +1,124 @@
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+
+from theorielearn.shared_utils import QuestionData
+
+SERVER_PATH = (
+    Path(__file__).parents[4]
+    / "questions"
+    / "NFAs"
+    / "concepts"
+    / "subset_construction"
+    / "server.py"
+)
+
+
+def load_server() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("subset_construction", SERVER_PATH)
+    assert spec is not None and spec.loader is not None
+
+    server = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(server)
+    return server
+
+
+def legacy_row(
+    q: str,
+    e0_reach: str,
+    e1_reach: str,
+    transition_0: str,
+    transition_1: str,
+    states_to_add: list[str],
+    is_accepting: str,
+) -> dict:
+    return {
+        "q": q,
+        "e0_reach": e0_reach,
+        "e1_reach": e1_reach,
+        "transition_0": transition_0,
+        "transition_1": transition_1,
+        "states_to_add": states_to_add,
+        "is_accepting": is_accepting,
+        "is_upcoming": False,
+        "is_current": False,
+        "is_finished": False,
+    }
+
+
+def legacy_question_data(submitted_answers: dict[str, str]) -> QuestionData:
+    "Params as stored by the question before it kept a subset table"
+
+    table_rows = [
+        legacy_row("01", "12", "2", "1", "2", ["12", "2"], "no"),
+        legacy_row("12", "", "2", "", "2", [""], "yes"),
+        legacy_row("2", "", "2", "", "2", [], "yes"),
+        legacy_row("", "", "", "", "", [], "no"),
+    ]
+    table_rows[0]["is_current"] = True
+
+    return {
+        "params": {"table_rows": table_rows, "current_row_number": 0},
+        "correct_answers": {},
+        "submitted_answers": submitted_answers,
+        "format_errors": {},
+        "partial_scores": {},
+        "score": 0.0,
+        "feedback": {},
+        "variant_seed": 0,
+        "options": {},
+        "raw_submitted_answers": {},
+        "editable": True,
+        "panel": "question",
+        "extensions": {},
+        "num_valid_submissions": 0,
+        "manual_grading": False,
+        "answers_names": {},
+        "ai_grading": False,
+    }
+
+
+def verify_grade_legacy_variant() -> None:
+    server = load_server()
+
+    data = legacy_question_data(
+        {
+            "0-e0_reach": "2 1",
+            "0-e1_reach": "2",
+            "0-transition_0": "1",
+            "0-transition_1": "2",
+            "0-is_accepting": "No",
+            "0-states_to_add": "2, 21",
+        }
+    )
+    server.grade(data)
+
+    table_rows = data["params"]["table_rows"]
+
+    assert data["params"]["current_row_number"] == 1
+    assert data["params"]["last_submission_correct"]
+    assert data["score"] == 1 / 4
+    assert table_rows[0]["is_finished"] and not table_rows[0]["is_current"]
+    assert table_rows[1]["is_current"] and table_rows[2]["is_upcoming"]
+    assert not table_rows[3]["is_upcoming"]
+
+    # The empty set is added as a new row, written with the empty set symbol
+    data["submitted_answers"] = {
+        "1-e0_reach": "∅",
+        "1-e1_reach": "2",
+        "1-transition_0": "∅",
+        "1-transition_1": "2",
+        "1-is_accepting": "yes",
+        "1-states_to_add": "2",
+    }
+    server.grade(data)
+
+    assert data["params"]["current_row_number"] == 1
+    assert not data["params"]["last_submission_correct"]
+    assert data["params"]["table_rows"][1]["is_current"]
+
+    data["submitted_answers"]["1-states_to_add"] = "∅"
+    server.grade(data)
+
+    assert data["params"]["current_row_number"] == 2
+    assert data["params"]["table_rows"][3]["is_upcoming"]
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from automata.fa.dfa import DFA
+from automata.fa.nfa import NFA
+from theorielearn.automata_utils.random_fa import random_nfas
+from theorielearn.automata_utils.subset_table import (
+    SubsetTable,
+    epsilon_closure_masks,
+)
+
+
+def verify_epsilon_closure_masks() -> None:
+    # 0 -> 1 -> 2 -> 0 is a cycle, with 2 -> 3 -> 4 hanging off it
+    epsilon_successors = [[1], [2], [0, 3], [4], [], [4]]
+
+    assert epsilon_closure_masks(epsilon_successors) == [
+        0b11111,
+        0b11111,
+        0b11111,
+        0b11000,
+        0b10000,
+        0b110000,
+    ]
+
+
+def verify_subset_table_matches_nfa() -> None:
+    for nfa in random_nfas(50, 6, "01", 0.8, 0.5, 2, seed=2024):
+        table = SubsetTable.from_nfa(nfa)
+        closures = nfa._get_lambda_closures()  # type: ignore
+
+        for row, subset in enumerate(table.rows):
+            states = set(table.format_subset(subset))
+            assert table.row_of(subset) == row
+            assert table.is_accepting(row) == bool(states & nfa.final_states)
+
+            for symbol in "01":
+                move = {
+                    end_state
+                    for state in states
+                    for end_state in nfa.transitions[state].get(symbol, ())
+                }
+                reach = set().union(*(closures[state] for state in move))
+
+                assert set(table.format_subset(table.move(row, symbol))) == move
+                assert set(table.format_subset(table.reach(row, symbol))) == reach
+
+        # New rows are discovered exactly once, in breadth-first order
+        discovered = [0]
+        for row in range(len(table)):
+            discovered.extend(table.new_rows(row))
+        assert discovered == list(range(len(table)))
+
+        assert table.to_dfa() == DFA.from_nfa(nfa)
+        assert SubsetTable.from_json(json.loads(json.dumps(table.to_json()))) == table
+
+
+def verify_parse_subset(test_nfa: NFA) -> None:
+    (nfa,) = random_nfas(1, 5, "01", 0.5, 0.2, 1, seed=1)
+    table = SubsetTable.from_nfa(nfa)
+    state_names = table.state_names
+
+    assert table.parse_subset("∅") == 0
+    assert table.parse_subset(" ") is None
+    assert table.parse_subset(state_names[0] * 2) is None
+    assert table.parse_subset(state_names[::-1]) == (1 << len(state_names)) - 1
+    assert table.parse_subset("?") is None
+    assert table.format_subset(table.parse_subset(state_names[0])) == state_names[0]
+
+    # State names like "q0" can't be parsed unambiguously
+    with pytest.raises(ValueError):
+        SubsetTable.from_nfa(test_nfa)
@@ -0,0 +1,91 @@
+from itertools import islice, product
+
+import pytest
+from automata.fa.dfa import DFA
+from pytest_lazyfixture import lazy_fixture
+from theorielearn.automata_utils.word_enumeration import dfa_words, language_words
+from theorielearn.shared_utils import strings_of_length_at_most_n
+
+
+def verify_strings_in_shortlex_order() -> None:
+    expected = [
+        "".join(chars)
+        for length in range(1, 5)
+        for chars in product(sorted({"a", "b", "c"}), repeat=length)
+    ]
+
+    assert list(strings_of_length_at_most_n(1, 4, alphabet={"c", "a", "b"})) == expected
+
+
+@pytest.mark.parametrize(
+    "dfa",
+    lazy_fixture(
+        [
+            "test_dfa",
+            "no_consecutive_11_dfa",
+            "zero_or_one_1_dfa",
+            "at_least_three_1_dfa",
+            "length_at_most_5_dfa",
+            "words_ending_in_1_dfa",
+        ]
+    ),
+)
+@pytest.mark.parametrize("accepted", [True, False])
+def verify_dfa_words_match_brute_force(dfa: DFA, accepted: bool) -> None:
+    expected = [
+        word
+        for word in strings_of_length_at_most_n(2, 7, alphabet=dfa.input_symbols)
+        if dfa.accepts_input(word) == accepted
+    ]
+
+    assert list(dfa_words(dfa, 7, min_length=2, accepted=accepted)) == expected
+
+
+def verify_dfa_words_target_states(test_dfa: DFA) -> None:
+    for state in test_dfa.states:
+        expected = [
+            word
+            for word in strings_of_length_at_most_n(0, 6)
+            if list(test_dfa.read_input_stepwise(word, ignore_rejection=True))[-1]
+            == state
+        ]
+
+        assert list(dfa_words(test_dfa, 6, target_states={state})) == expected
+
+
+def verify_dfa_words_limit(at_least_three_1_dfa: DFA) -> None:
+    assert list(dfa_words(at_least_three_1_dfa, 100, limit=3)) == [
+        "111",
+        "0111",
+        "1011",
+    ]
+    assert list(islice(dfa_words(at_least_three_1_dfa, 100), 2)) == ["111", "0111"]
+
+
+def verify_dfa_words_empty_language(length_at_most_5_dfa: DFA) -> None:
+    "Lengths without any wanted word should be skipped without enumerating them"
+    assert not list(dfa_words(length_at_most_5_dfa, 1000, min_length=6))
+
+
+def verify_language_words_prefix_viable() -> None:
+    "Words of the form 0^n 1^n, pruning prefixes that already contain 10"
+
+    def is_member(word: str) -> bool:
+        half = len(word) // 2
+        return len(word) % 2 == 0 and word == "0" * half + "1" * half
+
+    visited = []
+
+    def prefix_viable(prefix: str, remaining: int) -> bool:
+        visited.append(prefix)
+        return "10" not in prefix and prefix.count("1") <= remaining + len(prefix)
+
+    expected = ["", "01", "0011", "000111"]
+
+    assert list(language_words(is_member, {"0", "1"}, 7)) == expected
+    assert (
+        list(language_words(is_member, {"0", "1"}, 7, prefix_viable=prefix_viable))
+        == expected
+    )
+    assert not any("10" in prefix[:-1] for prefix in visited)
+    assert list(language_words(is_member, {"0", "1"}, 7, limit=2)) == ["", "01"]
@@ -0,0 +1,57 @@
+import pytest
+from automata.fa.dfa import DFA
+from pytest_lazyfixture import lazy_fixture
+from theorielearn.automata_utils.word_sampling import WordSampler
+from theorielearn.shared_utils import strings_of_length_at_most_n
+
+
+@pytest.mark.parametrize(
+    "dfa",
+    lazy_fixture(
+        [
+            "test_dfa",
+            "no_consecutive_11_dfa",
+            "zero_or_one_1_dfa",
+            "at_least_three_1_dfa",
+            "length_at_most_5_dfa",
+            "words_ending_in_1_dfa",
+        ]
+    ),
+)
+@pytest.mark.parametrize("accepted", [True, False])
+def verify_words_match_brute_force(dfa: DFA, accepted: bool) -> None:
+    "Words should be indexed in shortlex order"
+    min_length, max_length = 1, 7
+
+    expected = [
+        word
+        for word in strings_of_length_at_most_n(
+            min_length, max_length, alphabet=dfa.input_symbols
+        )
+        if dfa.accepts_input(word) == accepted
+    ]
+
+    sampler = WordSampler(dfa, min_length, max_length, accepted=accepted)
+
+    assert sampler.total == len(expected)
+    assert sampler.words() == sorted(expected, key=lambda word: (len(word), word))
+
+
+def verify_sample_distinct(no_consecutive_11_dfa: DFA) -> None:
+    sampler = WordSampler(no_consecutive_11_dfa, 0, 3)
+    assert sorted(sampler.sample(sampler.total)) == sorted(sampler.words())
+
+    with pytest.raises(ValueError):
+        sampler.sample(sampler.total + 1)
+
+    with pytest.raises(IndexError):
+        sampler.unrank(sampler.total)
+
+
+def verify_sample_long_words(words_ending_in_1_dfa: DFA) -> None:
+    "Sampling should not enumerate words, so very long lengths are fine"
+    sampler = WordSampler(words_ending_in_1_dfa, 1, 200)
+
+    assert sampler.total == 2**200 - 1
+    for word in sampler.sample(10):
+        assert words_ending_in_1_dfa.accepts_input(word)
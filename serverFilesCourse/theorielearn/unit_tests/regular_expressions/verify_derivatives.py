@@ -0,0 +1,147 @@
+import pytest
+from automata.fa.dfa import DFA
+from automata.fa.nfa import NFA
+from pytest_lazyfixture import lazy_fixture
+from theorielearn.automata_utils.fa_utils import get_equiv_dfa
+from theorielearn.automata_utils.grading_budget import BudgetExceeded, grading_budget
+from theorielearn.regular_expressions.derivatives import (
+    _compile_regex,
+    EMPTY_SET,
+    EPSILON,
+    concat,
+    literal,
+    regex_to_dfa,
+    star,
+    symbol,
+    union,
+)
+from theorielearn.regular_expressions.exceptions import RegexException
+from theorielearn.regular_expressions.parser import (
+    RegexCompileMethod,
+    compute_dfa_from_regex_lines,
+    compute_nfa_from_regex_lines,
+)
+
+
+def verify_similarity_rules() -> None:
+    zero = symbol("0")
+    one = symbol("1")
+
+    assert union(zero, one) == union(one, zero, zero)
+    assert union(union(zero, one), EMPTY_SET) == union(zero, union(one))
+    assert union() == EMPTY_SET
+
+    assert concat(EPSILON, zero) == zero == concat(zero, EPSILON)
+    assert concat(zero, EMPTY_SET) == EMPTY_SET
+    assert concat(concat(zero, one), zero) == literal("010")
+
+    assert star(star(zero)) == star(zero)
+    assert star(EMPTY_SET) == EPSILON == star(EPSILON)
+
+
+def verify_interning() -> None:
+    "Structurally equal trees built in different ways are the same object"
+
+    assert symbol("0") is symbol("0")
+    assert union(symbol("0"), symbol("1")) is union(symbol("1"), symbol("0"))
+    assert concat(literal("01"), star(literal("10"))) is concat(
+        symbol("0"), concat(symbol("1"), star(concat(symbol("1"), symbol("0"))))
+    )
+    assert literal("011").derivative("0") is literal("11")
+
+
+def verify_derivatives() -> None:
+    assert literal("011").derivative("0") == literal("11")
+    assert literal("011").derivative("1") == EMPTY_SET
+
+    zero_star = star(symbol("0"))
+    assert zero_star.derivative("0") == zero_star
+    assert zero_star.nullable
+
+    regex = concat(zero_star, symbol("1"))
+    assert regex.derivative("1") == EPSILON
+    assert regex.derivative("0") == regex
+
+
+@pytest.mark.parametrize(
+    "regex",
+    [
+        "(e+1)(01)*(e+0)",
+        "(0+1)*010(0+1)*",
+        "1*(01*01*)*",
+        "0+1(0+1)*00",
+        "((e+0+00+000)1)*(e+0+00+000)",
+        "((0+1)(0+1))*",
+        "(1*0)*(0*1)*",
+        "0(0+1(1+0(0+11*)*)*)*",
+        "(0+1)*1(0+1)(0+1)(0+1)(0+1)",
+        "A = (00)* \n B = (11)* \n A B+(A)(1B)0+(0A)(B)0+(0A)(1B)",
+        "a = (0+1) \n b = a a \n b* + b* a b*",
+        "e",
+    ],
+)
+def verify_methods_agree(regex: str) -> None:
+    derivatives_dfa = compute_dfa_from_regex_lines(regex)
+    thompson_dfa = compute_dfa_from_regex_lines(
+        regex, method=RegexCompileMethod.THOMPSON
+    )
+
+    assert derivatives_dfa == thompson_dfa
+    assert derivatives_dfa == DFA.from_nfa(compute_nfa_from_regex_lines(regex))
+
+    # Both are minimal and complete
+    assert len(derivatives_dfa.states) == len(thompson_dfa.states)
+    assert all(
+        transition.keys() == derivatives_dfa.input_symbols
+        for transition in derivatives_dfa.transitions.values()
+    )
+
+
+@pytest.mark.parametrize(
+    "reference_fa, target_regex",
+    [
+        (lazy_fixture("regex_1_nfa"), "(01 + 1)*(0*1 + 1*0)(10 + 0)*"),
+        (lazy_fixture("regex_5_nfa"), "(((01)*0 + 2)(100)*1)*(1* + 0*2*)"),
+        (lazy_fixture("at_least_three_1_dfa"), "A = (1 + 0)* \n A 1 A 1 A 1 A"),
+    ],
+)
+def verify_regex_to_dfa(reference_fa: DFA | NFA, target_regex: str) -> None:
+    dfa = compute_dfa_from_regex_lines(target_regex, set(reference_fa.input_symbols))
+    assert dfa == get_equiv_dfa(reference_fa)
+
+
+@pytest.mark.parametrize("regex", ["0var0", "(((01))", "*01", "", "a = 0 \n a b"])
+def verify_invalid_regex(regex: str) -> None:
+    with pytest.raises(RegexException):
+        compute_dfa_from_regex_lines(regex)
+
+
+def verify_state_budget() -> None:
+    "Every DFA for (0+1)*1(0+1)^7 needs 2^8 states"
+
+    bit = union(symbol("0"), symbol("1"))
+    regex = concat(star(bit), symbol("1"))
+    for _ in range(7):
+        regex = concat(regex, bit)
+
+    with grading_budget(max_states=100):
+        with pytest.raises(BudgetExceeded):
+            regex_to_dfa(regex, {"0", "1"})
+
+    assert len(regex_to_dfa(regex, {"0", "1"}).states) == 2**8
+
+
+def verify_compiled_regex_cache() -> None:
+    "Shared definitions are compiled once, across lines and across calls"
+
+    regex = "a = (0+1)*0110(0+1)*\nb = a a\na + b b"
+    dfa = compute_dfa_from_regex_lines(regex)
+
+    hits = _compile_regex.cache_info().hits
+    assert compute_dfa_from_regex_lines(regex.replace("a", "c")) is dfa
+    assert _compile_regex.cache_info().hits == hits + 1
+
+    assert get_equiv_dfa(compute_nfa_from_regex_lines(regex)) == dfa
+    misses = _compile_regex.cache_info().misses
+    assert get_equiv_dfa(compute_nfa_from_regex_lines(regex)) == dfa
+    assert _compile_regex.cache_info().misses == misses
@@ -0,0 +1,46 @@
+import pytest
+from theorielearn.regular_expressions.equivalence import (
+    RegexComparison,
+    compare_all_pairs,
+    compare_regexes,
+)
+from theorielearn.regular_expressions.exceptions import RegexException
+
+
+def verify_compare_regexes() -> None:
+    equivalent, subset, superset, incomparable = compare_regexes(
+        "(0+1)*1", ["(0*1)*0*1", "11", "e+(0+1)*1", "0+e"]
+    )
+
+    assert equivalent == RegexComparison(None, None)
+    assert equivalent.equivalent and equivalent.counterexample is None
+
+    assert subset.subset and not subset.superset
+    assert subset == RegexComparison(None, "1")
+
+    # The empty string is a valid (and the shortest) witness
+    assert superset.superset and not superset.subset
+    assert superset.counterexample == ""
+
+    assert not incomparable.subset and not incomparable.superset
+    assert incomparable == RegexComparison("", "1")
+    assert incomparable.counterexample == ""
+
+
+def verify_compare_all_pairs() -> None:
+    regexes = ["0*", "00*", "(00)*", "e+0 0*"]
+    comparisons = compare_all_pairs(regexes)
+
+    for i, row in enumerate(comparisons):
+        assert row[i].equivalent
+        for j, comparison in enumerate(row):
+            assert comparison == comparisons[j][i].reversed()
+            assert compare_regexes(regexes[j], [regexes[i]]) == [comparison]
+
+    assert comparisons[0][3].equivalent
+    assert comparisons[2][1] == RegexComparison("", "0")
+
+
+def verify_invalid_candidate() -> None:
+    with pytest.raises(RegexException):
+        compare_regexes("0*", ["0", "0var"])
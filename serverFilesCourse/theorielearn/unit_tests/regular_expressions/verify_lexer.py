@@ -1,7 +1,12 @@
 """Tests for lexer-related code."""
 
 import pytest
-from theorielearn.regular_expressions.lexer import Lexer, LexerException, TokenRegistry
+from theorielearn.regular_expressions.lexer import (
+    Lexer,
+    LexerException,
+    TokenRegistry,
+    compile_token_patterns,
+)
 from theorielearn.regular_expressions.postfix import LeftParen, RightParen, Token
 
 
@@ -272,3 +277,73 @@ class VerifyLexTestCase:
         with pytest.raises(LexerException) as cm:
             lexer.lex("aaaabaaa")
         assert cm.value.position == 4
+
+    def verify_lex_longest_match(self) -> None:
+        class AToken(Token):
+            pass
+
+        class AAToken(Token):
+            pass
+
+        lexer: Lexer = Lexer()
+        lexer.register_token(AToken, r"a")
+        lexer.register_token(AAToken, r"aa")
+
+        tokens = lexer.lex("aaa a")
+        assert ["aa", "a", "a"] == [token.text for token in tokens]
+        assert [AAToken, AToken, AToken] == [type(token) for token in tokens]
+
+    def verify_lex_ties_go_to_first_token(self) -> None:
+        class StringToken(Token):
+            pass
+
+        class VariableToken(Token):
+            pass
+
+        lexer: Lexer = Lexer()
+        lexer.register_token(StringToken, r"[ab]+")
+        lexer.register_token(VariableToken, r"[a-z]+")
+
+        tokens = lexer.lex("ab abc\tba")
+        assert ["ab", "abc", "ba"] == [token.text for token in tokens]
+        assert [StringToken, VariableToken, StringToken] == [
+            type(token) for token in tokens
+        ]
+
+    def verify_lex_matches_token_registry(self) -> None:
+        "Lexing should agree with repeatedly taking the longest match from the registry"
+
+        lexer: Lexer = Lexer()
+        register_parens(lexer)
+        lexer.register_token(LeftParen, r"[01]+")
+        lexer.register_token(RightParen, r"[0-9]+|x")
+
+        text = " (0110)(123) x(0)  "
+        expected = []
+        pos = 0
+        while pos < len(text):
+            token_match = lexer.tokens.get_token(text, start=pos)
+            if token_match is None:
+                pos += 1
+            else:
+                token_factory_fn, match = token_match
+                expected.append(token_factory_fn(match.group()))
+                pos = match.end()
+
+        tokens = lexer.lex(text)
+        assert [token.text for token in expected] == [token.text for token in tokens]
+        assert [type(token) for token in expected] == [type(token) for token in tokens]
+
+    def verify_lex_reuses_compiled_pattern(self) -> None:
+        for _ in range(2):
+            lexer: Lexer = Lexer()
+            register_parens(lexer)
+            lexer.lex("()")
+
+        hits_before = compile_token_patterns.cache_info().hits
+
+        lexer = Lexer()
+        register_parens(lexer)
+        lexer.lex("()")
+
+        assert compile_token_patterns.cache_info().hits == hits_before + 1
@@ -5,8 +5,12 @@ from automata.fa.dfa import DFA
 from automata.fa.nfa import NFA
 from theorielearn.automata_utils.fa_utils import get_equiv_dfa
 from pytest_lazyfixture import lazy_fixture
-from theorielearn.regular_expressions.exceptions import RegexException
-from theorielearn.regular_expressions.parser import compute_nfa_from_regex_lines
+from theorielearn.regular_expressions.exceptions import ParserException, RegexException
+from theorielearn.regular_expressions.parser import (
+    NFAArena,
+    NFARegexBuilder,
+    compute_nfa_from_regex_lines,
+)
 from theorielearn.shared_utils import strings_of_length_at_most_n
 
 TEST_ALPHABET = {"0", "1"}
@@ -384,3 +388,31 @@ def verify_regex_parsing(reference_fa: Union[DFA, NFA], target_regex: str) -> No
     )
     equiv_reference_dfa = get_equiv_dfa(reference_fa)
     assert parsed_equiv_dfa == equiv_reference_dfa
+
+
+def verify_nfa_states_numbered_densely() -> None:
+    "State names restart from 0 for every regex, rather than growing forever"
+
+    regex = "a = 0*1\n(a 0 + 11)* a"
+    first_nfa = compute_nfa_from_regex_lines(regex)
+    second_nfa = compute_nfa_from_regex_lines(regex)
+
+    assert first_nfa.states == set(range(len(first_nfa.states)))
+    assert first_nfa == second_nfa
+    assert first_nfa.transitions == second_nfa.transitions
+
+
+def verify_builders_share_arena() -> None:
+    arena = NFAArena()
+    builder = NFARegexBuilder.from_string_literal(arena, "01")
+    builder.union(NFARegexBuilder.from_string_literal(arena, "1"))
+    builder.kleene_star()
+
+    # 3 + 2 states for the literals, and one new initial state for each operator
+    assert len(arena) == 7
+    nfa = builder.build(TEST_ALPHABET)
+    assert nfa.accepts_input("011011")
+    assert not nfa.accepts_input("0")
+
+    with pytest.raises(ParserException):
+        builder.concatenate(NFARegexBuilder.from_string_literal(NFAArena(), "0"))
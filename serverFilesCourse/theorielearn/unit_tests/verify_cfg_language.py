@@ -0,0 +1,68 @@
+import re
+from typing import Callable
+
+import pytest
+from nltk.grammar import CFG, Nonterminal
+from theorielearn.CFGs.cfg_language import cfg_language, clean_cfg
+from theorielearn.shared_utils import strings_of_length_at_most_n
+
+MAX_LENGTH = 10
+
+
+def is_balanced(word: str) -> bool:
+    depth = 0
+    for char in word:
+        depth += 1 if char == "0" else -1
+        if depth < 0:
+            return False
+    return depth == 0
+
+
+@pytest.mark.parametrize(
+    "grammar,is_member",
+    [
+        # Exploring sentential forms of bounded length misses 1^n here
+        ("S -> '1' S |", lambda word: "0" not in word),
+        ("S -> S S | '0' S '1' |", is_balanced),
+        # Unit cycles and empty productions
+        (
+            "S -> A | B\nA -> B | '0' A |\nB -> A | '1'",
+            lambda word: re.fullmatch("0*1?", word) is not None,
+        ),
+        # Multi-character terminals and a useless nonterminal
+        (
+            "S -> '00' S '1' | '' | U\nU -> U '1'",
+            lambda word: word == "0" * (2 * (len(word) // 3)) + "1" * (len(word) // 3),
+        ),
+        (
+            "S -> '0' S '1' S | '1' S '0' S |",
+            lambda word: word.count("0") == word.count("1"),
+        ),
+        ("S -> S '0'", lambda word: False),
+    ],
+)
+def verify_cfg_language_exact(grammar: str, is_member: Callable[[str], bool]) -> None:
+    expected = {
+        word
+        for word in strings_of_length_at_most_n(0, MAX_LENGTH, alphabet={"0", "1"})
+        if is_member(word)
+    }
+
+    assert cfg_language(CFG.fromstring(grammar), MAX_LENGTH) == expected
+
+
+def verify_clean_cfg() -> None:
+    grammar = clean_cfg(
+        CFG.fromstring("S -> A B | U\nA -> B | '0' A |\nB -> A | '1'\nU -> U '1'")
+    )
+
+    assert grammar.generates_empty
+    assert Nonterminal("U") not in grammar.productions
+
+    for rhss in grammar.productions.values():
+        for rhs in rhss:
+            assert rhs
+            assert len(rhs) > 1 or not isinstance(rhs[0], Nonterminal)
+            assert all(
+                isinstance(symbol, Nonterminal) or len(symbol) == 1 for symbol in rhs
+            )
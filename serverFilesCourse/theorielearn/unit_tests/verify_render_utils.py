@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+import chevron
+import pytest
+from automata.fa.dfa import DFA
+from automata.fa.fa import FA
+from theorielearn.automata_utils.json_utils import FSMType, dfa_dump_json
+from theorielearn.render_utils import fsm_diagram, load_template, render_template
+
+TEMPLATE = """
+{{#question}}<p>{{name}}</p>{{/question}}
+{{^question}}<ul>{{#items}}<li>{{{html}}}</li>{{/items}}</ul>{{/question}}
+"""
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"question": True, "name": "a < b"},
+        {"question": False, "items": [{"html": "<b>x</b>"}, {"html": "y"}]},
+    ],
+)
+def verify_render_template_matches_chevron(
+    tmp_path: Path, params: Dict[str, Any]
+) -> None:
+    template_path = tmp_path / "template.mustache"
+    template_path.write_text(TEMPLATE)
+
+    expected = chevron.render(TEMPLATE, params).strip()
+
+    # Rendering twice should reuse the same tokens
+    assert render_template(str(template_path), params) == expected
+    assert render_template(str(template_path), params) == expected
+    assert load_template(str(template_path)) is load_template(str(template_path))
+
+
+def verify_fsm_diagram_cached(
+    monkeypatch: pytest.MonkeyPatch, no_consecutive_11_dfa: DFA
+) -> None:
+    layouts: List[FA] = []
+
+    def show_diagram(fsm: FA) -> str:
+        layouts.append(fsm)
+        return f"digraph {{ {len(fsm.states)} }}"
+
+    monkeypatch.setattr(FA, "show_diagram", show_diagram)
+
+    json_dict = dfa_dump_json(no_consecutive_11_dfa)
+    reordered = json.dumps(dict(reversed(list(json_dict.items()))))
+
+    diagram = fsm_diagram(json_dict, FSMType.DFA)
+
+    assert diagram == f"digraph {{ {len(no_consecutive_11_dfa.states)} }}"
+    # Equal JSON (even with keys in another order) should not be laid out again
+    assert fsm_diagram(json.dumps(json_dict), FSMType.DFA) == diagram
+    assert fsm_diagram(reordered, FSMType.DFA) == diagram
+    assert len(layouts) == 1